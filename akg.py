@@ -1,5 +1,13 @@
 import streamlit as st
 import pandas as pd
+import os
+import shutil
+import atexit
+import tempfile
+from datetime import datetime
+
+from akg_reference import get_akg_reference
+from akg_service import AKTIVITAS_OPTIONS, ROSTER_COLUMNS, hitung_bmr, hitung_makro, process_roster_csv
 
 # --- Konfigurasi Halaman ---
 st.set_page_config(
@@ -20,21 +28,11 @@ st.markdown("---")
 # --- Bagian Tabel Referensi AKG Kemenkes ---
 st.header("Tabel Referensi AKG (Kemenkes, PMK No. 28/2019)")
 
-# Data untuk tabel AKG
-data_akg = {
-    'Kelompok Umur (Tahun)': ['7–9', '10–12', '10–12', '13–15', '13–15', '16–18', '16–18'],
-    'Jenis Kelamin': ['L/P', 'Laki-laki', 'Perempuan', 'Laki-laki', 'Perempuan', 'Laki-laki', 'Perempuan'],
-    'Energi (kkal)': [1650, 2000, 1900, 2400, 2050, 2650, 2100],
-    'Protein (g)': [40, 50, 55, 70, 65, 75, 60],
-    'Lemak (g)': [55, 65, 65, 80, 70, 85, 70],
-    'Karbohidrat (g)': [250, 300, 280, 350, 300, 400, 300],
-    'Serat (g)': [23, 28, 27, 34, 29, 37, 29],
-    'Air (ml)': [1650, 1850, 1850, 2100, 2150, 2300, 2100]
-}
-df_akg = pd.DataFrame(data_akg)
+# Tabel referensi bersama (satu salinan per proses untuk semua halaman)
+akg_reference = get_akg_reference()
 
 # Menampilkan tabel
-st.dataframe(df_akg, use_container_width=True)
+st.dataframe(akg_reference.display_table, use_container_width=True)
 st.info("Gunakan tabel di atas sebagai acuan utama standar gizi untuk populasi.")
 st.markdown("---")
 
@@ -42,14 +40,6 @@ st.markdown("---")
 # --- Bagian Kalkulator Personal ---
 st.header("Kalkulator Kebutuhan Kalori Personal")
 
-# Fungsi untuk menghitung BMR (AMB)
-def hitung_bmr(jenis_kelamin, berat, tinggi, usia):
-    if jenis_kelamin == "Laki-laki":
-        bmr = 66.5 + (13.75 * berat) + (5.003 * tinggi) - (6.75 * usia)
-    else: # Perempuan
-        bmr = 655.1 + (9.563 * berat) + (1.850 * tinggi) - (4.676 * usia)
-    return bmr
-
 # Membuat form untuk input
 with st.form("kalkulator_akg_form"):
     col1, col2 = st.columns(2)
@@ -62,13 +52,7 @@ with st.form("kalkulator_akg_form"):
         berat = st.number_input("Berat Badan (kg)", min_value=10.0, max_value=150.0, value=30.0, step=0.5)
         tinggi = st.number_input("Tinggi Badan (cm)", min_value=100.0, max_value=220.0, value=130.0, step=0.5)
 
-    aktivitas_options = {
-        "Sangat Jarang (Sedentari)": 1.2,
-        "Jarang (Olahraga 1-3x/minggu)": 1.375,
-        "Cukup Aktif (Olahraga 3-5x/minggu)": 1.55,
-        "Sangat Aktif (Olahraga 6-7x/minggu)": 1.725
-    }
-    aktivitas_label = st.selectbox("Pilih Tingkat Aktivitas Fisik:", aktivitas_options.keys())
+    aktivitas_label = st.selectbox("Pilih Tingkat Aktivitas Fisik:", AKTIVITAS_OPTIONS.keys())
     
     # Tombol submit form
     submitted = st.form_submit_button("Hitung Kebutuhan Gizi")
@@ -76,7 +60,7 @@ with st.form("kalkulator_akg_form"):
 # Logika setelah tombol ditekan
 if submitted:
     if berat > 0 and tinggi > 0 and usia > 0:
-        faktor_aktivitas = aktivitas_options[aktivitas_label]
+        faktor_aktivitas = AKTIVITAS_OPTIONS[aktivitas_label]
         
         # Hitung BMR
         bmr_value = hitung_bmr(jenis_kelamin, berat, tinggi, usia)
@@ -84,10 +68,11 @@ if submitted:
         # Hitung TDEE (Total Daily Energy Expenditure) / Total Kebutuhan Kalori
         tdee = bmr_value * faktor_aktivitas
         
-        # Hitung Kebutuhan Gizi Makro (Protein, Lemak, Karbohidrat)
-        protein_gram = (0.15 * tdee) / 4  # 15% dari total kalori, 1g protein = 4 kkal
-        lemak_gram = (0.25 * tdee) / 9      # 25% dari total kalori, 1g lemak = 9 kkal
-        karbo_gram = (0.60 * tdee) / 4      # 60% dari total kalori, 1g karbo = 4 kkal
+        # Hitung Kebutuhan Gizi Makro: 15% protein, 25% lemak, 60% karbohidrat dari total kalori
+        makro = hitung_makro(tdee)
+        protein_gram = makro['Protein (g)']
+        lemak_gram = makro['Lemak (g)']
+        karbo_gram = makro['Karbohidrat (g)']
         
         st.subheader("✅ Hasil Perhitungan Kebutuhan Gizi Harian Anda:")
         
@@ -106,6 +91,12 @@ if submitted:
         st.success(
             f"Berdasarkan data yang dimasukkan, perkiraan kebutuhan energi harian anak adalah **{tdee:.0f} kkal**."
         )
+        akg_kelompok = akg_reference.lookup(usia, jenis_kelamin)
+        if akg_kelompok is not None:
+            st.info(
+                f"Sebagai pembanding, AKG Kemenkes untuk kelompok **{akg_reference.label(usia, jenis_kelamin)}** "
+                f"adalah {akg_kelompok['Energi (kkal)']:.0f} kkal per hari."
+            )
         st.warning(
             "**Disclaimer:** Hasil ini adalah perkiraan berdasarkan rumus. Untuk kebutuhan gizi yang akurat dan "
             "penanganan kondisi medis tertentu, harap berkonsultasi dengan dokter atau ahli gizi profesional."
@@ -114,6 +105,79 @@ if submitted:
     else:
         st.error("Mohon masukkan nilai Usia, Berat Badan, dan Tinggi Badan yang valid.")
 
+
+# --- Bagian Perhitungan Massal (Roster) ---
+st.markdown("---")
+st.header("Perhitungan Massal dari Roster Sekolah")
+st.write(
+    "Unggah roster siswa (CSV) untuk menghitung AMB, kebutuhan energi dan gizi makro seluruh siswa sekaligus. "
+    "Kolom wajib: " + ", ".join(f"`{aliases[0]}`" for aliases in ROSTER_COLUMNS.values()) + ". "
+    "Jenis kelamin boleh L/P, aktivitas boleh berupa faktor (1.2-1.725) atau sebutan (jarang, cukup aktif, ...). "
+    "Kolom lain (mis. NIS, nama, kelas) ikut disalin ke hasil."
+)
+
+@st.cache_resource
+def get_roster_dir():
+    """Folder sementara hasil roster (satu per proses, dihapus saat proses berhenti)"""
+    path = tempfile.mkdtemp(prefix='akg_roster_')
+    atexit.register(shutil.rmtree, path, ignore_errors=True)
+    return path
+
+def remove_roster_hasil():
+    """Hapus file hasil roster sesi ini (bila ada) dari disk dan session state"""
+    hasil = st.session_state.pop('roster_hasil', None)
+    if hasil and os.path.exists(hasil[0]):
+        os.remove(hasil[0])
+
+def read_roster_hasil(path):
+    """Isi file hasil untuk download_button (dibaca hanya saat tombol diklik)"""
+    def read():
+        with open(path, 'rb') as hasil_file:
+            return hasil_file.read()
+    return read
+
+roster_file = st.file_uploader("Upload Roster Siswa (CSV)", type=['csv'])
+if roster_file is not None and st.button("Hitung Roster"):
+    progress_text = st.empty()
+    remove_roster_hasil()
+    try:
+        with tempfile.NamedTemporaryFile('wb', suffix='.csv', dir=get_roster_dir(), delete=False) as hasil_file:
+            try:
+                total_siswa, total_invalid = process_roster_csv(
+                    roster_file, hasil_file,
+                    on_progress=lambda n: progress_text.text(f"⏳ {n} siswa diproses...")
+                )
+            except Exception:
+                # Hasil parsial tidak disimpan
+                hasil_file.close()
+                os.remove(hasil_file.name)
+                raise
+    except ValueError as e:
+        progress_text.empty()
+        st.error(f"Roster tidak dapat diproses: {e}")
+    else:
+        progress_text.empty()
+        st.session_state.roster_hasil = (hasil_file.name, total_siswa, total_invalid)
+
+if st.session_state.get('roster_hasil') and not os.path.exists(st.session_state.roster_hasil[0]):
+    remove_roster_hasil()
+    st.warning("File hasil roster sudah tidak tersedia, silakan hitung ulang.")
+
+if st.session_state.get('roster_hasil'):
+    hasil_path, total_siswa, total_invalid = st.session_state.roster_hasil
+    col1, col2 = st.columns(2)
+    col1.metric("Siswa Diproses", f"{total_siswa:,}")
+    col2.metric("Baris Tidak Valid", f"{total_invalid:,}")
+    if total_invalid:
+        st.warning("Baris tidak valid tetap ada di file hasil dengan alasan di kolom 'Keterangan'.")
+    st.dataframe(pd.read_csv(hasil_path, nrows=100, dtype=str), use_container_width=True)
+    st.download_button(
+        label="📥 Download Hasil Perhitungan (CSV)",
+        data=read_roster_hasil(hasil_path),
+        file_name=f"kebutuhan_gizi_roster_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+        mime="text/csv"
+    )
+
 # --- Footer ---
 st.markdown("---")
 st.markdown("Dibuat dengan Python & Streamlit")
\ No newline at end of file
@@ -0,0 +1,129 @@
+"""Tabel referensi AKG (Kemenkes, PMK No. 28/2019) bersama untuk semua halaman
+
+Satu salinan per proses (lihat get_akg_reference), diindeks per jenis kelamin
+dengan interval usia terurut sehingga (usia, jenis kelamin) -> baris kebutuhan
+diselesaikan dengan binary search: bisect untuk satu anak, np.searchsorted
+untuk array penerima sekaligus.
+"""
+import bisect
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+NUTRIENTS = ['Energi (kkal)', 'Protein (g)', 'Lemak (g)', 'Karbohidrat (g)', 'Serat (g)', 'Air (ml)']
+SEXES = ('P', 'L')  # kode 0 = perempuan, 1 = laki-laki
+SEX_LABELS = {'L': 'Laki-laki', 'P': 'Perempuan', 'L/P': 'L/P'}
+
+# (usia awal, usia akhir inklusif, jenis kelamin, nilai per NUTRIENTS); 'L/P' berlaku untuk keduanya
+AKG_ROWS = [
+    (4, 6, 'L/P', (1400, 25, 50, 220, 20, 1450)),
+    (7, 9, 'L/P', (1650, 40, 55, 250, 23, 1650)),
+    (10, 12, 'L', (2000, 50, 65, 300, 28, 1850)),
+    (10, 12, 'P', (1900, 55, 65, 280, 27, 1850)),
+    (13, 15, 'L', (2400, 70, 80, 350, 34, 2100)),
+    (13, 15, 'P', (2050, 65, 70, 300, 29, 2150)),
+    (16, 18, 'L', (2650, 75, 85, 400, 37, 2300)),
+    (16, 18, 'P', (2100, 60, 70, 300, 29, 2100)),
+]
+
+
+def sex_code(jenis_kelamin):
+    """'L'/'Laki-laki' -> 1, 'P'/'Perempuan' -> 0; None bila tidak dikenal"""
+    first = str(jenis_kelamin).strip()[:1].upper()
+    if first in ('L', 'M'):
+        return 1
+    if first in ('P', 'F', 'W'):
+        return 0
+    return None
+
+
+class AkgReference:
+    """Kebutuhan gizi per kelompok umur x jenis kelamin dengan indeks interval usia"""
+
+    def __init__(self, rows=AKG_ROWS, nutrients=NUTRIENTS):
+        self.nutrients = list(nutrients)
+        self.labels = [
+            f"{start}–{end} tahun" + ('' if sex == 'L/P' else f" ({sex})")
+            for start, end, sex, _ in rows
+        ]
+        self.matrix = np.array([values for *_, values in rows], dtype=np.float64)
+        self.matrix.setflags(write=False)
+        # Tabel bersama: jangan diubah oleh halaman (salin dulu bila perlu)
+        self.table = pd.DataFrame(self.matrix, index=pd.Index(self.labels, name='Kelompok Umur'), columns=self.nutrients)
+        self.display_table = pd.DataFrame({
+            'Kelompok Umur (Tahun)': [f"{start}–{end}" for start, end, _, _ in rows],
+            'Jenis Kelamin': [SEX_LABELS[sex] for _, _, sex, _ in rows],
+            **{n: self.matrix[:, j].astype(int) for j, n in enumerate(self.nutrients)},
+        })
+        self.row_of_label = {label: i for i, label in enumerate(self.labels)}
+
+        # Per jenis kelamin: awal interval terurut, akhir (eksklusif) dan baris tabel
+        self._starts, self._ends, self._rows = [], [], []
+        for code, sex in enumerate(SEXES):
+            intervals = sorted(
+                (start, end + 1, i) for i, (start, end, row_sex, _) in enumerate(rows)
+                if row_sex in (sex, 'L/P')
+            )
+            for (_, prev_end, _), (start, _, _) in zip(intervals, intervals[1:]):
+                if start < prev_end:
+                    raise ValueError(f"Interval usia AKG tumpang tindih untuk jenis kelamin {sex}")
+            self._starts.append(np.array([start for start, _, _ in intervals], dtype=np.float64))
+            self._ends.append(np.array([end for _, end, _ in intervals], dtype=np.float64))
+            self._rows.append(np.array([i for _, _, i in intervals], dtype=np.intp))
+
+    def __len__(self):
+        return len(self.labels)
+
+    def row(self, usia, jenis_kelamin):
+        """Baris tabel untuk satu anak (usia dalam tahun); None bila di luar cakupan"""
+        code = sex_code(jenis_kelamin)
+        if code is None:
+            return None
+        starts = self._starts[code]
+        i = bisect.bisect_right(starts, usia) - 1
+        if i < 0 or usia >= self._ends[code][i]:
+            return None
+        return int(self._rows[code][i])
+
+    def label(self, usia, jenis_kelamin):
+        row = self.row(usia, jenis_kelamin)
+        return None if row is None else self.labels[row]
+
+    def lookup(self, usia, jenis_kelamin):
+        """Kebutuhan gizi satu anak sebagai Series (None bila di luar cakupan)"""
+        row = self.row(usia, jenis_kelamin)
+        return None if row is None else self.table.iloc[row]
+
+    def rows(self, usia, laki):
+        """Baris tabel untuk array penerima; -1 untuk usia/jenis kelamin di luar cakupan
+
+        `laki` berupa array boolean (atau kode 1/0; kode lain dianggap tidak dikenal).
+        """
+        usia = np.asarray(usia, dtype=np.float64)
+        codes = np.asarray(laki).astype(np.intp)
+        result = np.full(usia.shape, -1, dtype=np.intp)
+        for code in range(len(SEXES)):
+            mask = codes == code
+            if not mask.any():
+                continue
+            ages = usia[mask]
+            i = np.searchsorted(self._starts[code], ages, side='right') - 1
+            clipped = np.maximum(i, 0)
+            found = (i >= 0) & (ages < self._ends[code][clipped])
+            result[mask] = np.where(found, self._rows[code][clipped], -1)
+        return result
+
+    def requirements(self, usia, laki, nutrients=None):
+        """Matriks kebutuhan (n penerima x nutrien); baris NaN untuk yang di luar cakupan"""
+        columns = slice(None) if nutrients is None else [self.nutrients.index(n) for n in nutrients]
+        rows = self.rows(usia, laki)
+        values = self.matrix[np.maximum(rows, 0)][:, columns]
+        values[rows < 0] = np.nan
+        return values
+
+
+@lru_cache(maxsize=None)
+def get_akg_reference():
+    """Referensi AKG bersama (dibangun sekali per proses, dipakai semua sesi dan halaman)"""
+    return AkgReference()
@@ -0,0 +1,179 @@
+"""Perhitungan kebutuhan gizi (Harris-Benedict) untuk satu anak maupun satu roster
+
+Semua rumus bekerja pada array NumPy sehingga satu roster sekolah/kabupaten
+dihitung dalam satu operasi vektor, tanpa loop per siswa. Roster CSV dibaca
+dan ditulis per chunk sehingga memori tetap datar untuk file besar.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+
+# Koefisien Harris-Benedict per jenis kelamin: konstanta, berat, tinggi, usia
+# (baris 0 = perempuan, baris 1 = laki-laki)
+BMR_COEFFICIENTS = np.array([
+    [655.1, 9.563, 1.850, 4.676],
+    [66.5, 13.75, 5.003, 6.75],
+])
+
+AKTIVITAS_OPTIONS = {
+    "Sangat Jarang (Sedentari)": 1.2,
+    "Jarang (Olahraga 1-3x/minggu)": 1.375,
+    "Cukup Aktif (Olahraga 3-5x/minggu)": 1.55,
+    "Sangat Aktif (Olahraga 6-7x/minggu)": 1.725,
+}
+# Sebutan singkat tingkat aktivitas yang diterima di roster (huruf kecil)
+AKTIVITAS_ALIASES = {
+    **{label.lower(): faktor for label, faktor in AKTIVITAS_OPTIONS.items()},
+    'sangat jarang': 1.2, 'sedentari': 1.2, 'sedentary': 1.2,
+    'jarang': 1.375, 'ringan': 1.375, 'light': 1.375,
+    'cukup aktif': 1.55, 'cukup': 1.55, 'sedang': 1.55, 'moderate': 1.55,
+    'sangat aktif': 1.725, 'aktif': 1.725, 'berat': 1.725, 'active': 1.725,
+}
+AKTIVITAS_RANGE = (1.0, 2.5)
+
+# Porsi energi makro dan kalori per gram
+MACRO_SPLIT = {
+    'Protein (g)': (0.15, 4),
+    'Lemak (g)': (0.25, 9),
+    'Karbohidrat (g)': (0.60, 4),
+}
+
+# Batas nilai yang sama dengan form kalkulator personal
+USIA_RANGE = (7, 18)
+BERAT_RANGE = (10.0, 150.0)
+TINGGI_RANGE = (100.0, 220.0)
+
+# Kolom roster -> nama header yang diterima (setelah dinormalisasi)
+ROSTER_COLUMNS = {
+    'jenis_kelamin': ('jenis_kelamin', 'jk', 'kelamin', 'sex', 'gender', 'l_p'),
+    'usia': ('usia', 'umur', 'age'),
+    'berat': ('berat', 'berat_badan', 'bb', 'weight'),
+    'tinggi': ('tinggi', 'tinggi_badan', 'tb', 'height'),
+    'aktivitas': ('aktivitas', 'tingkat_aktivitas', 'faktor_aktivitas', 'activity'),
+}
+ROSTER_CHUNK_ROWS = 250_000
+
+
+def hitung_bmr_batch(laki, berat, tinggi, usia):
+    """AMB (BMR) Harris-Benedict untuk array siswa; `laki` bernilai boolean"""
+    coef = BMR_COEFFICIENTS[np.asarray(laki, dtype=np.intp)]
+    return coef[..., 0] + coef[..., 1] * berat + coef[..., 2] * tinggi - coef[..., 3] * usia
+
+
+def hitung_makro(energi):
+    """Gram protein, lemak dan karbohidrat dari kebutuhan energi (skalar atau array)"""
+    return {kolom: porsi * energi / kkal_per_gram for kolom, (porsi, kkal_per_gram) in MACRO_SPLIT.items()}
+
+
+def hitung_bmr(jenis_kelamin, berat, tinggi, usia):
+    """AMB untuk satu anak (dipakai form kalkulator personal)"""
+    return float(hitung_bmr_batch(jenis_kelamin == "Laki-laki", berat, tinggi, usia))
+
+
+def _header_key(column):
+    return re.sub(r'[^a-z0-9]+', '_', re.sub(r'\(.*?\)', '', str(column).lower())).strip('_')
+
+
+def roster_column_map(columns):
+    """Petakan header CSV ke kolom roster; error bila ada kolom wajib yang hilang"""
+    found = {}
+    for column in columns:
+        key = _header_key(column)
+        for field, aliases in ROSTER_COLUMNS.items():
+            if key in aliases and field not in found:
+                found[field] = column
+    missing = [field for field in ROSTER_COLUMNS if field not in found]
+    if missing:
+        raise ValueError(f"Kolom roster tidak ditemukan: {', '.join(missing)}")
+    return found
+
+
+def to_float(values):
+    """Kolom teks -> float64; cast langsung bila semua angka valid, jika tidak yang invalid jadi NaN"""
+    values = pd.Series(values)
+    try:
+        return np.array(values.astype(np.float64), dtype=np.float64)
+    except (ValueError, TypeError):
+        return np.array(pd.to_numeric(values, errors='coerce'), dtype=np.float64)
+
+
+def parse_jenis_kelamin(values):
+    """1 = laki-laki, 0 = perempuan, -1 = tidak dikenal (dari L/P, Laki-laki/Perempuan, M/F)"""
+    first = pd.Series(values, dtype='string').str.strip().str.upper().str[0]
+    return np.select([first.isin(['L', 'M']).to_numpy(bool), first.isin(['P', 'F', 'W']).to_numpy(bool)], [1, 0], -1)
+
+
+def parse_aktivitas(values):
+    """Faktor aktivitas dari angka (1.2, 1.55, ...) atau sebutan tingkat aktivitas; NaN bila tidak dikenal"""
+    values = pd.Series(values)
+    faktor = to_float(values)
+    text = np.isnan(faktor)
+    if text.any():
+        labels = values[text].astype('string').str.strip().str.lower()
+        faktor[text] = labels.map(AKTIVITAS_ALIASES).to_numpy(dtype=np.float64, na_value=np.nan)
+    return faktor
+
+
+def hitung_roster(df, columns=None):
+    """Hitung AMB, energi dan gram makro untuk semua baris roster dalam satu pass vektor
+
+    Baris yang datanya tidak valid tetap ada di hasil dengan nilai kosong dan
+    alasan di kolom 'Keterangan'.
+    """
+    columns = columns or roster_column_map(df.columns)
+    jk = parse_jenis_kelamin(df[columns['jenis_kelamin']])
+    usia = to_float(df[columns['usia']])
+    berat = to_float(df[columns['berat']])
+    tinggi = to_float(df[columns['tinggi']])
+    aktivitas = parse_aktivitas(df[columns['aktivitas']])
+
+    # Alasan pertama yang gagal per baris (urutan sesuai kolom roster)
+    checks = [
+        (jk < 0, "jenis kelamin tidak dikenal"),
+        (~((usia >= USIA_RANGE[0]) & (usia <= USIA_RANGE[1])), f"usia di luar {USIA_RANGE[0]}-{USIA_RANGE[1]} tahun"),
+        (~((berat >= BERAT_RANGE[0]) & (berat <= BERAT_RANGE[1])), f"berat di luar {BERAT_RANGE[0]:g}-{BERAT_RANGE[1]:g} kg"),
+        (~((tinggi >= TINGGI_RANGE[0]) & (tinggi <= TINGGI_RANGE[1])), f"tinggi di luar {TINGGI_RANGE[0]:g}-{TINGGI_RANGE[1]:g} cm"),
+        (~((aktivitas >= AKTIVITAS_RANGE[0]) & (aktivitas <= AKTIVITAS_RANGE[1])), "tingkat aktivitas tidak dikenal"),
+    ]
+    keterangan = np.select([mask for mask, _ in checks], [reason for _, reason in checks], '')
+    valid = keterangan == ''
+
+    bmr = np.where(valid, hitung_bmr_batch(jk == 1, berat, tinggi, usia), np.nan)
+    energi = bmr * aktivitas
+
+    result = df.copy()
+    result['AMB (kkal)'] = bmr.round(1)
+    result['Energi (kkal)'] = energi.round(1)
+    for kolom, gram in hitung_makro(energi).items():
+        result[kolom] = gram.round(1)
+    result['Keterangan'] = keterangan
+    return result
+
+
+def process_roster_csv(source, fileobj, chunksize=ROSTER_CHUNK_ROWS, on_progress=None):
+    """Baca roster CSV per chunk, hitung kebutuhan gizi dan tulis hasilnya ke `fileobj` (biner)
+
+    Penulisan memakai writer CSV pyarrow; DataFrame.to_csv memformat float
+    per sel di Python dan beberapa kali lebih lambat untuk roster besar.
+
+    Kembalikan (jumlah baris, jumlah baris tidak valid).
+    """
+    total = invalid = 0
+    columns = None
+    for chunk in pd.read_csv(source, chunksize=chunksize, dtype=str):
+        columns = columns or roster_column_map(chunk.columns)
+        result = hitung_roster(chunk, columns)
+        pa_csv.write_csv(
+            pa.Table.from_pandas(result, preserve_index=False), fileobj,
+            pa_csv.WriteOptions(include_header=total == 0)
+        )
+        total += len(result)
+        invalid += int((result['Keterangan'] != '').sum())
+        if on_progress is not None:
+            on_progress(total)
+    if columns is None:
+        raise ValueError("File roster kosong")
+    return total, invalid
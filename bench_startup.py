@@ -0,0 +1,80 @@
+"""Benchmark cold start halaman Streamlit pm.py dan fodddashboard.py
+
+Setiap percobaan dijalankan di interpreter Python baru (cold start) lewat
+streamlit AppTest. Mode 'eager' memuat dulu modul berat yang dulu diimpor di
+atas file (plotly.express, plotly.graph_objects, plotly.subplots,
+sklearn.linear_model) sehingga meniru perilaku lama; mode 'lazy' menjalankan
+skrip apa adanya.
+
+Jalankan: python bench_startup.py [--repeat 5]
+Hasil dicetak dan ditulis juga ke bench_output.txt.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+EAGER_MODULES = ["plotly.express", "plotly.graph_objects", "plotly.subplots", "sklearn.linear_model"]
+# plotly.graph_objects selalu dimuat oleh streamlit sendiri (tema plotly), jadi tidak dihitung
+HEAVY_MODULES = ["plotly.express", "plotly.subplots", "sklearn"]
+SCENARIOS = [
+    ("pm.py - Dashboard", "pm.py"),
+    ("fodddashboard.py - Dashboard Utama", "fodddashboard.py"),
+]
+
+CHILD = """
+import importlib, json, sys, time
+t0 = time.perf_counter()
+for name in {preload!r}:
+    importlib.import_module(name)
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({script!r}, default_timeout=300).run()
+elapsed = time.perf_counter() - t0
+print(json.dumps({{
+    "seconds": elapsed,
+    "errors": [str(e.value) for e in at.exception],
+    "loaded": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+
+def run_once(script, preload, workdir):
+    code = CHILD.format(preload=preload, script=str(ROOT / script), heavy=HEAVY_MODULES)
+    out = subprocess.run([sys.executable, "-c", code], cwd=workdir, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    lines = [f"Cold start (median dari {args.repeat} percobaan, interpreter baru per percobaan)"]
+    with tempfile.TemporaryDirectory() as workdir:
+        for label, script in SCENARIOS:
+            # Pemanasan: membuat database/snapshot agar semua percobaan setara
+            run_once(script, [], workdir)
+            results = {}
+            for mode, preload in (("eager", EAGER_MODULES), ("lazy", [])):
+                runs = [run_once(script, preload, workdir) for _ in range(args.repeat)]
+                errors = {e for run in runs for e in run["errors"]}
+                if errors:
+                    raise RuntimeError(f"{label} ({mode}) gagal: {errors}")
+                results[mode] = (statistics.median(run["seconds"] for run in runs), runs[-1]["loaded"])
+            eager, lazy = results["eager"][0], results["lazy"][0]
+            lines.append(
+                f"{label:<36} eager {eager:6.2f}s | lazy {lazy:6.2f}s | "
+                f"hemat {eager - lazy:5.2f}s ({(eager - lazy) / eager:5.1%}) | "
+                f"modul berat dimuat (lazy): {', '.join(results['lazy'][1]) or '-'}"
+            )
+            print(lines[-1], flush=True)
+
+    (ROOT / "bench_output.txt").write_text("\n".join(lines) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,16 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
+import bisect
+import hashlib
+import json
+import os
+import re
+import unicodedata
+from pathlib import Path
+
+from akg_reference import get_akg_reference
+from menu_optimizer import solve_menus
 
 # --- Konfigurasi Halaman ---
 st.set_page_config(
@@ -29,34 +40,248 @@ data_bahan_makanan = {
 }
 df_bahan = pd.DataFrame(data_bahan_makanan)
 
-data_akg = {
-    'Kelompok Umur': [
-        '7–9 tahun', '10–12 tahun (L)', '10–12 tahun (P)', 
-        '13–15 tahun (L)', '13–15 tahun (P)', '16–18 tahun (L)', '16–18 tahun (P)'
-    ],
-    'Energi (kkal)': [1650, 2000, 1900, 2400, 2050, 2650, 2100],
-    'Protein (g)': [40, 50, 55, 70, 65, 75, 60],
-    'Lemak (g)': [55, 65, 65, 80, 70, 85, 70],
-    'Karbohidrat (g)': [250, 300, 280, 350, 300, 400, 300]
+# Referensi AKG bersama (akg_reference.py), indeks = label kelompok umur; jangan diubah di halaman ini
+df_akg = get_akg_reference().table
+
+# Perkiraan harga pasar per 100 g untuk data contoh (dapat diubah di tabel Generate Menu)
+harga_bahan_contoh = {
+    "Nasi Putih": 1500, "Dada Ayam": 5500, "Paha Ayam": 4500, "Telur Ayam": 2800, "Tahu": 1200,
+    "Tempe": 1400, "Ikan Lele": 3000, "Susu Sapi": 2000, "Wortel": 1500, "Bayam": 1000,
+    "Kentang": 1800, "Minyak Goreng": 1800
 }
-df_akg = pd.DataFrame(data_akg).set_index('Kelompok Umur')
 
-# --- Inisialisasi Session State ---
-if 'menu_items' not in st.session_state:
-    st.session_state.menu_items = []
+NUTRIENT_COLUMNS = ['Energi (kkal)', 'Protein (g)', 'Lemak (g)', 'Karbohidrat (g)']
+
+# Tabel Komposisi Pangan Indonesia (CSV lokal, opsional); tanpa file ini dipakai data contoh di atas
+TKPI_CSV = Path(__file__).resolve().parent / 'tkpi.csv'
+SNAPSHOT_DIR = Path(__file__).resolve().parent / '.snapshots'
+TKPI_SNAPSHOT_VERSION = 1
+# Nama kolom TKPI (tanpa satuan, huruf besar) -> nama kolom nutrien di aplikasi
+TKPI_NAME_COLUMNS = ('NAMA BAHAN', 'NAMA BAHAN MAKANAN', 'NAMA')
+TKPI_COLUMN_ALIASES = {
+    'ENERGI': 'Energi (kkal)',
+    'PROTEIN': 'Protein (g)',
+    'LEMAK': 'Lemak (g)',
+    'KH': 'Karbohidrat (g)',
+    'KARBOHIDRAT': 'Karbohidrat (g)',
+}
+SEARCH_LIMIT = 20
+# Batas porsi bawaan per bahan di Generate Menu (gram)
+OPTIMIZER_MAX_GRAMS = 300
+OPTIMIZER_OBJECTIVES = {"Biaya minimum": 'cost', "Deviasi gizi minimum": 'deviation'}
 
 # --- Fungsi ---
-def calculate_nutrition(bahan_nama, berat_gram):
-    bahan_data = df_bahan[df_bahan['Nama Bahan'] == bahan_nama].iloc[0]
-    faktor = berat_gram / 100.0
-    return {
-        'Nama Bahan': bahan_nama,
-        'Berat (g)': berat_gram,
-        'Energi (kkal)': bahan_data['Energi (kkal)'] * faktor,
-        'Protein (g)': bahan_data['Protein (g)'] * faktor,
-        'Lemak (g)': bahan_data['Lemak (g)'] * faktor,
-        'Karbohidrat (g)': bahan_data['Karbohidrat (g)'] * faktor
-    }
+class IngredientTable:
+    """Tabel bahan makanan terindeks nama: matriks nutrien per 100 g (baris = bahan, kolom = nutrien)"""
+
+    def __init__(self, names, matrix, nutrients=NUTRIENT_COLUMNS):
+        self.names = list(names)
+        self.nutrients = list(nutrients)
+        self.matrix = matrix if isinstance(matrix, np.ndarray) and matrix.dtype.kind == 'f' else np.asarray(matrix, dtype=np.float64)
+        self.index = {name: i for i, name in enumerate(self.names)}
+
+    @classmethod
+    def from_frame(cls, df, name_column='Nama Bahan', nutrients=NUTRIENT_COLUMNS):
+        return cls(df[name_column], df[nutrients].to_numpy(dtype=np.float64), nutrients)
+
+    def __len__(self):
+        return len(self.names)
+
+def tkpi_header(column):
+    """Nama kolom TKPI tanpa satuan dalam kurung, huruf besar"""
+    return re.sub(r'\s+', ' ', re.sub(r'\(.*?\)', '', str(column))).strip().upper()
+
+def parse_tkpi_csv(path):
+    """Baca CSV TKPI menjadi (nama bahan, matriks nutrien float32, daftar nutrien)
+
+    Kolom nutrien utama dikenali dari nama kolom TKPI (ENERGI, PROTEIN, LEMAK,
+    KH); kolom angka lain ikut disimpan. Angka berkoma desimal dan tanda '-'
+    untuk data kosong diterima.
+    """
+    df = pd.read_csv(path, sep=None, engine='python', dtype=str)
+    headers = {column: tkpi_header(column) for column in df.columns}
+    name_column = next((c for c, h in headers.items() if h in TKPI_NAME_COLUMNS), None)
+    if name_column is None:
+        raise ValueError(f"Kolom nama bahan tidak ditemukan (salah satu dari: {', '.join(TKPI_NAME_COLUMNS)})")
+    
+    renamed = {c: TKPI_COLUMN_ALIASES.get(h, c) for c, h in headers.items() if c != name_column}
+    missing = [n for n in NUTRIENT_COLUMNS if n not in renamed.values()]
+    if missing:
+        raise ValueError(f"Kolom nutrien tidak ditemukan: {', '.join(missing)}")
+    
+    values = df.drop(columns=name_column).rename(columns=renamed)
+    values = values.loc[:, ~values.columns.duplicated()]
+    values = values.apply(lambda col: pd.to_numeric(col.str.strip().str.replace(',', '.', regex=False), errors='coerce'))
+    # Kolom utama selalu disertakan; kolom lain hanya jika berisi angka
+    extra = [c for c in values.columns if c not in NUTRIENT_COLUMNS and values[c].notna().any()]
+    nutrients = NUTRIENT_COLUMNS + extra
+    names = df[name_column].fillna('').str.strip()
+    keep = (names != '').to_numpy()
+    return names[keep].tolist(), values.loc[keep, nutrients].fillna(0).to_numpy(np.float32), nutrients
+
+def tkpi_snapshot_paths(path):
+    """File hasil kompilasi CSV; kuncinya ikut berubah bila CSV diganti"""
+    stat = path.stat()
+    key = hashlib.md5(f"{path}|{stat.st_size}|{stat.st_mtime_ns}|{TKPI_SNAPSHOT_VERSION}".encode()).hexdigest()[:12]
+    return {part: SNAPSHOT_DIR / f"tkpi_{key}_{part}" for part in ('names.npy', 'matrix.npy', 'nutrients.json')}
+
+def load_tkpi(path=TKPI_CSV):
+    """Tabel TKPI dari snapshot .npy (memory-map); CSV hanya di-parse saat snapshot belum ada"""
+    paths = tkpi_snapshot_paths(path)
+    if not all(p.exists() for p in paths.values()):
+        names, matrix, nutrients = parse_tkpi_csv(path)
+        SNAPSHOT_DIR.mkdir(exist_ok=True)
+        for part, data in (('names.npy', np.array(names, dtype=str)), ('matrix.npy', matrix)):
+            tmp_path = paths[part].with_suffix(f'.tmp{os.getpid()}.npy')
+            np.save(tmp_path, data)
+            os.replace(tmp_path, paths[part])
+        tmp_path = paths['nutrients.json'].with_suffix(f'.tmp{os.getpid()}')
+        tmp_path.write_text(json.dumps(nutrients))
+        os.replace(tmp_path, paths['nutrients.json'])
+    
+    # Matriks dibaca lewat page cache OS, dibagi oleh semua worker tanpa salinan per sesi
+    matrix = np.load(paths['matrix.npy'], mmap_mode='r')
+    names = np.load(paths['names.npy'], mmap_mode='r').tolist()
+    return IngredientTable(names, matrix, json.loads(paths['nutrients.json'].read_text()))
+
+def normalize_name(text):
+    """Nama untuk pencarian: huruf kecil, tanpa aksen dan tanda baca"""
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode()
+    return ' '.join(re.sub(r'[^a-z0-9]+', ' ', text.lower()).split())
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class IngredientSearch:
+    """Indeks pencarian nama bahan: awalan kata (bisect) lalu fuzzy trigram sebagai cadangan"""
+
+    def __init__(self, names):
+        self.names = names
+        normalized = [normalize_name(name) for name in names]
+        # Setiap awal kata menjadi kunci, agar "ayam" menemukan "Dada Ayam"
+        entries = sorted(
+            (name[m.start():], m.start(), row)
+            for row, name in enumerate(normalized)
+            for m in re.finditer(r'\b\w', name)
+        )
+        self.keys = [key for key, _, _ in entries]
+        self.entries = [(position, row) for _, position, row in entries]
+        
+        postings = {}
+        self.gram_counts = np.zeros(len(names), dtype=np.int32)
+        for row, name in enumerate(normalized):
+            grams = trigrams(name)
+            self.gram_counts[row] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(row)
+        self.postings = {gram: np.array(rows, dtype=np.int32) for gram, rows in postings.items()}
+
+    def prefix(self, query, limit=SEARCH_LIMIT):
+        """Bahan dengan kata yang diawali `query`; yang cocok di awal nama didahulukan"""
+        start = bisect.bisect_left(self.keys, query)
+        hits = []
+        for key, (position, row) in zip(self.keys[start:], self.entries[start:]):
+            if not key.startswith(query):
+                break
+            hits.append((position > 0, row))
+        return list(dict.fromkeys(row for _, row in sorted(hits)))[:limit]
+
+    def fuzzy(self, query, limit=SEARCH_LIMIT, min_score=0.2):
+        """Bahan termirip berdasarkan kemiripan trigram (Jaccard)"""
+        grams = [self.postings[g] for g in trigrams(query) if g in self.postings]
+        if not grams:
+            return []
+        shared = np.bincount(np.concatenate(grams), minlength=len(self.names))
+        score = shared / (len(trigrams(query)) + self.gram_counts - shared)
+        top = np.argsort(-score, kind='stable')[:limit]
+        return [int(row) for row in top if score[row] >= min_score]
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        """Nama bahan yang cocok dengan teks ketikan pengguna (maksimal `limit`)"""
+        query = normalize_name(query)
+        if not query:
+            return self.names[:limit]
+        rows = self.prefix(query, limit)
+        if len(rows) < limit:
+            rows += [row for row in self.fuzzy(query, limit) if row not in rows]
+        return [self.names[row] for row in rows[:limit]]
+
+@st.cache_resource
+def load_ingredient_table():
+    """Tabel bahan makanan (TKPI bila tersedia, jika tidak data contoh), dibangun sekali per proses"""
+    if TKPI_CSV.exists():
+        try:
+            return load_tkpi(TKPI_CSV), None
+        except (ValueError, OSError) as e:
+            return IngredientTable.from_frame(df_bahan), f"Gagal memuat {TKPI_CSV.name}: {e}"
+    return IngredientTable.from_frame(df_bahan), None
+
+@st.cache_resource
+def load_ingredient_search(_table, source_id):
+    """Indeks pencarian untuk tabel bahan (dibuat sekali per tabel)"""
+    return IngredientSearch(_table.names)
+
+class MenuPlan:
+    """Menu yang sedang disusun; total gizi = vektor berat x matriks nutrien, diperbarui inkremental"""
+
+    def __init__(self, table):
+        self.table = table
+        self.items = []  # (baris bahan, berat gram) sesuai urutan penambahan
+        self.weights = np.zeros(len(table))  # total gram per bahan
+        self.totals = np.zeros(len(table.nutrients))
+
+    def add(self, name, grams):
+        row = self.table.index[name]
+        self.items.append((row, grams))
+        self.weights[row] += grams
+        self.totals += self.table.matrix[row] * (grams / 100.0)
+
+    def remove(self, position):
+        row, grams = self.items.pop(position)
+        self.weights[row] -= grams
+        self.totals -= self.table.matrix[row] * (grams / 100.0)
+        if not self.items:
+            self.clear()
+
+    def clear(self):
+        self.items = []
+        self.weights[:] = 0
+        self.totals[:] = 0
+
+    def recompute(self):
+        """Hitung ulang total dari nol (satu perkalian vektor berat x matriks)"""
+        self.totals = self.weights @ self.table.matrix / 100.0
+
+    def bind(self, table):
+        """Pindahkan menu ke tabel bahan baru (misalnya setelah database dimuat ulang)"""
+        if table is self.table:
+            return
+        items = [(self.table.names[row], grams) for row, grams in self.items]
+        self.__init__(table)
+        for name, grams in items:
+            if name in table.index:
+                self.add(name, grams)
+
+    def total_series(self):
+        return pd.Series(self.totals, index=self.table.nutrients)
+
+    def to_frame(self):
+        """Rincian gizi per bahan di menu (dihitung sekaligus untuk semua baris)"""
+        rows = np.fromiter((row for row, _ in self.items), dtype=np.intp, count=len(self.items))
+        grams = np.fromiter((g for _, g in self.items), dtype=np.float64, count=len(self.items))
+        df = pd.DataFrame(self.table.matrix[rows] * (grams[:, None] / 100.0), columns=self.table.nutrients)
+        df.insert(0, 'Berat (g)', grams)
+        df.insert(0, 'Nama Bahan', [self.table.names[row] for row in rows])
+        return df
+
+# --- Inisialisasi Session State ---
+ingredient_table, ingredient_error = load_ingredient_table()
+ingredient_search = load_ingredient_search(ingredient_table, id(ingredient_table))
+if 'menu_plan' not in st.session_state:
+    st.session_state.menu_plan = MenuPlan(ingredient_table)
+menu_plan = st.session_state.menu_plan
+menu_plan.bind(ingredient_table)
 
 # --- TAMPILAN APLIKASI ---
 with st.sidebar:
@@ -65,44 +290,48 @@ with st.sidebar:
     st.subheader("1. Pilih Target Sasaran")
     target_kelompok_umur = st.selectbox(
         "Kelompok Umur Anak Sekolah",
-        options=df_akg.index.tolist()
+        options=df_akg.index.tolist(),
+        index=df_akg.index.get_loc('7–9 tahun')
     )
     
     st.markdown("---")
 
     st.subheader("2. Tambah Bahan ke Menu")
+    if ingredient_error:
+        st.error(ingredient_error)
+    st.caption(f"Database bahan: {len(ingredient_table)} bahan" + (" (TKPI)" if TKPI_CSV.exists() and not ingredient_error else " (data contoh)"))
+    kata_kunci = st.text_input("Cari Bahan Makanan", placeholder="Ketik nama bahan, mis. ayam")
     bahan_terpilih = st.selectbox(
         "Pilih Bahan Makanan",
-        options=df_bahan['Nama Bahan'].tolist()
+        options=ingredient_search.search(kata_kunci)
     )
     berat_terpilih = st.number_input("Berat (gram)", min_value=1, value=100)
 
     col1, col2 = st.columns(2)
     with col1:
-        if st.button("➕ Tambah Bahan", use_container_width=True):
-            nutrisi_bahan = calculate_nutrition(bahan_terpilih, berat_terpilih)
-            st.session_state.menu_items.append(nutrisi_bahan)
+        if st.button("➕ Tambah Bahan", use_container_width=True, disabled=bahan_terpilih is None):
+            menu_plan.add(bahan_terpilih, berat_terpilih)
             st.success(f"{bahan_terpilih} ({berat_terpilih}g) ditambahkan!")
             
     with col2:
         if st.button("🔄 Reset Menu", use_container_width=True, type="primary"):
-            st.session_state.menu_items = []
+            menu_plan.clear()
             st.rerun()
 
 st.title("🍲 Aplikasi Perencanaan Menu Dapur MBG")
 
 st.header("🎯 Target Kebutuhan Gizi (AKG)")
-target_gizi = df_akg.loc[target_kelompok_umur]
+target_gizi = df_akg.loc[target_kelompok_umur, NUTRIENT_COLUMNS]
 st.write(f"Target untuk kelompok umur **{target_kelompok_umur}** adalah:")
 st.table(target_gizi)
 
 st.markdown("---")
 
 st.header("📝 Menu yang Direncanakan")
-if not st.session_state.menu_items:
+if not menu_plan.items:
     st.info("Menu masih kosong. Silakan tambah bahan makanan melalui panel di sebelah kiri.")
 else:
-    df_menu = pd.DataFrame(st.session_state.menu_items)
+    df_menu = menu_plan.to_frame()
     
     format_dict = {
         'Berat (g)': '{:.0f}',
@@ -111,13 +340,26 @@ else:
         'Lemak (g)': '{:.1f}',
         'Karbohidrat (g)': '{:.1f}'
     }
-    st.dataframe(df_menu.style.format(format_dict))
+    st.dataframe(df_menu[['Nama Bahan', 'Berat (g)'] + NUTRIENT_COLUMNS].style.format(format_dict))
+    
+    col_hapus, col_tombol = st.columns([3, 1])
+    with col_hapus:
+        posisi_hapus = st.selectbox(
+            "Hapus Bahan dari Menu",
+            options=range(len(menu_plan.items)),
+            format_func=lambda i: f"{i + 1}. {df_menu['Nama Bahan'].iloc[i]} ({df_menu['Berat (g)'].iloc[i]:.0f}g)"
+        )
+    with col_tombol:
+        st.write("")
+        if st.button("🗑️ Hapus", use_container_width=True):
+            menu_plan.remove(posisi_hapus)
+            st.rerun()
 
     st.markdown("---")
     
     st.header("📊 Analisis Pemenuhan Gizi")
 
-    total_gizi = df_menu[['Energi (kkal)', 'Protein (g)', 'Lemak (g)', 'Karbohidrat (g)']].sum()
+    total_gizi = menu_plan.total_series()
 
     persen_energi = (total_gizi['Energi (kkal)'] / target_gizi['Energi (kkal)'])
     persen_protein = (total_gizi['Protein (g)'] / target_gizi['Protein (g)'])
@@ -127,27 +369,119 @@ else:
     col1, col2 = st.columns(2)
     with col1:
         st.write("**Energi**")
-        st.text(f"{total_gizi['Energi (kkal)']:.1f} / {target_gizi['Energi (kkal)']} kkal ({persen_energi:.1%})")
+        st.text(f"{total_gizi['Energi (kkal)']:.1f} / {target_gizi['Energi (kkal)']:.0f} kkal ({persen_energi:.1%})")
         # --- PERBAIKAN DI SINI ---
         st.progress(min(persen_energi, 1.0))
 
         st.write("**Protein**")
-        st.text(f"{total_gizi['Protein (g)']:.1f} / {target_gizi['Protein (g)']} g ({persen_protein:.1%})")
+        st.text(f"{total_gizi['Protein (g)']:.1f} / {target_gizi['Protein (g)']:.0f} g ({persen_protein:.1%})")
         # --- PERBAIKAN DI SINI ---
         st.progress(min(persen_protein, 1.0))
 
     with col2:
         st.write("**Lemak**")
-        st.text(f"{total_gizi['Lemak (g)']:.1f} / {target_gizi['Lemak (g)']} g ({persen_lemak:.1%})")
+        st.text(f"{total_gizi['Lemak (g)']:.1f} / {target_gizi['Lemak (g)']:.0f} g ({persen_lemak:.1%})")
         # --- PERBAIKAN DI SINI ---
         st.progress(min(persen_lemak, 1.0))
 
         st.write("**Karbohidrat**")
-        st.text(f"{total_gizi['Karbohidrat (g)']:.1f} / {target_gizi['Karbohidrat (g)']} g ({persen_karbo:.1%})")
+        st.text(f"{total_gizi['Karbohidrat (g)']:.1f} / {target_gizi['Karbohidrat (g)']:.0f} g ({persen_karbo:.1%})")
         # --- PERBAIKAN DI SINI ---
         st.progress(min(persen_karbo, 1.0))
         
     if persen_energi >= 0.9 and persen_protein >= 0.9:
         st.success("👍 Menu ini sudah baik dan mendekati target pemenuhan energi dan protein!")
     else:
-        st.warning("⚠️ Perhatian: Kandungan gizi menu belum mencapai target. Coba tambahkan atau sesuaikan bahan makanan.")
\ No newline at end of file
+        st.warning("⚠️ Perhatian: Kandungan gizi menu belum mencapai target. Coba tambahkan atau sesuaikan bahan makanan.")
+
+st.markdown("---")
+
+st.header("🤖 Generate Menu Otomatis")
+st.write("Hitung berat bahan yang memenuhi target gizi dalam batas toleransi, dengan biaya atau deviasi gizi minimum.")
+
+kandidat = st.multiselect(
+    "Bahan Kandidat",
+    options=list(dict.fromkeys(
+        st.session_state.get('kandidat_bahan', []) + [ingredient_table.names[row] for row, _ in menu_plan.items] + ingredient_search.search(kata_kunci)
+    )),
+    default=[ingredient_table.names[row] for row, _ in menu_plan.items] or None,
+    key='kandidat_bahan',
+    help="Pilihan berasal dari hasil pencarian di sidebar dan bahan yang sudah ada di menu."
+)
+
+if not kandidat:
+    st.info("Pilih minimal satu bahan kandidat untuk membuat menu otomatis.")
+else:
+    df_kandidat = st.data_editor(
+        pd.DataFrame({
+            'Nama Bahan': kandidat,
+            'Min (g)': 0.0,
+            'Maks (g)': float(OPTIMIZER_MAX_GRAMS),
+            'Harga (Rp/100 g)': [float(harga_bahan_contoh.get(nama, 0)) for nama in kandidat],
+        }),
+        disabled=['Nama Bahan'],
+        hide_index=True,
+        use_container_width=True,
+        key='kandidat_optimasi'
+    )
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        tujuan = st.radio("Tujuan Optimasi", options=list(OPTIMIZER_OBJECTIVES))
+    with col2:
+        toleransi = st.slider("Toleransi Gizi (±%)", min_value=1, max_value=50, value=10)
+    with col3:
+        porsi_akg = st.slider("Porsi Target dari AKG Harian (%)", min_value=10, max_value=100, value=100)
+
+    rows = [ingredient_table.index[nama] for nama in df_kandidat['Nama Bahan']]
+    columns = [ingredient_table.nutrients.index(c) for c in NUTRIENT_COLUMNS]
+    nutrien_kandidat = ingredient_table.matrix[rows][:, columns].T
+
+    col_satu, col_semua = st.columns(2)
+    with col_satu:
+        generate_satu = st.button(f"⚙️ Generate untuk {target_kelompok_umur}", use_container_width=True)
+    with col_semua:
+        generate_semua = st.button("📋 Generate untuk Semua Kelompok Umur", use_container_width=True)
+
+    if generate_satu or generate_semua:
+        kelompok = df_akg.index.tolist() if generate_semua else [target_kelompok_umur]
+        try:
+            hasil = solve_menus(
+                nutrien_kandidat,
+                df_akg.loc[kelompok, NUTRIENT_COLUMNS].to_numpy(dtype=np.float64) * (porsi_akg / 100.0),
+                df_kandidat['Min (g)'].to_numpy(dtype=np.float64),
+                df_kandidat['Maks (g)'].to_numpy(dtype=np.float64),
+                cost=df_kandidat['Harga (Rp/100 g)'].to_numpy(dtype=np.float64),
+                tolerance=toleransi / 100.0,
+                objective=OPTIMIZER_OBJECTIVES[tujuan],
+            )
+        except ValueError as e:
+            st.error(f"Optimasi gagal: {e}")
+        else:
+            st.session_state.menu_optimasi = {
+                'kelompok': kelompok,
+                'bahan': df_kandidat['Nama Bahan'].tolist(),
+                'hasil': hasil,
+                'porsi_akg': porsi_akg,
+                'biaya': hasil.weights @ df_kandidat['Harga (Rp/100 g)'].to_numpy(dtype=np.float64) / 100.0,
+            }
+
+    optimasi = st.session_state.get('menu_optimasi')
+    if optimasi and optimasi['bahan'] == df_kandidat['Nama Bahan'].tolist():
+        hasil = optimasi['hasil']
+        df_hasil = pd.DataFrame(hasil.weights.round(0), index=optimasi['kelompok'], columns=optimasi['bahan'])
+        df_hasil['Biaya (Rp)'] = optimasi['biaya']
+        for i, nutrien in enumerate(NUTRIENT_COLUMNS):
+            df_hasil[f"{nutrien} (% AKG)"] = (1.0 + hasil.deviation[:, i]) * optimasi['porsi_akg']
+        df_hasil['Sesuai Toleransi'] = np.where(hasil.feasible, '✅', '⚠️')
+        st.dataframe(df_hasil.style.format('{:.0f}', subset=optimasi['bahan'] + ['Biaya (Rp)']).format('{:.1f}', subset=[f"{c} (% AKG)" for c in NUTRIENT_COLUMNS]))
+        if not hasil.feasible.all():
+            st.warning("⚠️ Sebagian target tidak dapat dipenuhi dalam toleransi. Tambah bahan kandidat, longgarkan batas porsi, atau perbesar toleransi.")
+
+        kelompok_dipakai = st.selectbox("Kelompok Umur untuk Menu", options=optimasi['kelompok'], key='kelompok_optimasi')
+        if st.button("📥 Gunakan Menu Ini", type="primary"):
+            menu_plan.clear()
+            for nama, berat in zip(optimasi['bahan'], df_hasil.loc[kelompok_dipakai, optimasi['bahan']]):
+                if berat > 0:
+                    menu_plan.add(nama, float(berat))
+            st.rerun()
@@ -1,11 +1,15 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import numpy as np
 from datetime import datetime, timedelta, date
 import random
+import threading
+import queue
+import time
+from collections import deque
+import hashlib
+import os
+from pathlib import Path
 
 # Konfigurasi halaman
 st.set_page_config(
@@ -104,89 +108,355 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Daftar entitas dasar untuk data dummy
+PRODUCERS = ['Katering Sehat Bandung', 'Nutrisi Prima', 'Makanan Bergizi Nusantara']
+SCHOOLS = ['SDN Bandung 1', 'SMP Negeri 5', 'SMA Negeri 3']
+
+def entity_names(base_names, n, prefix):
+    """Ambil n nama entitas, ditambah nama sintetis jika n melebihi daftar dasar"""
+    names = list(base_names[:n])
+    names.extend(f"{prefix} {i}" for i in range(len(names) + 1, n + 1))
+    return names
+
+def build_quality_columns(n_days=30, n_producers=3, n_schools=3, seed=None, end_date=None):
+    """Bangun kolom data kualitas secara vektor (NumPy) untuk setiap tanggal x produsen x sekolah"""
+    rng = np.random.default_rng(seed)
+    if end_date is None:
+        end_date = datetime.now()
+    
+    producers = entity_names(PRODUCERS, n_producers, 'Produsen')
+    schools = entity_names(SCHOOLS, n_schools, 'Sekolah')
+    days = [(end_date - timedelta(days=x)).strftime('%Y-%m-%d') for x in range(n_days, 0, -1)]
+    
+    # Urutan baris sama dengan loop lama: tanggal -> produsen -> sekolah.
+    # Kolom teks disimpan sebagai kategori (kode integer) agar hemat memori.
+    per_day = len(producers) * len(schools)
+    n = len(days) * per_day
+    day_codes = np.repeat(np.arange(len(days)), per_day)
+    producer_codes = np.tile(np.repeat(np.arange(len(producers)), len(schools)), len(days))
+    school_codes = np.tile(np.arange(len(schools)), len(days) * len(producers))
+    
+    # Simulasi data kualitas
+    freshness_score = rng.uniform(6, 10, n)
+    delivery_time = rng.uniform(30, 180, n)  # menit
+    temperature = rng.uniform(15, 45, n)  # celsius
+    
+    # Logika untuk menentukan status basi
+    is_spoiled = (freshness_score < 7) | (delivery_time > 120) | (temperature > 35)
+    
+    return {
+        'date': pd.Categorical.from_codes(day_codes, categories=days),
+        'producer': pd.Categorical.from_codes(producer_codes, categories=producers),
+        'school': pd.Categorical.from_codes(school_codes, categories=schools),
+        'freshness_score': freshness_score,
+        'delivery_time_minutes': delivery_time,
+        'temperature_celsius': temperature,
+        'is_spoiled': is_spoiled,
+        'batch_size': rng.integers(50, 201, n),
+        'complaints': rng.integers(0, np.where(is_spoiled, 6, 2))
+    }
+
+# Snapshot data di disk (Arrow IPC) agar replika baru tidak perlu membangun ulang data
+SNAPSHOT_DIR = Path(__file__).resolve().parent / '.snapshots'
+SNAPSHOT_VERSION = 1
+SNAPSHOT_MAX_AGE = timedelta(hours=12)
+
+def snapshot_path(name, params):
+    """Path file snapshot untuk loader `name` dengan parameter `params`"""
+    key = hashlib.md5(repr(params).encode()).hexdigest()[:12]
+    return SNAPSHOT_DIR / f"{name}_v{SNAPSHOT_VERSION}_{key}.arrow"
+
+def read_snapshot(name, params):
+    """Baca snapshot via memory-map; None jika belum ada, kadaluarsa, atau pyarrow tidak tersedia
+
+    Kolom numerik menjadi view read-only ke file yang di-memory-map (tanpa salinan);
+    hanya kolom teks yang dimuat ke memori.
+    """
+    path = snapshot_path(name, params)
+    try:
+        from pyarrow import feather
+        mtime = path.stat().st_mtime
+    except (ImportError, OSError):
+        return None
+    
+    # Kadaluarsa bila lebih lama dari kode dashboard atau melewati umur maksimum
+    if mtime < Path(__file__).stat().st_mtime:
+        return None
+    if datetime.now() - datetime.fromtimestamp(mtime) > SNAPSHOT_MAX_AGE:
+        return None
+    
+    try:
+        # split_blocks: satu blok per kolom, jadi pandas tidak menggabung (menyalin) kolom
+        return feather.read_table(path, memory_map=True).to_pandas(split_blocks=True)
+    except Exception:
+        return None
+
+def write_snapshot(name, params, df):
+    """Tulis snapshot tanpa kompresi (agar bisa di-memory-map) secara atomik"""
+    try:
+        from pyarrow import feather
+        SNAPSHOT_DIR.mkdir(exist_ok=True)
+        path = snapshot_path(name, params)
+        tmp_path = path.with_suffix(f'.tmp{os.getpid()}')
+        feather.write_feather(df, tmp_path, compression='uncompressed')
+        os.replace(tmp_path, path)
+    except (ImportError, OSError):
+        pass
+
+def load_with_snapshot(name, params, builder):
+    """Ambil DataFrame dari snapshot, atau bangun dengan `builder()` lalu simpan snapshot-nya"""
+    df = read_snapshot(name, params)
+    if df is None:
+        df = builder()
+        write_snapshot(name, params, df)
+    return df
+
+# Semua frame data diurutkan pada DatetimeIndex bernama 'day' (tanggal, tanpa jam)
+DATE_INDEX = 'day'
+
+def with_date_index(df, column='date'):
+    """Pasang DatetimeIndex dari kolom tanggal dan pastikan frame terurut"""
+    dates = df[column]
+    if isinstance(dates.dtype, pd.CategoricalDtype):
+        # Parse kategori sekali saja, lalu petakan via kode
+        days = pd.DatetimeIndex(pd.to_datetime(dates.cat.categories)).take(dates.cat.codes.to_numpy())
+    else:
+        days = pd.DatetimeIndex(pd.to_datetime(dates))
+    df = df.set_index(days.normalize().rename(DATE_INDEX))
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index(kind='stable')
+    return df
+
+def slice_date_range(df, start, end):
+    """Ambil baris dengan tanggal dalam [start, end] lewat binary search pada DatetimeIndex"""
+    index = df.index
+    lo = index.searchsorted(pd.Timestamp(start), side='left')
+    hi = index.searchsorted(pd.Timestamp(end) + pd.Timedelta(days=1), side='left')
+    return df.iloc[lo:hi]
+
 # Inisialisasi data dummy untuk dashboard
-@st.cache_data
-def generate_sample_data():
-    """Generate data sampel untuk dashboard"""
-    
-    # Data kualitas makanan dalam 30 hari terakhir
-    dates = [datetime.now() - timedelta(days=x) for x in range(30, 0, -1)]
-    
-    quality_data = []
-    for date in dates:
-        for producer in ['Katering Sehat Bandung', 'Nutrisi Prima', 'Makanan Bergizi Nusantara']:
-            for school in ['SDN Bandung 1', 'SMP Negeri 5', 'SMA Negeri 3']:
-                # Simulasi data kualitas
-                freshness_score = random.uniform(6, 10)
-                delivery_time = random.uniform(30, 180)  # menit
-                temperature = random.uniform(15, 45)  # celsius
-                
-                # Logika untuk menentukan status basi
-                is_spoiled = (
-                    freshness_score < 7 or 
-                    delivery_time > 120 or 
-                    temperature > 35
-                )
-                
-                quality_data.append({
-                    'date': date.strftime('%Y-%m-%d'),
-                    'producer': producer,
-                    'school': school,
-                    'freshness_score': freshness_score,
-                    'delivery_time_minutes': delivery_time,
-                    'temperature_celsius': temperature,
-                    'is_spoiled': is_spoiled,
-                    'batch_size': random.randint(50, 200),
-                    'complaints': random.randint(0, 5) if is_spoiled else random.randint(0, 1)
-                })
-    
-    return pd.DataFrame(quality_data)
+@st.cache_resource
+def load_sample_data(n_days, n_producers, n_schools, seed):
+    """Frame data kualitas bersama (satu per proses); jangan diubah, pakai generate_sample_data()"""
+    
+    # Data kualitas makanan dalam n_days hari terakhir
+    quality_df = load_with_snapshot(
+        'quality', (n_days, n_producers, n_schools, seed),
+        lambda: pd.DataFrame(build_quality_columns(n_days, n_producers, n_schools, seed))
+    )
+    return with_date_index(quality_df)
 
-@st.cache_data
-def generate_delivery_data():
-    """Generate data pengiriman detail"""
+def generate_sample_data(n_days=30, n_producers=3, n_schools=3, seed=None):
+    """Generate data sampel untuk dashboard
     
-    delivery_stages = [
-        'Persiapan di Dapur',
-        'Packaging',
-        'Loading ke Kendaraan',
-        'Perjalanan',
-        'Unloading',
-        'Distribusi'
-    ]
+    Mengembalikan salinan dangkal frame bersama: data tidak disalin, tetapi karena
+    copy-on-write perubahan pada frame ini tidak pernah terlihat oleh sesi lain.
+    """
+    return load_sample_data(n_days, n_producers, n_schools, seed).copy(deep=False)
+
+DELIVERY_STAGES = [
+    'Persiapan di Dapur',
+    'Packaging',
+    'Loading ke Kendaraan',
+    'Perjalanan',
+    'Unloading',
+    'Distribusi'
+]
+
+NS_PER_MINUTE = 60 * 10**9
+NS_PER_DAY = 24 * 60 * NS_PER_MINUTE
+
+def batch_label(number):
+    """Nomor batch -> ID batch seperti di data asli ('BATCH_001')"""
+    return f"BATCH_{number:03d}"
+
+def batch_number(label):
+    return int(label.rsplit('_', 1)[1])
+
+class DeliveryEventStore:
+    """Penyimpanan event tahapan pengiriman berbasis kolom NumPy
     
-    delivery_data = []
-    for i in range(100):  # 100 batch pengiriman
-        start_time = datetime.now() - timedelta(days=random.randint(1, 30))
-        current_time = start_time
-        
-        batch_id = f"BATCH_{i+1:03d}"
-        producer = random.choice(['Katering Sehat Bandung', 'Nutrisi Prima', 'Makanan Bergizi Nusantara'])
-        school = random.choice(['SDN Bandung 1', 'SMP Negeri 5', 'SMA Negeri 3'])
-        
-        total_duration = 0
-        for stage in delivery_stages:
-            duration = random.uniform(10, 45)  # durasi per tahap dalam menit
-            total_duration += duration
-            
-            delivery_data.append({
-                'batch_id': batch_id,
-                'producer': producer,
-                'school': school,
-                'stage': stage,
-                'duration_minutes': duration,
-                'timestamp': current_time,
-                'total_duration_so_far': total_duration,
-                'date': start_time.strftime('%Y-%m-%d')
-            })
+    Produsen, sekolah dan tahapan disimpan sebagai kode kategori, nomor batch
+    sebagai int32 dan timestamp sebagai int64 (nanodetik). Kolom tumbuh dengan kapasitas berlipat sehingga
+    batch baru bisa ditambahkan tanpa membangun ulang seluruh tabel. Di `to_frame()` nomor batch
+    tampil kembali sebagai `batch_id` ('BATCH_001', ...) sesuai skema ekspor CSV.
+    """
+    
+    _dtypes = {
+        'batch': np.int32,
+        'producer': np.int16,
+        'school': np.int32,
+        'stage': np.int8,
+        'duration': np.float64,
+        'timestamp': np.int64,
+        'total_duration': np.float64,
+        'day': np.int32
+    }
+    
+    def __init__(self, producers, schools, stages=DELIVERY_STAGES, capacity=1024):
+        self.producers = list(producers)
+        self.schools = list(schools)
+        self.stages = list(stages)
+        self.n_batches = 0
+        self._size = 0
+        self._cols = {name: np.empty(capacity, dtype=dtype) for name, dtype in self._dtypes.items()}
+        self._frame = None
+        self._lock = threading.Lock()
+    
+    def __len__(self):
+        return self._size
+    
+    def _reserve(self, extra):
+        """Perbesar kapasitas kolom (x2) bila tidak cukup untuk `extra` event"""
+        needed = self._size + extra
+        capacity = len(self._cols['batch'])
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name, col in self._cols.items():
+            grown = np.empty(capacity, dtype=col.dtype)
+            grown[:self._size] = col[:self._size]
+            self._cols[name] = grown
+    
+    def append_batches(self, producer_codes, school_codes, start_ns, durations):
+        """Tambahkan batch baru; `durations` berbentuk (jumlah batch, jumlah tahapan) dalam menit"""
+        durations = np.asarray(durations, dtype=np.float64)
+        n_batches, n_stages = durations.shape
+        n_events = n_batches * n_stages
+        
+        # Cumsum per batch (grouped cumsum) -> total durasi & offset waktu tiap tahapan
+        total = np.cumsum(durations, axis=1)
+        offsets = ((total - durations) * NS_PER_MINUTE).astype(np.int64)
+        start_ns = np.asarray(start_ns, dtype=np.int64)
+        
+        with self._lock:
+            first_batch = self.n_batches
+            self.n_batches += n_batches
             
-            current_time += timedelta(minutes=duration)
+            self._reserve(n_events)
+            sl = slice(self._size, self._size + n_events)
+            cols = self._cols
+            cols['batch'][sl] = np.repeat(np.arange(first_batch + 1, first_batch + n_batches + 1), n_stages)
+            cols['producer'][sl] = np.repeat(producer_codes, n_stages)
+            cols['school'][sl] = np.repeat(school_codes, n_stages)
+            cols['stage'][sl] = np.tile(np.arange(n_stages), n_batches)
+            cols['duration'][sl] = durations.ravel()
+            cols['timestamp'][sl] = (start_ns[:, None] + offsets).ravel()
+            cols['total_duration'][sl] = total.ravel()
+            cols['day'][sl] = np.repeat(start_ns // NS_PER_DAY, n_stages)
+            self._size += n_events
     
-    return pd.DataFrame(delivery_data)
+    def append_simulated(self, n_batches, rng, now=None):
+        """Simulasikan batch pengiriman baru dalam 30 hari terakhir"""
+        now_ns = np.datetime64(now or datetime.now(), 'ns').astype(np.int64)
+        start_ns = now_ns - rng.integers(1, 31, n_batches) * NS_PER_DAY
+        self.append_batches(
+            rng.integers(0, len(self.producers), n_batches),
+            rng.integers(0, len(self.schools), n_batches),
+            start_ns,
+            rng.uniform(10, 45, (n_batches, len(self.stages)))  # durasi per tahap dalam menit
+        )
+    
+    @classmethod
+    def from_frame(cls, frame):
+        """Bangun store dari DataFrame hasil `to_frame()` (misalnya dari snapshot)"""
+        store = cls(
+            frame['producer'].cat.categories,
+            frame['school'].cat.categories,
+            frame['stage'].cat.categories,
+            capacity=max(len(frame), 1)
+        )
+        date_codes = frame['date'].cat.codes.to_numpy()
+        category_days = pd.to_datetime(frame['date'].cat.categories).as_unit('ns').asi8 // NS_PER_DAY
+        
+        size = len(frame)
+        cols = store._cols
+        batch_numbers = np.array([batch_number(c) for c in frame['batch_id'].cat.categories], dtype=np.int32)
+        cols['batch'][:size] = batch_numbers[frame['batch_id'].cat.codes.to_numpy()]
+        cols['producer'][:size] = frame['producer'].cat.codes.to_numpy()
+        cols['school'][:size] = frame['school'].cat.codes.to_numpy()
+        cols['stage'][:size] = frame['stage'].cat.codes.to_numpy()
+        cols['duration'][:size] = frame['duration_minutes'].to_numpy()
+        cols['timestamp'][:size] = frame['timestamp'].to_numpy().astype('datetime64[ns]').view(np.int64)
+        cols['total_duration'][:size] = frame['total_duration_so_far'].to_numpy()
+        cols['day'][:size] = category_days[date_codes]
+        store._size = size
+        store.n_batches = int(cols['batch'][:size].max()) if size else 0
+        return store
+    
+    def to_frame(self):
+        """Tampilkan isi store sebagai DataFrame terurut per tanggal mulai batch (di-cache sampai append berikutnya)
+        
+        Yang dikembalikan salinan dangkal frame cache, jadi perubahan oleh pemanggil (copy-on-write)
+        tidak mengubah frame yang dipakai sesi lain.
+        """
+        with self._lock:
+            n = self._size
+            if self._frame is not None and len(self._frame) == n:
+                return self._frame.copy(deep=False)
+            cols = {name: col[:n] for name, col in self._cols.items()}
+            n_batches = self.n_batches
+        
+        # Tanggal mulai sebagai kategori: kode = hari sejak tanggal paling awal
+        day = cols['day']
+        first_day = int(day.min()) if n else 0
+        n_days = int(day.max()) - first_day + 1 if n else 0
+        day_labels = pd.date_range(
+            pd.Timestamp(first_day * NS_PER_DAY), periods=n_days, freq='D'
+        ).strftime('%Y-%m-%d')
+        
+        # Urutkan stabil per hari (urutan tahapan dalam batch tetap terjaga)
+        day_codes = day - first_day
+        if n and (np.diff(day_codes) < 0).any():
+            order = np.argsort(day_codes, kind='stable')
+            cols = {name: col[order] for name, col in cols.items()}
+            day_codes = day_codes[order]
+        day_index = pd.DatetimeIndex(
+            ((day_codes.astype(np.int64) + first_day) * NS_PER_DAY).view('datetime64[ns]'),
+            name=DATE_INDEX
+        )
+        
+        # Label batch dibuat sekali per batch (kategori), bukan per event
+        frame = pd.DataFrame({
+            'batch_id': pd.Categorical.from_codes(
+                cols['batch'] - 1, categories=[batch_label(i) for i in range(1, n_batches + 1)]
+            ),
+            'producer': pd.Categorical.from_codes(cols['producer'], categories=self.producers),
+            'school': pd.Categorical.from_codes(cols['school'], categories=self.schools),
+            'stage': pd.Categorical.from_codes(cols['stage'], categories=self.stages),
+            'duration_minutes': cols['duration'],
+            'timestamp': cols['timestamp'].view('datetime64[ns]'),
+            'total_duration_so_far': cols['total_duration'],
+            'date': pd.Categorical.from_codes(day_codes, categories=day_labels)
+        }, index=day_index)
+        self._frame = frame
+        return frame.copy(deep=False)
+
+@st.cache_resource
+def get_delivery_store(n_batches=100, seed=None):
+    """Store event pengiriman bersama (satu per proses)"""
+    params = (n_batches, seed)
+    snapshot = read_snapshot('delivery', params)
+    if snapshot is not None:
+        return DeliveryEventStore.from_frame(snapshot)
+    
+    store = DeliveryEventStore(PRODUCERS, SCHOOLS)
+    store.append_simulated(n_batches, np.random.default_rng(seed))
+    write_snapshot('delivery', params, store.to_frame())
+    return store
+
+def generate_delivery_data(n_batches=100, seed=None):
+    """Generate data pengiriman detail"""
+    return get_delivery_store(n_batches, seed).to_frame()
 
 @st.cache_data
 def generate_spoilage_reasons():
     """Generate data alasan makanan basi"""
+    return with_date_index(load_with_snapshot('spoilage', (), build_spoilage_reasons))
+
+def build_spoilage_reasons():
+    """Bangun data alasan makanan basi"""
     
     reasons = [
         'Suhu penyimpanan terlalu tinggi',
@@ -221,8 +491,95 @@ def generate_spoilage_reasons():
     
     return pd.DataFrame(spoilage_data)
 
+# Batas jumlah titik untuk grafik sebaran (scatter/histogram/box)
+MAX_PLOT_POINTS = 5000
+
+# Rollup cube: statistik cukup per (tanggal, produsen, sekolah)
+CUBE_DIMENSIONS = ['date', 'producer', 'school']
+CUBE_SUM_STATS = [
+    'n', 'spoiled', 'complaints',
+    'delivery_sum', 'delivery_sq', 'temp_sum', 'temp_sq', 'fresh_sum', 'fresh_sq'
+]
+CUBE_MAX_STATS = ['delivery_max']
+
+def build_rollup_cube(quality_df):
+    """Bangun rollup cube (count, jumlah & jumlah kuadrat) dari data kualitas"""
+    df = quality_df.assign(
+        delivery_sq=quality_df['delivery_time_minutes'] ** 2,
+        temp_sq=quality_df['temperature_celsius'] ** 2,
+        fresh_sq=quality_df['freshness_score'] ** 2
+    )
+    return df.groupby(CUBE_DIMENSIONS, observed=True).agg(
+        n=('is_spoiled', 'size'),
+        spoiled=('is_spoiled', 'sum'),
+        complaints=('complaints', 'sum'),
+        delivery_sum=('delivery_time_minutes', 'sum'),
+        delivery_sq=('delivery_sq', 'sum'),
+        delivery_max=('delivery_time_minutes', 'max'),
+        temp_sum=('temperature_celsius', 'sum'),
+        temp_sq=('temp_sq', 'sum'),
+        fresh_sum=('freshness_score', 'sum'),
+        fresh_sq=('fresh_sq', 'sum')
+    ).reset_index()
+
+@st.cache_resource
+def load_quality_cube():
+    """Rollup cube data kualitas (dibangun sekali per proses)"""
+    return with_date_index(build_rollup_cube(generate_sample_data()))
+
+def rollup(cube, by):
+    """Agregasi ulang cube ke dimensi `by`; 'month' dan 'day_of_week' diturunkan dari tanggal"""
+    agg = {stat: 'sum' for stat in CUBE_SUM_STATS}
+    agg.update({stat: 'max' for stat in CUBE_MAX_STATS})
+    
+    if by in ('month', 'day_of_week'):
+        # Rollup ke tanggal dulu (O(cell)), lalu ke bulan/hari (O(hari))
+        daily = cube.groupby(level=DATE_INDEX).agg(agg)
+        days = daily.index
+        key = days.strftime('%Y-%m') if by == 'month' else days.day_name()
+        return daily.groupby(key.rename(by)).agg(agg)
+    
+    return cube.groupby(by, observed=True).agg(agg)
+
+SUMMARY_LABELS = {
+    'total_batches': 'Total Batch',
+    'spoiled_batches': 'Batch Basi',
+    'spoilage_rate': 'Tingkat Kebusukan (%)',
+    'avg_delivery_time': 'Rata-rata Waktu Kirim',
+    'max_delivery_time': 'Waktu Kirim Terlama',
+    'avg_temperature': 'Rata-rata Suhu',
+    'avg_freshness': 'Rata-rata Kesegaran',
+    'complaints': 'Total Keluhan'
+}
+
+def summarize(rolled):
+    """Turunkan rata-rata, simpangan baku dan tingkat kebusukan dari statistik cukup"""
+    n = rolled['n']
+    delivery_var = (rolled['delivery_sq'] - rolled['delivery_sum'] ** 2 / n) / (n - 1)
+    return pd.DataFrame({
+        'total_batches': n,
+        'spoiled_batches': rolled['spoiled'],
+        'spoilage_rate': rolled['spoiled'] / n * 100,
+        'avg_delivery_time': rolled['delivery_sum'] / n,
+        'std_delivery_time': np.sqrt(delivery_var.clip(lower=0)),
+        'max_delivery_time': rolled['delivery_max'],
+        'avg_temperature': rolled['temp_sum'] / n,
+        'avg_freshness': rolled['fresh_sum'] / n,
+        'complaints': rolled['complaints']
+    }, index=rolled.index)
+
+def linear_trend_forecast(y, horizon):
+    """Prediksi `horizon` titik berikutnya dari garis tren least squares (NumPy, tanpa sklearn)"""
+    x = np.arange(len(y))
+    slope, intercept = np.polyfit(x, y, 1)
+    return intercept + slope * np.arange(len(y), len(y) + horizon)
+
 def main_dashboard():
     """Dashboard utama"""
+    # Plotly baru dimuat saat halaman grafik dibuka, bukan saat start aplikasi
+    import plotly.express as px
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
     
     st.markdown('''
     <div class="main-header">
@@ -234,6 +591,7 @@ def main_dashboard():
     
     # Load data
     quality_df = generate_sample_data()
+    quality_cube = load_quality_cube()
     delivery_df = generate_delivery_data()
     spoilage_df = generate_spoilage_reasons()
     
@@ -249,38 +607,60 @@ def main_dashboard():
         
         selected_producers = st.multiselect(
             "Pilih Produsen:",
-            quality_df['producer'].unique(),
-            default=quality_df['producer'].unique()
+            quality_cube['producer'].unique(),
+            default=quality_cube['producer'].unique()
         )
         
         selected_schools = st.multiselect(
             "Pilih Sekolah:",
-            quality_df['school'].unique(),
-            default=quality_df['school'].unique()
+            quality_cube['school'].unique(),
+            default=quality_cube['school'].unique()
         )
         
+        # Rentang tanggal: binary search pada DatetimeIndex yang terurut
+        if isinstance(date_range, (tuple, list)) and len(date_range) == 2:
+            start_date, end_date = date_range
+        else:
+            start_date = end_date = date_range[0] if isinstance(date_range, (tuple, list)) else date_range
+        quality_df = slice_date_range(quality_df, start_date, end_date)
+        quality_cube = slice_date_range(quality_cube, start_date, end_date)
+        delivery_df = slice_date_range(delivery_df, start_date, end_date)
+        spoilage_df = slice_date_range(spoilage_df, start_date, end_date)
+        
         st.markdown("---")
         st.markdown("### 📈 Quick Stats")
         
-        total_batches = len(quality_df)
-        spoiled_batches = len(quality_df[quality_df['is_spoiled'] == True])
-        spoilage_rate = (spoiled_batches / total_batches) * 100
+        total_batches = int(quality_cube['n'].sum())
+        spoiled_batches = int(quality_cube['spoiled'].sum())
+        spoilage_rate = (spoiled_batches / total_batches) * 100 if total_batches else 0.0
         
         st.metric("Total Batch", total_batches)
         st.metric("Makanan Basi", spoiled_batches)
         st.metric("Tingkat Kebusukan", f"{spoilage_rate:.1f}%")
     
-    # Filter data berdasarkan sidebar
+    # Filter data berdasarkan sidebar (agregat dari cube, baris mentah hanya untuk grafik sebaran)
+    filtered_cube = quality_cube[
+        (quality_cube['producer'].isin(selected_producers)) &
+        (quality_cube['school'].isin(selected_schools))
+    ]
     filtered_quality = quality_df[
         (quality_df['producer'].isin(selected_producers)) &
         (quality_df['school'].isin(selected_schools))
     ]
+    plot_quality = filtered_quality
+    if len(plot_quality) > MAX_PLOT_POINTS:
+        plot_quality = plot_quality.sample(MAX_PLOT_POINTS, random_state=0)
+    
+    filtered_n = filtered_cube['n'].sum()
+    if filtered_n == 0:
+        st.warning("Tidak ada data untuk filter yang dipilih.")
+        return
     
     # Key Metrics Row
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        total_batches = len(filtered_quality)
+        total_batches = int(filtered_n)
         st.markdown(f'''
         <div class="metric-card">
             <h3>📦 Total Batch</h3>
@@ -290,7 +670,7 @@ def main_dashboard():
         ''', unsafe_allow_html=True)
     
     with col2:
-        spoiled_count = len(filtered_quality[filtered_quality['is_spoiled'] == True])
+        spoiled_count = int(filtered_cube['spoiled'].sum())
         st.markdown(f'''
         <div class="metric-card">
             <h3>🦠 Makanan Basi</h3>
@@ -300,7 +680,7 @@ def main_dashboard():
         ''', unsafe_allow_html=True)
     
     with col3:
-        avg_delivery = filtered_quality['delivery_time_minutes'].mean()
+        avg_delivery = filtered_cube['delivery_sum'].sum() / filtered_n
         st.markdown(f'''
         <div class="metric-card">
             <h3>⏱️ Rata-rata Pengiriman</h3>
@@ -358,14 +738,9 @@ def main_dashboard():
         
         with col1:
             # Spoilage rate by producer
-            spoilage_by_producer = filtered_quality.groupby('producer').agg({
-                'is_spoiled': ['count', 'sum']
-            }).round(2)
-            spoilage_by_producer.columns = ['total_batches', 'spoiled_batches']
-            spoilage_by_producer['spoilage_rate'] = (
-                spoilage_by_producer['spoiled_batches'] / 
-                spoilage_by_producer['total_batches'] * 100
-            )
+            spoilage_by_producer = summarize(rollup(filtered_cube, 'producer'))[
+                ['total_batches', 'spoiled_batches', 'spoilage_rate']
+            ]
             spoilage_by_producer = spoilage_by_producer.reset_index()
             
             fig1 = px.bar(
@@ -386,7 +761,7 @@ def main_dashboard():
         with col2:
             # Temperature vs Spoilage
             fig2 = px.scatter(
-                filtered_quality,
+                plot_quality,
                 x='temperature_celsius',
                 y='freshness_score',
                 color='is_spoiled',
@@ -400,8 +775,9 @@ def main_dashboard():
             st.plotly_chart(fig2, use_container_width=True)
         
         # Heatmap quality by school and producer
-        pivot_data = filtered_quality.groupby(['school', 'producer'])['is_spoiled'].mean().reset_index()
-        pivot_table = pivot_data.pivot(index='school', columns='producer', values='is_spoiled')
+        pivot_data = rollup(filtered_cube, ['school', 'producer'])
+        pivot_data['is_spoiled'] = pivot_data['spoiled'] / pivot_data['n']
+        pivot_table = pivot_data.reset_index().pivot(index='school', columns='producer', values='is_spoiled')
         
         fig3 = px.imshow(
             pivot_table,
@@ -423,7 +799,7 @@ def main_dashboard():
         with col1:
             # Delivery time distribution
             fig4 = px.histogram(
-                filtered_quality,
+                plot_quality,
                 x='delivery_time_minutes',
                 nbins=20,
                 title="📊 Distribusi Waktu Pengiriman",
@@ -444,7 +820,7 @@ def main_dashboard():
         with col2:
             # Box plot delivery time by producer
             fig5 = px.box(
-                filtered_quality,
+                plot_quality,
                 x='producer',
                 y='delivery_time_minutes',
                 title="📦 Waktu Pengiriman per Produsen"
@@ -458,28 +834,31 @@ def main_dashboard():
         # Detailed delivery stages analysis
         st.markdown("### 🔍 Analisis Detail Tahapan Pengiriman")
         
-        stage_analysis = delivery_df.groupby('stage')['duration_minutes'].agg(['mean', 'std', 'min', 'max']).round(1)
-        stage_analysis = stage_analysis.reset_index()
-        
-        fig6 = px.bar(
-            stage_analysis,
-            x='stage',
-            y='mean',
-            error_y='std',
-            title="⏱️ Rata-rata Durasi per Tahapan Pengiriman",
-            color='mean',
-            color_continuous_scale='Viridis'
-        )
-        fig6.update_layout(
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            xaxis_tickangle=-45
-        )
-        st.plotly_chart(fig6, use_container_width=True)
+        if delivery_df.empty:
+            st.info("Tidak ada data tahapan pengiriman pada rentang tanggal ini.")
+        else:
+            stage_analysis = delivery_df.groupby('stage', observed=True)['duration_minutes'].agg(['mean', 'std', 'min', 'max']).round(1)
+            stage_analysis = stage_analysis.reset_index()
+        
+            fig6 = px.bar(
+                stage_analysis,
+                x='stage',
+                y='mean',
+                error_y='std',
+                title="⏱️ Rata-rata Durasi per Tahapan Pengiriman",
+                color='mean',
+                color_continuous_scale='Viridis'
+            )
+            fig6.update_layout(
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)',
+                xaxis_tickangle=-45
+            )
+            st.plotly_chart(fig6, use_container_width=True)
         
         # Delivery time trend
-        daily_delivery = filtered_quality.groupby('date')['delivery_time_minutes'].mean().reset_index()
-        daily_delivery['date'] = pd.to_datetime(daily_delivery['date'])
+        daily_delivery = summarize(rollup(filtered_cube, DATE_INDEX))['avg_delivery_time']
+        daily_delivery = daily_delivery.rename('delivery_time_minutes').rename_axis('date').reset_index()
         
         fig7 = px.line(
             daily_delivery,
@@ -503,59 +882,62 @@ def main_dashboard():
     with tab3:
         st.subheader("🔍 Root Cause Analysis - Penyebab Makanan Basi")
         
-        col1, col2 = st.columns(2)
+        if spoilage_df.empty:
+            st.info("Tidak ada kasus makanan basi pada rentang tanggal ini.")
+        else:
+            col1, col2 = st.columns(2)
         
-        with col1:
-            # Top reasons for spoilage
-            reason_counts = spoilage_df['reason'].value_counts().head(8)
+            with col1:
+                # Top reasons for spoilage
+                reason_counts = spoilage_df['reason'].value_counts().head(8)
             
-            fig8 = px.bar(
-                x=reason_counts.values,
-                y=reason_counts.index,
-                orientation='h',
-                title="🎯 Penyebab Utama Makanan Basi",
-                color=reason_counts.values,
-                color_continuous_scale='Reds'
-            )
-            fig8.update_layout(
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                height=400
-            )
-            st.plotly_chart(fig8, use_container_width=True)
+                fig8 = px.bar(
+                    x=reason_counts.values,
+                    y=reason_counts.index,
+                    orientation='h',
+                    title="🎯 Penyebab Utama Makanan Basi",
+                    color=reason_counts.values,
+                    color_continuous_scale='Reds'
+                )
+                fig8.update_layout(
+                    plot_bgcolor='rgba(0,0,0,0)',
+                    paper_bgcolor='rgba(0,0,0,0)',
+                    height=400
+                )
+                st.plotly_chart(fig8, use_container_width=True)
         
-        with col2:
-            # Impact level distribution
-            impact_dist = spoilage_df['impact_level'].value_counts()
+            with col2:
+                # Impact level distribution
+                impact_dist = spoilage_df['impact_level'].value_counts()
             
-            fig9 = px.pie(
-                values=impact_dist.values,
-                names=impact_dist.index,
-                title="📊 Distribusi Tingkat Dampak",
-                color_discrete_sequence=['#ff6b6b', '#feca57', '#48dbfb']
+                fig9 = px.pie(
+                    values=impact_dist.values,
+                    names=impact_dist.index,
+                    title="📊 Distribusi Tingkat Dampak",
+                    color_discrete_sequence=['#ff6b6b', '#feca57', '#48dbfb']
+                )
+                fig9.update_layout(
+                    plot_bgcolor='rgba(0,0,0,0)',
+                    paper_bgcolor='rgba(0,0,0,0)'
+                )
+                st.plotly_chart(fig9, use_container_width=True)
+        
+            # Financial impact analysis
+            financial_by_reason = spoilage_df.groupby('reason')['financial_loss'].sum().sort_values(ascending=False).head(8)
+        
+            fig10 = px.bar(
+                x=financial_by_reason.index,
+                y=financial_by_reason.values / 1000000,  # Convert to millions
+                title="💰 Kerugian Finansial per Penyebab (Juta Rupiah)",
+                color=financial_by_reason.values,
+                color_continuous_scale='Reds'
             )
-            fig9.update_layout(
+            fig10.update_layout(
                 plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)'
+                paper_bgcolor='rgba(0,0,0,0)',
+                xaxis_tickangle=-45
             )
-            st.plotly_chart(fig9, use_container_width=True)
-        
-        # Financial impact analysis
-        financial_by_reason = spoilage_df.groupby('reason')['financial_loss'].sum().sort_values(ascending=False).head(8)
-        
-        fig10 = px.bar(
-            x=financial_by_reason.index,
-            y=financial_by_reason.values / 1000000,  # Convert to millions
-            title="💰 Kerugian Finansial per Penyebab (Juta Rupiah)",
-            color=financial_by_reason.values,
-            color_continuous_scale='Reds'
-        )
-        fig10.update_layout(
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            xaxis_tickangle=-45
-        )
-        st.plotly_chart(fig10, use_container_width=True)
+            st.plotly_chart(fig10, use_container_width=True)
         
         # Correlation analysis
         st.markdown("### 🔗 Analisis Korelasi Faktor-Faktor")
@@ -578,13 +960,10 @@ def main_dashboard():
         st.subheader("📈 Trend Analysis & Prediksi")
         
         # Time series analysis
-        daily_spoilage = filtered_quality.groupby('date').agg({
-            'is_spoiled': ['count', 'sum']
-        }).round(2)
-        daily_spoilage.columns = ['total_batches', 'spoiled_batches']
-        daily_spoilage['spoilage_rate'] = (daily_spoilage['spoiled_batches'] / daily_spoilage['total_batches'] * 100)
-        daily_spoilage = daily_spoilage.reset_index()
-        daily_spoilage['date'] = pd.to_datetime(daily_spoilage['date'])
+        daily_spoilage = summarize(rollup(filtered_cube, DATE_INDEX))[
+            ['total_batches', 'spoiled_batches', 'spoilage_rate']
+        ]
+        daily_spoilage = daily_spoilage.rename_axis('date').reset_index()
         
         # Add moving average
         daily_spoilage['ma_7'] = daily_spoilage['spoilage_rate'].rolling(window=7).mean()
@@ -618,15 +997,9 @@ def main_dashboard():
         
         with col1:
             # Monthly comparison
-            filtered_quality['month'] = pd.to_datetime(filtered_quality['date']).dt.strftime('%Y-%m')
-            monthly_data = filtered_quality.groupby('month').agg({
-                'is_spoiled': ['count', 'sum'],
-                'delivery_time_minutes': 'mean',
-                'temperature_celsius': 'mean'
-            }).round(2)
-            
-            monthly_data.columns = ['total_batches', 'spoiled_batches', 'avg_delivery_time', 'avg_temperature']
-            monthly_data['spoilage_rate'] = (monthly_data['spoiled_batches'] / monthly_data['total_batches'] * 100)
+            monthly_data = summarize(rollup(filtered_cube, 'month'))[
+                ['total_batches', 'spoiled_batches', 'avg_delivery_time', 'avg_temperature', 'spoilage_rate']
+            ].round(2)
             monthly_data = monthly_data.reset_index()
             
             fig13 = px.bar(
@@ -645,20 +1018,10 @@ def main_dashboard():
         
         with col2:
             # Prediction model (simple linear regression)
-            from sklearn.linear_model import LinearRegression
-            
-            # Prepare data for prediction
             daily_spoilage_numeric = daily_spoilage.dropna()
             if len(daily_spoilage_numeric) > 5:
-                X = np.arange(len(daily_spoilage_numeric)).reshape(-1, 1)
-                y = daily_spoilage_numeric['spoilage_rate'].values
-                
-                model = LinearRegression()
-                model.fit(X, y)
-                
                 # Predict next 7 days
-                future_X = np.arange(len(daily_spoilage_numeric), len(daily_spoilage_numeric) + 7).reshape(-1, 1)
-                future_predictions = model.predict(future_X)
+                future_predictions = linear_trend_forecast(daily_spoilage_numeric['spoilage_rate'].values, 7)
                 
                 # Create future dates
                 last_date = daily_spoilage_numeric['date'].max()
@@ -689,11 +1052,11 @@ def main_dashboard():
                 st.plotly_chart(fig14, use_container_width=True)
         
         # Performance metrics by day of week
-        filtered_quality['day_of_week'] = pd.to_datetime(filtered_quality['date']).dt.day_name()
-        daily_performance = filtered_quality.groupby('day_of_week').agg({
-            'is_spoiled': 'mean',
-            'delivery_time_minutes': 'mean',
-            'freshness_score': 'mean'
+        daily_performance = summarize(rollup(filtered_cube, 'day_of_week'))
+        daily_performance = pd.DataFrame({
+            'is_spoiled': daily_performance['spoiled_batches'] / daily_performance['total_batches'],
+            'delivery_time_minutes': daily_performance['avg_delivery_time'],
+            'freshness_score': daily_performance['avg_freshness']
         }).round(2)
         daily_performance = daily_performance.reset_index()
         
@@ -751,8 +1114,8 @@ def main_dashboard():
             </div>
             ''', unsafe_allow_html=True)
             
-            longest_delivery = filtered_quality['delivery_time_minutes'].max()
-            avg_temp = filtered_quality['temperature_celsius'].mean()
+            longest_delivery = filtered_cube['delivery_max'].max()
+            avg_temp = filtered_cube['temp_sum'].sum() / filtered_n
             
             st.markdown(f'''
             <div class="warning-card">
@@ -763,27 +1126,30 @@ def main_dashboard():
             ''', unsafe_allow_html=True)
         
         with col2:
-            top_reason = spoilage_df['reason'].value_counts().index[0]
-            top_reason_count = spoilage_df['reason'].value_counts().iloc[0]
+            if spoilage_df.empty:
+                st.info("Tidak ada kasus makanan basi pada rentang tanggal ini.")
+            else:
+                top_reason = spoilage_df['reason'].value_counts().index[0]
+                top_reason_count = spoilage_df['reason'].value_counts().iloc[0]
             
-            st.markdown(f'''
-            <div class="info-card">
-                <h4>🔍 Penyebab Utama</h4>
-                <p><strong>{top_reason}</strong></p>
-                <p>Terjadi {top_reason_count} kali</p>
-            </div>
-            ''', unsafe_allow_html=True)
+                st.markdown(f'''
+                <div class="info-card">
+                    <h4>🔍 Penyebab Utama</h4>
+                    <p><strong>{top_reason}</strong></p>
+                    <p>Terjadi {top_reason_count} kali</p>
+                </div>
+                ''', unsafe_allow_html=True)
             
-            total_affected = spoilage_df['affected_portions'].sum()
-            avg_loss = spoilage_df['financial_loss'].mean()
+                total_affected = spoilage_df['affected_portions'].sum()
+                avg_loss = spoilage_df['financial_loss'].mean()
             
-            st.markdown(f'''
-            <div class="warning-card">
-                <h4>💰 Dampak Kerugian</h4>
-                <p>Total porsi terbuang: {total_affected:,}</p>  
-                <p>Rata-rata kerugian: Rp {avg_loss/1000000:.1f}M</p>
-            </div>
-            ''', unsafe_allow_html=True)
+                st.markdown(f'''
+                <div class="warning-card">
+                    <h4>💰 Dampak Kerugian</h4>
+                    <p>Total porsi terbuang: {total_affected:,}</p>  
+                    <p>Rata-rata kerugian: Rp {avg_loss/1000000:.1f}M</p>
+                </div>
+                ''', unsafe_allow_html=True)
         
         # Detailed data tables
         st.markdown("### 📊 Tabel Data Detail")
@@ -791,54 +1157,24 @@ def main_dashboard():
         tab5_1, tab5_2, tab5_3 = st.tabs(["🏭 Per Produsen", "🏫 Per Sekolah", "📅 Per Tanggal"])
         
         with tab5_1:
-            producer_summary = filtered_quality.groupby('producer').agg({
-                'is_spoiled': ['count', 'sum', 'mean'],
-                'delivery_time_minutes': ['mean', 'max'],
-                'temperature_celsius': 'mean',
-                'freshness_score': 'mean',
-                'complaints': 'sum'
-            }).round(2)
-            
-            producer_summary.columns = [
-                'Total Batch', 'Batch Basi', 'Tingkat Kebusukan (%)', 
-                'Rata-rata Waktu Kirim', 'Waktu Kirim Terlama',
-                'Rata-rata Suhu', 'Rata-rata Kesegaran', 'Total Keluhan'
-            ]
-            producer_summary['Tingkat Kebusukan (%)'] *= 100
+            producer_summary = summarize(rollup(filtered_cube, 'producer'))
+            producer_summary = producer_summary[list(SUMMARY_LABELS)].rename(columns=SUMMARY_LABELS).round(2)
             
             st.dataframe(producer_summary, use_container_width=True)
         
         with tab5_2:
-            school_summary = filtered_quality.groupby('school').agg({
-                'is_spoiled': ['count', 'sum', 'mean'],
-                'delivery_time_minutes': ['mean', 'max'],
-                'temperature_celsius': 'mean',
-                'freshness_score': 'mean',
-                'complaints': 'sum'
-            }).round(2)
-            
-            school_summary.columns = [
-                'Total Batch', 'Batch Basi', 'Tingkat Kebusukan (%)', 
-                'Rata-rata Waktu Kirim', 'Waktu Kirim Terlama',
-                'Rata-rata Suhu', 'Rata-rata Kesegaran', 'Total Keluhan'
-            ]
-            school_summary['Tingkat Kebusukan (%)'] *= 100
+            school_summary = summarize(rollup(filtered_cube, 'school'))
+            school_summary = school_summary[list(SUMMARY_LABELS)].rename(columns=SUMMARY_LABELS).round(2)
             
             st.dataframe(school_summary, use_container_width=True)
         
         with tab5_3:
-            daily_summary = filtered_quality.groupby('date').agg({
-                'is_spoiled': ['count', 'sum', 'mean'],
-                'delivery_time_minutes': 'mean',
-                'temperature_celsius': 'mean',
-                'freshness_score': 'mean'
-            }).round(2)
-            
-            daily_summary.columns = [
-                'Total Batch', 'Batch Basi', 'Tingkat Kebusukan (%)',
-                'Rata-rata Waktu Kirim', 'Rata-rata Suhu', 'Rata-rata Kesegaran'
+            daily_columns = [
+                'total_batches', 'spoiled_batches', 'spoilage_rate',
+                'avg_delivery_time', 'avg_temperature', 'avg_freshness'
             ]
-            daily_summary['Tingkat Kebusukan (%)'] *= 100
+            daily_summary = summarize(rollup(filtered_cube, 'date'))
+            daily_summary = daily_summary[daily_columns].rename(columns=SUMMARY_LABELS).round(2)
             daily_summary = daily_summary.sort_values('date', ascending=False)
             
             st.dataframe(daily_summary, use_container_width=True)
@@ -857,9 +1193,13 @@ def main_dashboard():
         if avg_temp > 30:
             recommendations.append("🌡️ **Kontrol Suhu**: Suhu rata-rata terlalu tinggi. Tingkatkan sistem pendinginan.")
         
+        recommendations.append(
+            f"🏭 **Fokus pada {worst_producer}**: Produsen dengan tingkat kebusukan tertinggi ({worst_rate:.1f}%)"
+        )
+        if not spoilage_df.empty:
+            recommendations.append(f"🔍 **Atasi {top_reason}**: Penyebab utama kebusukan yang perlu penanganan prioritas")
+        
         recommendations.extend([
-            f"🏭 **Fokus pada {worst_producer}**: Produsen dengan tingkat kebusukan tertinggi ({worst_rate:.1f}%)",
-            f"🔍 **Atasi {top_reason}**: Penyebab utama kebusukan yang perlu penanganan prioritas",
             "📊 **Monitoring Real-time**: Implementasikan sensor IoT untuk monitoring suhu dan kelembaban",
             "🚚 **Optimasi Rute**: Gunakan AI untuk optimasi rute pengiriman berdasarkan kondisi lalu lintas",
             "📱 **Mobile Alert**: Sistem notifikasi mobile untuk alert cepat jika ada masalah kualitas",
@@ -904,6 +1244,313 @@ def main_dashboard():
                     mime="text/csv"
                 )
 
+# Telemetri real-time: antrean -> ring buffer -> metrik inkremental
+TELEMETRY_STATUSES = ['Loading', 'In Transit', 'Delivered', 'Delayed']
+LOADING, IN_TRANSIT, DELIVERED, DELAYED = range(len(TELEMETRY_STATUSES))
+TEMP_ALERT_CELSIUS = 30
+REALTIME_REFRESH_SECONDS = 5
+# Batas antrean event yang belum diproses (~1 menit laporan 200 truk); event terlama dibuang bila penuh
+TELEMETRY_QUEUE_MAXSIZE = 5_000
+
+class TelemetryMonitor:
+    """Ingestion telemetri pengiriman (batch_id, status, suhu, ETA)
+    
+    Event masuk lewat antrean berbatas (`submit`) dari thread mana pun, diproses
+    saat `poll()`, disimpan dalam ring buffer berukuran tetap, dan metrik kartu
+    (batch aktif, alert, suhu rata-rata, ketepatan waktu hari ini) diperbarui
+    O(1) per event. Bila tidak ada yang mem-poll, event terlama dibuang sehingga
+    memori tetap terbatas.
+    """
+    
+    def __init__(self, capacity=100_000, max_delivered=1_000, queue_maxsize=TELEMETRY_QUEUE_MAXSIZE):
+        self.queue = queue.Queue(maxsize=queue_maxsize)
+        self.dropped = 0
+        self.capacity = capacity
+        self.max_delivered = max_delivered
+        
+        # Ring buffer event terbaru (ID batch disimpan langsung karena slot dipakai ulang)
+        self._ring_batch_id = np.empty(capacity, dtype=object)
+        self._ring_status = np.zeros(capacity, dtype=np.int8)
+        self._ring_temperature = np.zeros(capacity, dtype=np.float32)
+        self._ring_eta = np.zeros(capacity, dtype=np.int16)
+        self._ring_timestamp = np.zeros(capacity, dtype=np.int64)
+        self._ring_pos = 0
+        self._ring_count = 0
+        
+        # Status terakhir per batch (slot dipakai ulang setelah batch selesai)
+        self.slots = {}
+        self._free_slots = []
+        self._delivered_slots = deque()
+        self.batch_ids = []
+        self.producers = []
+        self.schools = []
+        self.status = []
+        self.temperature = []
+        self.eta = []
+        self.was_delayed = []
+        self.delivered_day = []
+        
+        # Metrik inkremental (ketepatan waktu dihitung ulang setiap hari)
+        self._day = date.today().toordinal()
+        self.active = 0
+        self.alerts = 0
+        self.active_temperature_sum = 0.0
+        self.delivered = 0
+        self.delivered_on_time = 0
+        self.events_total = 0
+        
+        self._lock = threading.Lock()
+    
+    def submit(self, batch_id, producer, school, status, temperature, eta_minutes):
+        """Masukkan satu event telemetri ke antrean (thread-safe); bila penuh event terlama dibuang"""
+        event = (batch_id, producer, school, status, temperature, eta_minutes)
+        while True:
+            try:
+                self.queue.put_nowait(event)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+    
+    def poll(self, max_events=None):
+        """Proses event yang menunggu di antrean; kembalikan jumlah event yang diproses"""
+        processed = 0
+        now = datetime.now()
+        received_ns = np.datetime64(now, 'ns').astype(np.int64)
+        with self._lock:
+            self._roll_day(now.date().toordinal())
+            while max_events is None or processed < max_events:
+                try:
+                    event = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                self._ingest(*event, received_ns)
+                processed += 1
+        return processed
+    
+    def _roll_day(self, day):
+        """Mulai hitungan ketepatan waktu baru saat hari berganti"""
+        if day != self._day:
+            self._day = day
+            self.delivered = 0
+            self.delivered_on_time = 0
+    
+    def _is_alert(self, slot):
+        return self.status[slot] == DELAYED or self.temperature[slot] > TEMP_ALERT_CELSIUS
+    
+    def _retract(self, slot):
+        """Kurangi kontribusi status lama sebuah slot dari metrik"""
+        if self.status[slot] == DELIVERED:
+            # Pengiriman hari sebelumnya sudah tidak ada di hitungan hari ini
+            if self.delivered_day[slot] == self._day:
+                self.delivered -= 1
+                self.delivered_on_time -= not self.was_delayed[slot]
+        else:
+            self.active -= 1
+            self.active_temperature_sum -= self.temperature[slot]
+            self.alerts -= self._is_alert(slot)
+    
+    def _apply(self, slot):
+        """Tambahkan kontribusi status baru sebuah slot ke metrik"""
+        if self.status[slot] == DELIVERED:
+            self.delivered += 1
+            self.delivered_on_time += not self.was_delayed[slot]
+            self.delivered_day[slot] = self._day
+        else:
+            self.active += 1
+            self.active_temperature_sum += self.temperature[slot]
+            self.alerts += self._is_alert(slot)
+    
+    def _new_slot(self, batch_id, producer, school):
+        if self._free_slots:
+            slot = self._free_slots.pop()
+            self.batch_ids[slot] = batch_id
+            self.producers[slot] = producer
+            self.schools[slot] = school
+            self.was_delayed[slot] = False
+        else:
+            slot = len(self.batch_ids)
+            self.batch_ids.append(batch_id)
+            self.producers.append(producer)
+            self.schools.append(school)
+            self.status.append(None)
+            self.temperature.append(0.0)
+            self.eta.append(0)
+            self.was_delayed.append(False)
+            self.delivered_day.append(None)
+        self.slots[batch_id] = slot
+        return slot
+    
+    def _release_delivered(self):
+        """Bebaskan slot batch terkirim paling lama bila melebihi `max_delivered`"""
+        while len(self._delivered_slots) > self.max_delivered:
+            batch_id = self._delivered_slots.popleft()
+            slot = self.slots.get(batch_id)
+            if slot is None or self.status[slot] != DELIVERED:
+                continue
+            # Batch selesai: hitungan ketepatan waktu tetap, hanya slotnya yang dilepas
+            del self.slots[batch_id]
+            self.status[slot] = None
+            self._free_slots.append(slot)
+    
+    def _ingest(self, batch_id, producer, school, status, temperature, eta_minutes, received_ns):
+        slot = self.slots.get(batch_id)
+        if slot is None:
+            slot = self._new_slot(batch_id, producer, school)
+        if self.status[slot] is not None:
+            self._retract(slot)
+        
+        self.status[slot] = status
+        self.temperature[slot] = temperature
+        self.eta[slot] = eta_minutes
+        if status == DELAYED:
+            self.was_delayed[slot] = True
+        self._apply(slot)
+        
+        pos = self._ring_pos
+        self._ring_batch_id[pos] = batch_id
+        self._ring_status[pos] = status
+        self._ring_temperature[pos] = temperature
+        self._ring_eta[pos] = eta_minutes
+        self._ring_timestamp[pos] = received_ns
+        self._ring_pos = (pos + 1) % self.capacity
+        self._ring_count = min(self._ring_count + 1, self.capacity)
+        self.events_total += 1
+        
+        if status == DELIVERED:
+            self._delivered_slots.append(batch_id)
+            self._release_delivered()
+    
+    def metrics(self):
+        """Metrik kartu real-time (O(1))"""
+        with self._lock:
+            return {
+                'active': self.active,
+                'alerts': self.alerts,
+                'avg_temperature': self.active_temperature_sum / self.active if self.active else 0.0,
+                'on_time_pct': 100 * self.delivered_on_time / self.delivered if self.delivered else 100.0
+            }
+    
+    def current_frame(self):
+        """Status terakhir setiap batch yang masih dilacak"""
+        with self._lock:
+            live = list(self.slots.values())
+            status = np.array([self.status[s] for s in live], dtype=np.int8)
+            frame = pd.DataFrame({
+                'Batch ID': [self.batch_ids[s] for s in live],
+                'Produsen': [self.producers[s] for s in live],
+                'Tujuan': [self.schools[s] for s in live],
+                'Status': pd.Categorical.from_codes(status, categories=TELEMETRY_STATUSES),
+                'Suhu (°C)': np.round([self.temperature[s] for s in live], 1),
+                'ETA (menit)': np.array([self.eta[s] for s in live], dtype=np.int16)
+            })
+        return frame
+    
+    def recent_events(self, n=20):
+        """n event terakhir dari ring buffer, terbaru di atas"""
+        with self._lock:
+            n = min(n, self._ring_count)
+            positions = (self._ring_pos - 1 - np.arange(n)) % self.capacity
+            return pd.DataFrame({
+                'Waktu': pd.to_datetime(self._ring_timestamp[positions], unit='ns'),
+                'Batch ID': self._ring_batch_id[positions],
+                'Status': pd.Categorical.from_codes(self._ring_status[positions], categories=TELEMETRY_STATUSES),
+                'Suhu (°C)': self._ring_temperature[positions].astype(np.float64).round(1),
+                'ETA (menit)': self._ring_eta[positions]
+            })
+
+def run_telemetry_simulator(monitor, n_trucks=200, interval_seconds=3.0, seed=None):
+    """Simulasikan truk yang melapor berkala ke antrean monitor (pengganti sumber telemetri nyata)"""
+    rng = np.random.default_rng(seed)
+    producers = np.array(PRODUCERS, dtype=object)[rng.integers(0, len(PRODUCERS), n_trucks)]
+    schools = np.array(SCHOOLS, dtype=object)[rng.integers(0, len(SCHOOLS), n_trucks)]
+    batch_numbers = np.arange(1, n_trucks + 1)
+    next_batch = n_trucks + 1
+    status = np.full(n_trucks, LOADING)
+    temperature = rng.uniform(18, 26, n_trucks)
+    eta = rng.uniform(10, 60, n_trucks)
+    
+    while True:
+        # Transisi status secara vektor
+        roll = rng.random(n_trucks)
+        restart = status == DELIVERED
+        start = (status == LOADING) & (roll < 0.3)
+        arrive = (status == IN_TRANSIT) & (eta <= 0)
+        delay = (status == IN_TRANSIT) & ~arrive & (roll < 0.05)
+        recover = (status == DELAYED) & (roll < 0.3)
+        
+        n_restart = int(restart.sum())
+        batch_numbers[restart] = np.arange(next_batch, next_batch + n_restart)
+        next_batch += n_restart
+        status[restart] = LOADING
+        temperature[restart] = rng.uniform(18, 26, n_restart)
+        eta[restart] = rng.uniform(10, 60, n_restart)
+        status[start | recover] = IN_TRANSIT
+        status[arrive] = DELIVERED
+        status[delay] = DELAYED
+        
+        # Waktu simulasi dipercepat: tiap laporan memajukan ETA 0.5-2 menit
+        moving = status == IN_TRANSIT
+        eta[moving] -= rng.uniform(0.5, 2.0, int(moving.sum()))
+        eta[status == DELAYED] += 1
+        temperature = np.clip(temperature + rng.normal(0.1, 0.5, n_trucks), 15, 45)
+        
+        for i in range(n_trucks):
+            monitor.submit(
+                f"BATCH_{batch_numbers[i]:05d}", producers[i], schools[i],
+                int(status[i]), float(temperature[i]), max(int(eta[i]), 0)
+            )
+        time.sleep(interval_seconds)
+
+@st.cache_resource
+def get_telemetry_monitor():
+    """Monitor telemetri bersama (satu per proses) beserta simulator truknya"""
+    monitor = TelemetryMonitor()
+    threading.Thread(target=run_telemetry_simulator, args=(monitor,), daemon=True).start()
+    return monitor
+
+STATUS_COLORS = {
+    'Delivered': '#4ecdc4',
+    'In Transit': '#74b9ff',
+    'Delayed': '#ff6b6b',
+    'Loading': '#feca57'
+}
+STATUS_BADGES = {'Delivered': '🟢', 'In Transit': '🔵', 'Delayed': '🔴', 'Loading': '🟡'}
+STYLED_TABLE_MAX_ROWS = 1000
+TABLE_PAGE_SIZES = [100, 500, 1000, 5000, 50000]
+
+def status_styles(status):
+    """CSS kolom status: warna dihitung sekali per kategori lalu dipetakan lewat kode kategori"""
+    css = np.array(
+        [f"background-color: {STATUS_COLORS.get(c, STATUS_COLORS['Loading'])}" for c in status.cat.categories],
+        dtype=object
+    )
+    return css[status.cat.codes.to_numpy()]
+
+def render_status_table(df):
+    """Tabel status pengiriman: Styler untuk tabel kecil, column config biasa untuk tabel besar"""
+    if len(df) <= STYLED_TABLE_MAX_ROWS:
+        styled_df = df.style.apply(status_styles, subset=['Status']).format(precision=1, subset=['Suhu (°C)'])
+        st.dataframe(styled_df, use_container_width=True, hide_index=True)
+        return
+    
+    # Tanpa Styler: status diberi badge per kategori (O(jumlah kategori))
+    status = df['Status'].cat.rename_categories(
+        lambda c: f"{STATUS_BADGES.get(c, '⚪')} {c}"
+    )
+    st.dataframe(
+        df.assign(Status=status),
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            'Suhu (°C)': st.column_config.NumberColumn(format="%.1f"),
+            'ETA (menit)': st.column_config.NumberColumn(format="%d menit")
+        }
+    )
+
 def realtime_monitoring():
     """Dashboard monitoring real-time"""
     
@@ -914,15 +1561,42 @@ def realtime_monitoring():
     </div>
     ''', unsafe_allow_html=True)
     
-    # Auto-refresh
-    if st.button("🔄 Refresh Data"):
-        st.rerun()
+    monitor = get_telemetry_monitor()
+    
+    # Real-time metrics (fragment, diperbarui tiap REALTIME_REFRESH_SECONDS)
+    live_metrics(monitor)
+    
+    # Live tracking map (simulated)
+    st.markdown("### 🗺️ Live Tracking Pengiriman")
+    
+    # Simulated delivery locations
+    map_data = pd.DataFrame({
+        'lat': [-6.9175, -6.8951, -6.9147, -6.9355],
+        'lon': [107.6191, 107.6081, 107.6098, 107.6200],
+        'name': ['SDN Bandung 1', 'SMP Negeri 5', 'SMA Negeri 3', 'Dapur Pusat'],
+        'status': ['Delivered', 'In Transit', 'Delayed', 'Ready'],
+        'temp': [25.5, 28.2, 32.1, 22.0]
+    })
+    
+    st.map(map_data[['lat', 'lon']], use_container_width=True)
+    
+    # Current deliveries table
+    st.markdown("### 🚚 Status Pengiriman Saat Ini")
+    live_delivery_table(monitor)
+
+@st.fragment(run_every=REALTIME_REFRESH_SECONDS)
+def live_metrics(monitor):
+    """Kartu metrik real-time; hanya fragment ini yang dirender ulang"""
+    
+    # Refresh manual hanya menjalankan ulang fragment ini
+    st.button("🔄 Refresh Data")
+    monitor.poll()
+    metrics = monitor.metrics()
     
-    # Real-time metrics
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        current_batches = random.randint(15, 25)
+        current_batches = metrics['active']
         st.markdown(f'''
         <div class="metric-card">
             <h3>📦 Batch Aktif</h3>
@@ -932,7 +1606,7 @@ def realtime_monitoring():
         ''', unsafe_allow_html=True)
     
     with col2:
-        alerts = random.randint(0, 3)
+        alerts = metrics['alerts']
         color = "alert-card" if alerts > 0 else "success-card"
         st.markdown(f'''
         <div class="{color}">
@@ -943,7 +1617,7 @@ def realtime_monitoring():
         ''', unsafe_allow_html=True)
     
     with col3:
-        avg_temp_now = random.uniform(20, 35)
+        avg_temp_now = metrics['avg_temperature']
         color = "alert-card" if avg_temp_now > 30 else "success-card"
         st.markdown(f'''
         <div class="{color}">
@@ -954,55 +1628,36 @@ def realtime_monitoring():
         ''', unsafe_allow_html=True)
     
     with col4:
-        on_time = random.randint(85, 98)
+        on_time = metrics['on_time_pct']
         color = "success-card" if on_time > 90 else "warning-card"
         st.markdown(f'''
         <div class="{color}">
             <h3>⏰ Ketepatan Waktu</h3>
-            <h2>{on_time}%</h2>
+            <h2>{on_time:.0f}%</h2>
             <p>Hari Ini</p>
         </div>
         ''', unsafe_allow_html=True)
+
+@st.fragment(run_every=REALTIME_REFRESH_SECONDS)
+def live_delivery_table(monitor):
+    """Tabel status pengiriman terkini dari monitor telemetri"""
+    monitor.poll()
+    current_deliveries = monitor.current_frame()
     
-    # Live tracking map (simulated)
-    st.markdown("### 🗺️ Live Tracking Pengiriman")
-    
-    # Simulated delivery locations
-    map_data = pd.DataFrame({
-        'lat': [-6.9175, -6.8951, -6.9147, -6.9355],
-        'lon': [107.6191, 107.6081, 107.6098, 107.6200],
-        'name': ['SDN Bandung 1', 'SMP Negeri 5', 'SMA Negeri 3', 'Dapur Pusat'],
-        'status': ['Delivered', 'In Transit', 'Delayed', 'Ready'],
-        'temp': [25.5, 28.2, 32.1, 22.0]
-    })
-    
-    st.map(map_data[['lat', 'lon']], use_container_width=True)
-    
-    # Current deliveries table
-    st.markdown("### 🚚 Status Pengiriman Saat Ini")
-    
-    current_deliveries = pd.DataFrame({
-        'Batch ID': [f'BATCH_{i:03d}' for i in range(1, 11)],
-        'Produsen': [random.choice(['Katering Sehat', 'Nutrisi Prima', 'Makanan Bergizi']) for _ in range(10)],
-        'Tujuan': [random.choice(['SDN Bandung 1', 'SMP Negeri 5', 'SMA Negeri 3']) for _ in range(10)],
-        'Status': [random.choice(['Loading', 'In Transit', 'Delivered', 'Delayed']) for _ in range(10)],
-        'Suhu (°C)': [round(random.uniform(20, 35), 1) for _ in range(10)],
-        'ETA': [f'{random.randint(10, 60)} menit' for _ in range(10)]
-    })
+    # Paginasi: hanya satu halaman yang dikirim ke browser
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        page_size = st.selectbox("Baris per Halaman:", TABLE_PAGE_SIZES, key="realtime_page_size")
+    n_pages = max(1, -(-len(current_deliveries) // page_size))
+    with col2:
+        page = st.number_input("Halaman:", min_value=1, value=1, step=1, key="realtime_page")
+    page = min(page, n_pages)
+    st.caption(f"Halaman {page} dari {n_pages} ({len(current_deliveries):,} batch)")
     
-    # Color code the status
-    def highlight_status(val):
-        if val == 'Delivered':
-            return 'background-color: #4ecdc4'
-        elif val == 'In Transit':
-            return 'background-color: #74b9ff'
-        elif val == 'Delayed':
-            return 'background-color: #ff6b6b'
-        else:
-            return 'background-color: #feca57'
+    render_status_table(current_deliveries.iloc[(page - 1) * page_size:page * page_size])
     
-    styled_df = current_deliveries.style.applymap(highlight_status, subset=['Status'])
-    st.dataframe(styled_df, use_container_width=True)
+    with st.expander("📜 Log Telemetri Terbaru"):
+        st.dataframe(monitor.recent_events(), use_container_width=True)
 
 def main():
     """Fungsi utama aplikasi"""
@@ -5,9 +5,14 @@ import plotly.graph_objects as go
 from datetime import datetime, date
 import json
 import hashlib
-import qrcode
-from io import BytesIO
-import base64
+import os
+import shutil
+import atexit
+import tempfile
+from qr_service import generate_qr_code, write_label_sheet, LABEL_FIELDS
+from akg_reference import get_akg_reference
+from akg_adequacy import AdequacyEngine
+from mbg_store import MbgStore, PENERIMA_COLUMNS
 
 # Konfigurasi halaman
 st.set_page_config(
@@ -76,54 +81,113 @@ if 'user_role' not in st.session_state:
 if 'user_data' not in st.session_state:
     st.session_state.user_data = {}
 
-# Data dummy untuk demo
-if 'lembaga_data' not in st.session_state:
-    st.session_state.lembaga_data = [
-        {"id": "LP001", "nama": "SDN Bandung 1", "alamat": "Jl. Merdeka No. 1", "kontak": "022-1234567"},
-        {"id": "LP002", "nama": "SMP Negeri 5", "alamat": "Jl. Sudirman No. 25", "kontak": "022-7654321"},
-        {"id": "LP003", "nama": "SMA Negeri 3", "alamat": "Jl. Asia Afrika No. 10", "kontak": "022-9876543"}
-    ]
+# Data bersama semua sesi (SQLite, lihat mbg_store.py); data contoh diisi oleh migrasi
+@st.cache_resource
+def get_store():
+    """Store data MBG (dibuat sekali per proses Streamlit)"""
+    return MbgStore()
 
-if 'penerima_data' not in st.session_state:
-    st.session_state.penerima_data = [
-        {"nama": "Ahmad Rizki", "ttl": "Bandung, 15 Mei 2010", "jenis_kelamin": "Laki-laki", "bb": 35, "tb": 140, "lembaga": "SDN Bandung 1"},
-        {"nama": "Siti Nurhaliza", "ttl": "Bandung, 22 Juli 2009", "jenis_kelamin": "Perempuan", "bb": 32, "tb": 135, "lembaga": "SDN Bandung 1"},
-        {"nama": "Budi Santoso", "ttl": "Bandung, 8 Maret 2011", "jenis_kelamin": "Laki-laki", "bb": 28, "tb": 125, "lembaga": "SDN Bandung 1"}
-    ]
+store = get_store()
+store.sync()
 
-if 'menu_makanan' not in st.session_state:
-    st.session_state.menu_makanan = [
-        {"nama": "Nasi + Ayam Bakar + Sayur", "kalori": 650, "protein": 35, "karbohidrat": 75, "lemak": 18},
-        {"nama": "Nasi + Ikan Gurame + Tahu", "kalori": 580, "protein": 32, "karbohidrat": 70, "lemak": 15},
-        {"nama": "Nasi + Rendang + Kangkung", "kalori": 720, "protein": 38, "karbohidrat": 80, "lemak": 22},
-        {"nama": "Nasi + Tempe Goreng + Gado-gado", "kalori": 520, "protein": 25, "karbohidrat": 68, "lemak": 12}
-    ]
+# Lembaga, menu, penerima dan produsen dibaca dari registry store (store.lembaga, ...)
+# yang disinkronkan di atas; pembacaan lain di-cache per versi tabel: dibaca ulang hanya setelah ada penulisan
+@st.cache_data(show_spinner=False, max_entries=32)
+def load_kuota(tanggal, version):
+    return store.kuota(tanggal=tanggal)
 
-if 'kuota_makanan' not in st.session_state:
-    st.session_state.kuota_makanan = [
-        {"lembaga": "SDN Bandung 1", "tanggal": "2025-01-31", "menu": "Nasi + Ayam Bakar + Sayur", "kuota": 150, "terpakai": 120},
-        {"lembaga": "SMP Negeri 5", "tanggal": "2025-01-31", "menu": "Nasi + Ikan Gurame + Tahu", "kuota": 200, "terpakai": 180},
-        {"lembaga": "SMA Negeri 3", "tanggal": "2025-01-31", "menu": "Nasi + Rendang + Kangkung", "kuota": 180, "terpakai": 160}
-    ]
+@st.cache_data(show_spinner=False, max_entries=8)
+def load_pesanan_terbaru(limit, version):
+    return store.pesanan(limit=limit)
 
-if 'pesanan_logistik' not in st.session_state:
-    st.session_state.pesanan_logistik = []
+@st.cache_data(show_spinner=False, max_entries=8)
+def load_pengaduan_terbaru(limit, version):
+    return store.pengaduan(limit=limit)
 
-if 'pengaduan' not in st.session_state:
-    st.session_state.pengaduan = []
+# Lembaga akun demo (login belum terhubung ke data lembaga)
+LEMBAGA_DEMO = "SDN Bandung 1"
+PESANAN_PILIHAN_LIMIT = 200
 
-def generate_qr_code(data):
-    """Generate QR Code"""
-    qr = qrcode.QRCode(version=1, box_size=10, border=5)
-    qr.add_data(data)
-    qr.make(fit=True)
-    
-    img = qr.make_image(fill_color="black", back_color="white")
-    buffer = BytesIO()
-    img.save(buffer, format='PNG')
-    buffer.seek(0)
-    
-    return base64.b64encode(buffer.getvalue()).decode()
+# Field nutrisi menu -> kolom tabel referensi AKG
+AKG_MENU_COLUMNS = {
+    "kalori": "Energi (kkal)",
+    "protein": "Protein (g)",
+    "karbohidrat": "Karbohidrat (g)",
+    "lemak": "Lemak (g)"
+}
+
+def iter_csv_batches(uploaded_file, chunksize=1000):
+    """Baca daftar batch dari CSV per chunk (kolom: batch_id, produsen, menu, jumlah, ...)"""
+    for chunk in pd.read_csv(uploaded_file, chunksize=chunksize, dtype=str):
+        columns = [c for c in chunk.columns if c in LABEL_FIELDS]
+        for batch in chunk[columns].to_dict('records'):
+            yield {k: v for k, v in batch.items() if pd.notna(v)}
+
+def pesanan_to_batches(pesanan_list):
+    """Ubah pesanan logistik menjadi data label batch"""
+    for pesanan in pesanan_list:
+        yield {
+            "batch_id": pesanan["id"],
+            "produsen": pesanan.get("produsen"),
+            "lembaga": pesanan["lembaga"],
+            "menu": pesanan["menu"],
+            "jumlah": pesanan["jumlah"],
+            "tanggal": pesanan.get("tanggal") or pesanan.get("waktu")
+        }
+
+@st.cache_resource
+def get_label_sheet_dir():
+    """Folder sementara lembar label (satu per proses, dihapus saat proses berhenti)"""
+    path = tempfile.mkdtemp(prefix='mbg_label_')
+    atexit.register(shutil.rmtree, path, ignore_errors=True)
+    return path
+
+def remove_label_sheet():
+    """Hapus lembar label sesi ini (bila ada) dari disk dan session state"""
+    path = st.session_state.pop('label_sheet_path', None)
+    if path and os.path.exists(path):
+        os.remove(path)
+
+def create_label_sheet(batches, on_progress=None):
+    """Tulis lembar label baru ke file sementara menggantikan lembar lama; kembalikan jumlah label"""
+    remove_label_sheet()
+    with tempfile.NamedTemporaryFile('w', suffix='.html', encoding='utf-8', dir=get_label_sheet_dir(), delete=False) as sheet_file:
+        try:
+            total = write_label_sheet(batches, sheet_file, on_progress=on_progress)
+        except Exception:
+            sheet_file.close()
+            os.remove(sheet_file.name)
+            raise
+    st.session_state.label_sheet_path = sheet_file.name
+    return total
+
+def read_label_sheet(path):
+    """Isi lembar label untuk download_button (dibaca hanya saat tombol diklik)"""
+    def read():
+        with open(path, 'rb') as sheet_file:
+            return sheet_file.read()
+    return read
+
+@st.cache_resource
+def get_adequacy_engine():
+    """Engine ketercapaian AKG bersama untuk semua sesi (satu per proses)"""
+    return AdequacyEngine()
+
+def load_adequacy_engine():
+    """Engine AKG yang sinkron dengan tabel penerima dan kuota; hanya penerima baru dan
+    lembaga yang pengirimannya berubah yang diproses"""
+    engine = get_adequacy_engine()
+    with engine.lock:
+        for batch in store.iter_penerima(after_id=engine.last_id):
+            engine.add_recipients(batch)
+        version = store.version('kuota')
+        if engine.kuota_version != version:
+            engine.record_deliveries(
+                (k["lembaga"], k["tanggal"], store.menu[k["menu"]].gizi())
+                for k in store.kuota_terkirim() if k["menu"] in store.menu
+            )
+            engine.kuota_version = version
+    return engine
 
 def hash_password(password):
     """Hash password sederhana"""
@@ -197,11 +261,9 @@ def admin_dashboard():
             st.plotly_chart(fig, use_container_width=True)
         
         with col2:
-            # Pie chart ketercapaian AKG
-            akg_data = pd.DataFrame({
-                'Status': ['Tercukupi', 'Kurang', 'Berlebih'],
-                'Jumlah': [65, 25, 10]
-            })
+            # Pie chart ketercapaian AKG (dihitung per penerima terhadap menu terakhir lembaganya)
+            akg_data = load_adequacy_engine().summary()
+            akg_data = akg_data[akg_data['Jumlah'] > 0]
             
             fig = px.pie(akg_data, values='Jumlah', names='Status', 
                         title="🥗 Ketercapaian AKG Penerima")
@@ -211,15 +273,8 @@ def admin_dashboard():
     with tab2:
         st.subheader("🍽️ Data Angka Kecukupan Gizi (AKG)")
         
-        akg_data = pd.DataFrame({
-            'Kelompok Umur': ['4-6 tahun', '7-9 tahun', '10-12 tahun', '13-15 tahun', '16-18 tahun'],
-            'Kalori (kkal)': [1600, 1850, 2100, 2400, 2650],
-            'Protein (g)': [35, 49, 56, 70, 75],
-            'Karbohidrat (g)': [220, 254, 289, 330, 364],
-            'Lemak (g)': [53, 62, 70, 80, 88]
-        })
-        
-        st.dataframe(akg_data, use_container_width=True)
+        # Referensi AKG bersama (PMK No. 28/2019), sama dengan akg.py dan dapur.py
+        st.dataframe(get_akg_reference().display_table, use_container_width=True)
         
         if st.button("📝 Tambah Data AKG"):
             st.success("Fitur tambah data AKG akan ditambahkan!")
@@ -227,12 +282,9 @@ def admin_dashboard():
     with tab3:
         st.subheader("🏭 Data Produsen Makanan")
         
-        produsen_data = pd.DataFrame({
-            'Nama Produsen': ['Katering Sehat Bandung', 'Nutrisi Prima', 'Makanan Bergizi Nusantara'],
-            'Alamat': ['Jl. Setiabudi No. 15', 'Jl. Dago No. 88', 'Jl. Cihampelas No. 45'],
-            'Kapasitas/Hari': [500, 750, 600],
-            'Rating': [4.8, 4.6, 4.7],
-            'Status': ['Aktif', 'Aktif', 'Aktif']
+        produsen_data = pd.DataFrame(store.produsen.records()).drop(columns='id').rename(columns={
+            'nama': 'Nama Produsen', 'alamat': 'Alamat', 'kapasitas': 'Kapasitas/Hari',
+            'rating': 'Rating', 'status': 'Status'
         })
         
         st.dataframe(produsen_data, use_container_width=True)
@@ -243,7 +295,7 @@ def admin_dashboard():
     with tab4:
         st.subheader("📍 Data Kuota Makanan")
         
-        kuota_df = pd.DataFrame(st.session_state.kuota_makanan)
+        kuota_df = pd.DataFrame(load_kuota(None, store.version('kuota')))
         st.dataframe(kuota_df, use_container_width=True)
         
         col1, col2 = st.columns(2)
@@ -257,7 +309,7 @@ def admin_dashboard():
     with tab5:
         st.subheader("🏫 Data Lembaga Pendidikan")
         
-        lembaga_df = pd.DataFrame(st.session_state.lembaga_data)
+        lembaga_df = pd.DataFrame(store.lembaga.records())
         st.dataframe(lembaga_df, use_container_width=True)
         
         if st.button("➕ Tambah Lembaga"):
@@ -275,7 +327,8 @@ def lembaga_dashboard():
         col1, col2 = st.columns([2, 1])
         
         with col1:
-            penerima_df = pd.DataFrame(st.session_state.penerima_data)
+            penerima_df = pd.DataFrame(store.penerima.records(LEMBAGA_DEMO), columns=list(PENERIMA_COLUMNS))
+            penerima_df['Status AKG'] = load_adequacy_engine().status_labels(penerima_df['id'])
             st.dataframe(penerima_df, use_container_width=True)
         
         with col2:
@@ -293,9 +346,9 @@ def lembaga_dashboard():
                     "jenis_kelamin": jk,
                     "bb": bb,
                     "tb": tb,
-                    "lembaga": "SDN Bandung 1"
+                    "lembaga": LEMBAGA_DEMO
                 }
-                st.session_state.penerima_data.append(new_data)
+                store.add_penerima(new_data)
                 st.success(f"✅ Data {nama} berhasil ditambahkan!")
                 st.rerun()
     
@@ -304,7 +357,7 @@ def lembaga_dashboard():
         st.info("📸 Fitur pengambilan foto dan sidik jari akan diintegrasikan dengan perangkat biometrik")
         
         selected_person = st.selectbox("Pilih Penerima untuk Registrasi Biometrik:", 
-                                     [p["nama"] for p in st.session_state.penerima_data])
+                                     store.penerima.options(LEMBAGA_DEMO))
         
         col1, col2 = st.columns(2)
         with col1:
@@ -322,8 +375,10 @@ def lembaga_dashboard():
         
         with col1:
             st.markdown("### 📋 Scan QR Code")
-            qr_data = f"verification_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            qr_img = generate_qr_code(qr_data)
+            # Payload verifikasi dibuat sekali per sesi agar QR tidak dirender ulang tiap rerun
+            if 'verification_qr_data' not in st.session_state:
+                st.session_state.verification_qr_data = f"verification_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            qr_img = generate_qr_code(st.session_state.verification_qr_data)
             st.markdown(f'<img src="data:image/png;base64,{qr_img}" width="200">', unsafe_allow_html=True)
             
             if st.button("🔍 Verifikasi QR"):
@@ -331,7 +386,7 @@ def lembaga_dashboard():
         
         with col2:
             st.markdown("### 📊 Verifikasi Kuota Makanan")
-            today_quota = [k for k in st.session_state.kuota_makanan if k["tanggal"] == "2025-01-31"]
+            today_quota = load_kuota("2025-01-31", store.version('kuota'))
             
             for quota in today_quota:
                 remaining = quota["kuota"] - quota["terpakai"]
@@ -344,9 +399,20 @@ def lembaga_dashboard():
                 """, unsafe_allow_html=True)
         
         st.markdown("### 🍽️ Jumlah Makanan")
+        posisi_kuota = st.selectbox(
+            "Kuota yang diterima:", range(len(today_quota)),
+            format_func=lambda i: f"{today_quota[i]['lembaga']} - {today_quota[i]['menu']} ({today_quota[i]['tanggal']})"
+        )
         jumlah = st.number_input("Masukkan jumlah makanan yang diterima:", min_value=1, max_value=500, value=1)
         
-        if st.button("✅ Konfirmasi Penerimaan"):
+        if st.button("✅ Konfirmasi Penerimaan", disabled=posisi_kuota is None):
+            engine = load_adequacy_engine()
+            with engine.lock:
+                lembaga_kuota, tanggal_kuota, menu_kuota, _ = store.confirm_kuota(today_quota[posisi_kuota]["id"], jumlah)
+                menu_diterima = store.menu.get(menu_kuota)
+                if menu_diterima is not None:
+                    # Hanya penerima lembaga ini yang dihitung ulang status AKG-nya
+                    engine.record_delivery(lembaga_kuota, tanggal_kuota, menu_diterima.gizi())
             st.success(f"✅ Penerimaan {jumlah} porsi makanan berhasil dikonfirmasi!")
         
         st.markdown("### ✔️ Verifikasi Kualitas Makanan")
@@ -379,15 +445,16 @@ def lembaga_dashboard():
                     "jenis": jenis_pengaduan,
                     "deskripsi": deskripsi,
                     "status": "Pending",
-                    "lembaga": "SDN Bandung 1"
+                    "lembaga": LEMBAGA_DEMO
                 }
-                st.session_state.pengaduan.append(pengaduan_baru)
+                store.add_pengaduan(pengaduan_baru)
                 st.success("✅ Pengaduan berhasil dikirim!")
         
         with col2:
             st.markdown("### 📋 Riwayat Pengaduan")
-            if st.session_state.pengaduan:
-                for i, p in enumerate(st.session_state.pengaduan[-5:]):  # Show last 5
+            pengaduan_terbaru = load_pengaduan_terbaru(5, store.version('pengaduan'))
+            if pengaduan_terbaru:
+                for i, p in enumerate(pengaduan_terbaru):  # Show last 5
                     status_color = "success-box" if p["status"] == "Resolved" else "warning-box"
                     st.markdown(f"""
                     <div class="{status_color}">
@@ -435,8 +502,8 @@ def logistik_dashboard():
         
         with col1:
             st.markdown("### 📋 Terima Pesanan")
-            lembaga_tujuan = st.selectbox("Lembaga Tujuan:", [l["nama"] for l in st.session_state.lembaga_data])
-            menu_pesanan = st.selectbox("Menu Makanan:", [m["nama"] for m in st.session_state.menu_makanan])
+            lembaga_tujuan = st.selectbox("Lembaga Tujuan:", store.lembaga.options())
+            menu_pesanan = st.selectbox("Menu Makanan:", store.menu.options())
             jumlah_pesanan = st.number_input("Jumlah Pesanan:", min_value=1, max_value=1000, value=100)
             tanggal_kirim = st.date_input("Tanggal Pengiriman:", value=date.today())
             
@@ -449,14 +516,15 @@ def logistik_dashboard():
                     "tanggal": str(tanggal_kirim),
                     "status": "Diproses"
                 }
-                st.session_state.pesanan_logistik.append(pesanan_baru)
+                store.add_pesanan(pesanan_baru)
                 st.success("✅ Pesanan berhasil dikonfirmasi!")
         
         with col2:
             st.markdown("### 🚫 Tolak Pesanan")
-            if st.session_state.pesanan_logistik:
+            pesanan_terbaru = load_pesanan_terbaru(PESANAN_PILIHAN_LIMIT, store.version('pesanan'))
+            if pesanan_terbaru:
                 pesanan_id = st.selectbox("Pilih Pesanan untuk Ditolak:", 
-                                        [p["id"] for p in st.session_state.pesanan_logistik])
+                                        [p["id"] for p in pesanan_terbaru])
                 alasan = st.text_area("Alasan Penolakan:")
                 
                 if st.button("❌ Tolak Pesanan"):
@@ -474,12 +542,12 @@ def logistik_dashboard():
         
         with col1:
             st.markdown("### 🗺️ Rute Lokasi Terima Makanan")
-            for i, lembaga in enumerate(st.session_state.lembaga_data):
+            for i, lembaga in enumerate(store.lembaga):
                 st.markdown(f"""
                 <div class="success-box">
-                    <h4>📍 {lembaga['nama']}</h4>
-                    <p>🏠 {lembaga['alamat']}</p>
-                    <p>📞 {lembaga['kontak']}</p>
+                    <h4>📍 {lembaga.nama}</h4>
+                    <p>🏠 {lembaga.alamat}</p>
+                    <p>📞 {lembaga.kontak}</p>
                     <p>⏰ Estimasi: 30 menit</p>
                 </div>
                 """, unsafe_allow_html=True)
@@ -569,8 +637,8 @@ def logistik_dashboard():
         with col1:
             # Form untuk generate QR
             batch_id = st.text_input("Batch ID:", value=f"BATCH_{datetime.now().strftime('%Y%m%d_%H%M')}")
-            produsen = st.selectbox("Produsen:", ["Katering Sehat Bandung", "Nutrisi Prima", "Makanan Bergizi Nusantara"])
-            menu_qr = st.selectbox("Menu:", [m["nama"] for m in st.session_state.menu_makanan])
+            produsen = st.selectbox("Produsen:", store.produsen.options())
+            menu_qr = st.selectbox("Menu:", store.menu.options())
             jumlah_qr = st.number_input("Jumlah Makanan:", min_value=1, max_value=1000, value=100)
             
             if st.button("🔗 Generate QR Code"):
@@ -596,6 +664,44 @@ def logistik_dashboard():
                 
                 if hasattr(st.session_state, 'current_qr_data'):
                     st.json(st.session_state.current_qr_data)
+        
+        st.markdown("### 🖨️ Cetak Label QR Massal")
+        
+        sumber_batch = st.radio("Sumber Data Batch:", ["Pesanan Logistik", "Upload CSV"], horizontal=True)
+        
+        batches = None
+        if sumber_batch == "Pesanan Logistik":
+            total_pesanan = store.count_pesanan()
+            if total_pesanan:
+                st.info(f"📦 {total_pesanan} pesanan siap dibuatkan label")
+                batches = pesanan_to_batches(store.iter_pesanan())
+            else:
+                st.info("Belum ada pesanan logistik")
+        else:
+            uploaded_csv = st.file_uploader("Upload CSV Batch (batch_id, produsen, menu, jumlah):", type=["csv"])
+            if uploaded_csv is not None:
+                batches = iter_csv_batches(uploaded_csv)
+        
+        if batches is not None and st.button("🖨️ Buat Lembar Label"):
+            progress_text = st.empty()
+            # Lembar ditulis ke file sementara per chunk agar memori tetap datar
+            total_label = create_label_sheet(
+                batches, on_progress=lambda n: progress_text.text(f"⏳ {n} label dibuat...")
+            )
+            progress_text.empty()
+            st.success(f"✅ Lembar label untuk {total_label} batch berhasil dibuat!")
+        
+        sheet_path = st.session_state.get('label_sheet_path')
+        if sheet_path and not os.path.exists(sheet_path):
+            remove_label_sheet()
+            st.warning("Lembar label sudah tidak tersedia, silakan buat ulang.")
+        elif sheet_path:
+            st.download_button(
+                label="📥 Download Lembar Label (HTML, siap cetak)",
+                data=read_label_sheet(sheet_path),
+                file_name=f"label_qr_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html",
+                mime="text/html"
+            )
 
 def produsen_dashboard():
     """Dashboard Produsen Makanan"""
@@ -610,31 +716,35 @@ def produsen_dashboard():
         
         with col1:
             st.markdown("### ➕ Pilih Menu Makanan")
-            for i, menu in enumerate(st.session_state.menu_makanan):
-                with st.expander(f"🍽️ {menu['nama']}"):
+            for i, menu in enumerate(store.menu):
+                with st.expander(f"🍽️ {menu.nama}"):
                     col_a, col_b = st.columns(2)
                     with col_a:
-                        st.metric("🔥 Kalori", f"{menu['kalori']} kkal")
-                        st.metric("🥩 Protein", f"{menu['protein']} g")
+                        st.metric("🔥 Kalori", f"{menu.kalori} kkal")
+                        st.metric("🥩 Protein", f"{menu.protein} g")
                     with col_b:
-                        st.metric("🍚 Karbohidrat", f"{menu['karbohidrat']} g")
-                        st.metric("🥑 Lemak", f"{menu['lemak']} g")
+                        st.metric("🍚 Karbohidrat", f"{menu.karbohidrat} g")
+                        st.metric("🥑 Lemak", f"{menu.lemak} g")
         
         with col2:
             st.markdown("### 🔢 Hasil Kalori/AKG")
-            selected_menu = st.selectbox("Pilih Menu untuk Analisis:", [m["nama"] for m in st.session_state.menu_makanan])
+            selected_menu = st.selectbox("Pilih Menu untuk Analisis:", store.menu.options())
+            
+            menu_data = store.menu.get(selected_menu)
             
-            # Find selected menu data
-            menu_data = next((m for m in st.session_state.menu_makanan if m["nama"] == selected_menu), None)
+            akg_reference = get_akg_reference()
+            kelompok_sasaran = st.selectbox(
+                "Kelompok Sasaran:", akg_reference.labels,
+                index=akg_reference.row_of_label['10–12 tahun (L)']
+            )
             
             if menu_data:
-                # AKG reference for school age (7-12 years)
-                akg_reference = {"kalori": 2000, "protein": 50, "karbohidrat": 280, "lemak": 65}
+                akg_sasaran = akg_reference.table.loc[kelompok_sasaran]
                 
                 st.markdown("### 📊 Persentase AKG")
                 
-                for nutrisi in ['kalori', 'protein', 'karbohidrat', 'lemak']:
-                    percentage = (menu_data[nutrisi] / akg_reference[nutrisi]) * 100
+                for nutrisi, kolom_akg in AKG_MENU_COLUMNS.items():
+                    percentage = (getattr(menu_data, nutrisi) / akg_sasaran[kolom_akg]) * 100
                     st.progress(min(percentage/100, 1.0))
                     st.write(f"{nutrisi.title()}: {percentage:.1f}% dari AKG")
     
@@ -645,11 +755,11 @@ def produsen_dashboard():
         
         with col1:
             st.markdown("### 🏫 Pilih Lembaga Pendidikan")
-            lembaga_pilihan = st.selectbox("Lembaga:", [l["nama"] for l in st.session_state.lembaga_data])
+            lembaga_pilihan = st.selectbox("Lembaga:", store.lembaga.options())
             
             st.markdown("### 📅 Input Kuota Makanan")
             tanggal_kuota = st.date_input("Tanggal:", value=date.today())
-            menu_kuota = st.selectbox("Menu:", [m["nama"] for m in st.session_state.menu_makanan])
+            menu_kuota = st.selectbox("Menu:", store.menu.options())
             jumlah_kuota = st.number_input("Jumlah Kuota:", min_value=1, max_value=1000, value=100)
             
             if st.button("💾 Simpan Kuota"):
@@ -660,13 +770,13 @@ def produsen_dashboard():
                     "kuota": jumlah_kuota,
                     "terpakai": 0
                 }
-                st.session_state.kuota_makanan.append(kuota_baru)
+                store.add_kuota(kuota_baru)
                 st.success("✅ Kuota makanan berhasil disimpan!")
         
         with col2:
             st.markdown("### 📊 Kuota Hari Ini")
             today_str = str(date.today())
-            today_quotas = [k for k in st.session_state.kuota_makanan if k["tanggal"] == today_str]
+            today_quotas = load_kuota(today_str, store.version('kuota'))
             
             if today_quotas:
                 for quota in today_quotas:
@@ -691,13 +801,13 @@ def produsen_dashboard():
         
         with col1:
             st.markdown("### 🏫 Pilih Lembaga Pendidikan")
-            target_lembaga = st.selectbox("Lembaga Tujuan:", [l["nama"] for l in st.session_state.lembaga_data], key="target_lembaga")
+            target_lembaga = st.selectbox("Lembaga Tujuan:", store.lembaga.options(), key="target_lembaga")
             
             st.markdown("### 🚚 Pilih Logistik")
             logistik_options = ["Logistik A - Truck Besar", "Logistik B - Van Sedang", "Logistik C - Motor Box"]
             selected_logistik = st.selectbox("Provider Logistik:", logistik_options)
             
-            menu_order = st.selectbox("Menu Pesanan:", [m["nama"] for m in st.session_state.menu_makanan], key="menu_order")
+            menu_order = st.selectbox("Menu Pesanan:", store.menu.options(), key="menu_order")
             jumlah_order = st.number_input("Jumlah Pesanan:", min_value=1, max_value=1000, value=100, key="jumlah_order")
             waktu_kirim = st.time_input("Waktu Pengiriman:", value=datetime.now().time())
             
@@ -711,13 +821,14 @@ def produsen_dashboard():
                     "waktu": str(waktu_kirim),
                     "status": "Menunggu Konfirmasi"
                 }
-                st.session_state.pesanan_logistik.append(pesanan_baru)
+                store.add_pesanan(pesanan_baru)
                 st.success("✅ Pesanan logistik berhasil dibuat!")
         
         with col2:
             st.markdown("### 📋 Status Pesanan")
-            if st.session_state.pesanan_logistik:
-                for pesanan in st.session_state.pesanan_logistik[-5:]:  # Show last 5 orders
+            pesanan_terbaru = load_pesanan_terbaru(5, store.version('pesanan'))
+            if pesanan_terbaru:
+                for pesanan in pesanan_terbaru:  # Show last 5 orders
                     status_color = "success-box" if "Konfirmasi" in pesanan["status"] else "warning-box"
                     st.markdown(f"""
                     <div class="{status_color}">
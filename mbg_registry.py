@@ -0,0 +1,137 @@
+"""Registry entitas MBG (lembaga, menu, penerima, produsen) terindeks per kunci
+
+Record disimpan sebagai dataclass ber-__slots__ (lebih ringkas dari dict) di
+dict per kunci sehingga lookup per id/nama O(1). Daftar record dan opsi
+selectbox di-cache sebagai tuple dan hanya dibuang saat registry berubah,
+jadi rerun halaman tidak membangun ulang list meskipun registry besar.
+"""
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+
+# Field gizi menu, berurutan (dipakai juga oleh AdequacyEngine)
+MENU_NUTRIENTS = ('kalori', 'protein', 'karbohidrat', 'lemak')
+
+
+@dataclass(frozen=True, slots=True)
+class Lembaga:
+    id: str
+    nama: str
+    alamat: str = None
+    kontak: str = None
+
+
+@dataclass(frozen=True, slots=True)
+class Menu:
+    nama: str
+    kalori: float = 0
+    protein: float = 0
+    karbohidrat: float = 0
+    lemak: float = 0
+
+    def gizi(self):
+        """Kandungan gizi per porsi sebagai dict (untuk AdequacyEngine)"""
+        return {n: getattr(self, n) for n in MENU_NUTRIENTS}
+
+
+@dataclass(frozen=True, slots=True)
+class Penerima:
+    id: int
+    nama: str
+    ttl: str = None
+    jenis_kelamin: str = None
+    bb: float = None
+    tb: float = None
+    lembaga: str = None
+
+
+@dataclass(frozen=True, slots=True)
+class Produsen:
+    id: str
+    nama: str
+    alamat: str = None
+    kapasitas: int = None
+    rating: float = None
+    status: str = None
+
+
+class Registry:
+    """Kumpulan record terindeks per `key`, dengan indeks unik tambahan (`aliases`)
+    dan pengelompokan opsional (`group`, mis. penerima per lembaga)
+
+    Urutan record mengikuti urutan penambahan.
+    """
+
+    def __init__(self, key, label='nama', aliases=(), group=None):
+        self.key = key
+        self.label = label
+        self.group = group
+        self.version = 0
+        self._by_key = {}
+        self._aliases = {field: {} for field in aliases}
+        self._groups = defaultdict(list)
+        self._cache = {}
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._by_key)
+
+    def __contains__(self, key):
+        return key in self._by_key
+
+    def __iter__(self):
+        return iter(self.records())
+
+    def __getitem__(self, key):
+        return self._by_key[key]
+
+    def get(self, key, default=None):
+        return self._by_key.get(key, default)
+
+    def find(self, field, value, default=None):
+        """Lookup lewat indeks unik tambahan, mis. lembaga per id"""
+        key = self._aliases[field].get(value)
+        return default if key is None else self._by_key[key]
+
+    def add(self, *records):
+        """Tambah (atau ganti) record; cache daftar hanya dibuang di sini"""
+        with self._lock:
+            for record in records:
+                key = getattr(record, self.key)
+                old = self._by_key.get(key)
+                if old is not None:
+                    # Record lama diganti: lepas alias dan keanggotaan kelompoknya
+                    for field, index in self._aliases.items():
+                        if index.get(getattr(old, field)) == key:
+                            del index[getattr(old, field)]
+                    if self.group is not None:
+                        self._groups[getattr(old, self.group)].remove(key)
+                self._by_key[key] = record
+                for field, index in self._aliases.items():
+                    index[getattr(record, field)] = key
+                if self.group is not None:
+                    self._groups[getattr(record, self.group)].append(key)
+            self._cache.clear()
+            self.version += 1
+
+    def records(self, group=None):
+        """Tuple record (seluruhnya, atau satu kelompok), di-cache sampai ada perubahan"""
+        return self._cached(('records', group), lambda: tuple(
+            self._by_key.values() if group is None
+            else (self._by_key[k] for k in self._groups.get(group, ()))
+        ))
+
+    def options(self, group=None):
+        """Tuple label (default: nama) untuk selectbox, di-cache sampai ada perubahan"""
+        return self._cached(('options', group), lambda: tuple(
+            getattr(r, self.label) for r in self.records(group)
+        ))
+
+    def _cached(self, name, build):
+        value = self._cache.get(name)
+        if value is None:
+            with self._lock:
+                value = self._cache.get(name)
+                if value is None:
+                    value = self._cache[name] = build()
+        return value
@@ -0,0 +1,326 @@
+"""Penyimpanan bersama data MBG (SQLite) untuk semua sesi mbg1.py
+
+Semua entitas (lembaga, penerima, menu, kuota, pesanan logistik, pengaduan)
+disimpan di satu file SQLite lewat pool koneksi bersama, bukan di list
+st.session_state per sesi. Tabel diindeks pada lembaga/tanggal/menu sehingga
+lookup kuota per tanggal tidak memindai seluruh data.
+
+Setiap penulisan menaikkan versi tabelnya di tabel table_version (lewat
+trigger, jadi juga penulisan dari proses lain); halaman memakai versi ini
+sebagai kunci cache (st.cache_data) sehingga pembacaan ulang hanya terjadi
+setelah ada perubahan. Lembaga, menu, penerima dan produsen juga dimuat ke
+registry terindeks (mbg_registry.py) yang disinkronkan lewat versi yang sama.
+"""
+import threading
+
+from mbg_registry import Lembaga, Menu, Penerima, Produsen, Registry
+from sqlite_pool import ConnectionPool
+
+MBG_DB_PATH = 'mbg_monitoring.db'
+
+TABLES = ('lembaga', 'penerima', 'menu', 'kuota', 'pesanan', 'pengaduan', 'produsen')
+
+
+def _version_triggers(table):
+    """Trigger yang menaikkan versi `table` pada setiap INSERT/UPDATE/DELETE"""
+    return [f"INSERT OR IGNORE INTO table_version (name, version) VALUES ('{table}', 0)"] + [
+        f'''
+        CREATE TRIGGER IF NOT EXISTS {table}_version_{op.lower()} AFTER {op} ON {table}
+        BEGIN
+            UPDATE table_version SET version = version + 1 WHERE name = '{table}';
+        END
+        '''
+        for op in ('INSERT', 'UPDATE', 'DELETE')
+    ]
+
+# Migrasi skema berurutan; indeks ke-i menaikkan PRAGMA user_version ke i + 1
+SCHEMA_MIGRATIONS = [
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS lembaga (
+            id TEXT PRIMARY KEY,
+            nama TEXT NOT NULL UNIQUE,
+            alamat TEXT,
+            kontak TEXT
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS penerima (
+            id INTEGER PRIMARY KEY,
+            nama TEXT,
+            ttl TEXT,
+            jenis_kelamin TEXT,
+            bb REAL,
+            tb REAL,
+            lembaga TEXT
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS menu (
+            nama TEXT PRIMARY KEY,
+            kalori REAL,
+            protein REAL,
+            karbohidrat REAL,
+            lemak REAL
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS kuota (
+            id INTEGER PRIMARY KEY,
+            lembaga TEXT NOT NULL,
+            tanggal TEXT NOT NULL,
+            menu TEXT NOT NULL,
+            kuota INTEGER NOT NULL,
+            terpakai INTEGER NOT NULL DEFAULT 0
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS pesanan (
+            seq INTEGER PRIMARY KEY,
+            id TEXT NOT NULL,
+            lembaga TEXT,
+            menu TEXT,
+            jumlah INTEGER,
+            tanggal TEXT,
+            waktu TEXT,
+            logistik TEXT,
+            produsen TEXT,
+            status TEXT
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS pengaduan (
+            id INTEGER PRIMARY KEY,
+            tanggal TEXT,
+            jenis TEXT,
+            deskripsi TEXT,
+            status TEXT,
+            lembaga TEXT
+        )
+        ''',
+        "CREATE INDEX IF NOT EXISTS idx_penerima_lembaga ON penerima (lembaga)",
+        "CREATE INDEX IF NOT EXISTS idx_kuota_tanggal_lembaga ON kuota (tanggal, lembaga)",
+        "CREATE INDEX IF NOT EXISTS idx_kuota_lembaga_tanggal ON kuota (lembaga, tanggal)",
+        "CREATE INDEX IF NOT EXISTS idx_kuota_menu ON kuota (menu)",
+        "CREATE INDEX IF NOT EXISTS idx_pesanan_lembaga ON pesanan (lembaga)",
+        "CREATE INDEX IF NOT EXISTS idx_pengaduan_lembaga ON pengaduan (lembaga)",
+        '''
+        CREATE TABLE IF NOT EXISTS table_version (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL
+        )
+        ''',
+        *(sql for table in ('lembaga', 'penerima', 'menu', 'kuota', 'pesanan', 'pengaduan') for sql in _version_triggers(table)),
+    ],
+    [
+        # Data contoh (sama dengan data dummy lama di session state)
+        '''
+        INSERT OR IGNORE INTO lembaga (id, nama, alamat, kontak) VALUES
+            ('LP001', 'SDN Bandung 1', 'Jl. Merdeka No. 1', '022-1234567'),
+            ('LP002', 'SMP Negeri 5', 'Jl. Sudirman No. 25', '022-7654321'),
+            ('LP003', 'SMA Negeri 3', 'Jl. Asia Afrika No. 10', '022-9876543')
+        ''',
+        '''
+        INSERT INTO penerima (nama, ttl, jenis_kelamin, bb, tb, lembaga) VALUES
+            ('Ahmad Rizki', 'Bandung, 15 Mei 2010', 'Laki-laki', 35, 140, 'SDN Bandung 1'),
+            ('Siti Nurhaliza', 'Bandung, 22 Juli 2009', 'Perempuan', 32, 135, 'SDN Bandung 1'),
+            ('Budi Santoso', 'Bandung, 8 Maret 2011', 'Laki-laki', 28, 125, 'SDN Bandung 1')
+        ''',
+        '''
+        INSERT OR IGNORE INTO menu (nama, kalori, protein, karbohidrat, lemak) VALUES
+            ('Nasi + Ayam Bakar + Sayur', 650, 35, 75, 18),
+            ('Nasi + Ikan Gurame + Tahu', 580, 32, 70, 15),
+            ('Nasi + Rendang + Kangkung', 720, 38, 80, 22),
+            ('Nasi + Tempe Goreng + Gado-gado', 520, 25, 68, 12)
+        ''',
+        '''
+        INSERT INTO kuota (lembaga, tanggal, menu, kuota, terpakai) VALUES
+            ('SDN Bandung 1', '2025-01-31', 'Nasi + Ayam Bakar + Sayur', 150, 120),
+            ('SMP Negeri 5', '2025-01-31', 'Nasi + Ikan Gurame + Tahu', 200, 180),
+            ('SMA Negeri 3', '2025-01-31', 'Nasi + Rendang + Kangkung', 180, 160)
+        ''',
+    ],
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS produsen (
+            id TEXT PRIMARY KEY,
+            nama TEXT NOT NULL UNIQUE,
+            alamat TEXT,
+            kapasitas INTEGER,
+            rating REAL,
+            status TEXT
+        )
+        ''',
+        '''
+        INSERT OR IGNORE INTO produsen (id, nama, alamat, kapasitas, rating, status) VALUES
+            ('PR001', 'Katering Sehat Bandung', 'Jl. Setiabudi No. 15', 500, 4.8, 'Aktif'),
+            ('PR002', 'Nutrisi Prima', 'Jl. Dago No. 88', 750, 4.6, 'Aktif'),
+            ('PR003', 'Makanan Bergizi Nusantara', 'Jl. Cihampelas No. 45', 600, 4.7, 'Aktif')
+        ''',
+        *_version_triggers('produsen'),
+    ],
+]
+
+PENERIMA_COLUMNS = ('id', 'nama', 'ttl', 'jenis_kelamin', 'bb', 'tb', 'lembaga')
+PESANAN_COLUMNS = ('id', 'lembaga', 'menu', 'jumlah', 'tanggal', 'waktu', 'logistik', 'produsen', 'status')
+FETCH_BATCH = 5000
+
+
+def _rows(cursor):
+    """Baris hasil query sebagai dict (nama kolom -> nilai), field NULL dilewati"""
+    columns = [c[0] for c in cursor.description]
+    return [{k: v for k, v in zip(columns, row) if v is not None} for row in cursor]
+
+
+class MbgStore:
+    """Akses data MBG bersama; aman dipakai bersamaan oleh banyak sesi"""
+
+    def __init__(self, path=MBG_DB_PATH):
+        self.pool = ConnectionPool(path, SCHEMA_MIGRATIONS)
+        self._lock = threading.Lock()
+        self._synced = {}
+
+        # Registry dimuat sekali per proses lalu hanya disinkronkan saat versi tabelnya berubah
+        self.penerima = Registry('id', group='lembaga')
+        self.sync()
+
+    def version(self, table):
+        """Penanda perubahan tabel dari database (naik setiap penulisan, dari proses mana pun)"""
+        with self.pool.connection() as conn:
+            return conn.execute("SELECT version FROM table_version WHERE name = ?", (table,)).fetchone()[0]
+
+    def sync(self):
+        """Perbarui registry dari tabel yang berubah sejak sinkronisasi terakhir (dipanggil tiap rerun)"""
+        with self._lock:
+            for table, load in (('lembaga', self._load_lembaga), ('menu', self._load_menu),
+                                ('produsen', self._load_produsen), ('penerima', self._load_penerima)):
+                version = self.version(table)
+                if self._synced.get(table) != version:
+                    load()
+                    self._synced[table] = version
+
+    def _load_lembaga(self):
+        registry = Registry('nama', aliases=('id',))
+        registry.add(*(Lembaga(**r) for r in self._query("SELECT * FROM lembaga ORDER BY id")))
+        self.lembaga = registry
+
+    def _load_menu(self):
+        registry = Registry('nama')
+        registry.add(*(Menu(**r) for r in self._query("SELECT * FROM menu ORDER BY rowid")))
+        self.menu = registry
+
+    def _load_produsen(self):
+        registry = Registry('nama', aliases=('id',))
+        registry.add(*(Produsen(**r) for r in self._query("SELECT * FROM produsen ORDER BY id")))
+        self.produsen = registry
+
+    def _load_penerima(self):
+        # Penerima hanya ditambah: cukup muat id setelah id terbesar di registry
+        last_id = self.penerima.records()[-1].id if len(self.penerima) else 0
+        for batch in self.iter_penerima(after_id=last_id):
+            self.penerima.add(*(Penerima(**r) for r in batch))
+
+    def _query(self, sql, params=()):
+        with self.pool.connection() as conn:
+            return _rows(conn.execute(sql, params))
+
+    def _write(self, sql, params=()):
+        with self.pool.connection() as conn:
+            with conn:
+                cursor = conn.execute(sql, params)
+                return cursor.fetchone() if cursor.description else cursor.lastrowid
+
+    # --- Penerima ---
+    def iter_penerima(self, after_id=0, batch=FETCH_BATCH):
+        """Penerima dengan id > after_id, per potongan list (untuk sinkronisasi inkremental)"""
+        with self.pool.connection() as conn:
+            cursor = conn.execute("SELECT * FROM penerima WHERE id > ? ORDER BY id", (after_id,))
+            columns = [c[0] for c in cursor.description]
+            while True:
+                rows = cursor.fetchmany(batch)
+                if not rows:
+                    break
+                yield [dict(zip(columns, row)) for row in rows]
+
+    def add_penerima(self, data):
+        values = tuple(data.get(c) for c in PENERIMA_COLUMNS[1:])
+        penerima_id = self._write(
+            "INSERT INTO penerima (nama, ttl, jenis_kelamin, bb, tb, lembaga) VALUES (?, ?, ?, ?, ?, ?)",
+            values
+        )
+        self.sync()
+        return penerima_id
+
+    # --- Kuota ---
+    def kuota(self, tanggal=None, lembaga=None):
+        """Kuota per tanggal dan/atau lembaga (lewat indeks), urut sesuai input"""
+        where, params = [], []
+        if tanggal is not None:
+            where.append("tanggal = ?")
+            params.append(str(tanggal))
+        if lembaga is not None:
+            where.append("lembaga = ?")
+            params.append(lembaga)
+        sql = "SELECT * FROM kuota" + (" WHERE " + " AND ".join(where) if where else "") + " ORDER BY id"
+        return self._query(sql, params)
+
+    def kuota_terkirim(self):
+        """Kuota yang sudah terpakai (pengiriman terkonfirmasi), untuk membangun status AKG"""
+        return self._query("SELECT lembaga, tanggal, menu FROM kuota WHERE terpakai > 0 ORDER BY tanggal, id")
+
+    def add_kuota(self, data):
+        return self._write(
+            "INSERT INTO kuota (lembaga, tanggal, menu, kuota, terpakai) VALUES (?, ?, ?, ?, ?)",
+            (data["lembaga"], str(data["tanggal"]), data["menu"], data["kuota"], data.get("terpakai", 0))
+        )
+
+    def confirm_kuota(self, kuota_id, jumlah):
+        """Tambah porsi terpakai (maksimal sebesar kuota); kembalikan (lembaga, tanggal, menu, terpakai)"""
+        return self._write(
+            "UPDATE kuota SET terpakai = MIN(kuota, terpakai + ?) WHERE id = ? RETURNING lembaga, tanggal, menu, terpakai",
+            (jumlah, kuota_id)
+        )
+
+    # --- Pesanan logistik ---
+    def pesanan(self, limit=None):
+        """Pesanan logistik urut waktu dibuat; dengan `limit` hanya yang terbaru"""
+        if limit is None:
+            return self._query("SELECT * FROM pesanan ORDER BY seq")
+        return self._query("SELECT * FROM (SELECT * FROM pesanan ORDER BY seq DESC LIMIT ?) ORDER BY seq", (limit,))
+
+    def count_pesanan(self):
+        with self.pool.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM pesanan").fetchone()[0]
+
+    def iter_pesanan(self, batch=FETCH_BATCH):
+        """Semua pesanan per baris tanpa memuat seluruh tabel ke memori (untuk cetak label)"""
+        with self.pool.connection() as conn:
+            cursor = conn.execute("SELECT * FROM pesanan ORDER BY seq")
+            columns = [c[0] for c in cursor.description]
+            while True:
+                rows = cursor.fetchmany(batch)
+                if not rows:
+                    break
+                for row in rows:
+                    yield {k: v for k, v in zip(columns, row) if v is not None}
+
+    def add_pesanan(self, data):
+        return self._write(
+            f"INSERT INTO pesanan ({', '.join(PESANAN_COLUMNS)}) VALUES ({', '.join('?' * len(PESANAN_COLUMNS))})",
+            tuple(data.get(c) for c in PESANAN_COLUMNS)
+        )
+
+    # --- Pengaduan ---
+    def pengaduan(self, limit=5, lembaga=None):
+        """Pengaduan terbaru (urut lama ke baru)"""
+        where, params = ("WHERE lembaga = ? ", [lembaga]) if lembaga is not None else ("", [])
+        return self._query(
+            f"SELECT * FROM (SELECT * FROM pengaduan {where}ORDER BY id DESC LIMIT ?) ORDER BY id",
+            params + [limit]
+        )
+
+    def add_pengaduan(self, data):
+        return self._write(
+            "INSERT INTO pengaduan (tanggal, jenis, deskripsi, status, lembaga) VALUES (?, ?, ?, ?, ?)",
+            (data["tanggal"], data["jenis"], data["deskripsi"], data["status"], data.get("lembaga"))
+        )
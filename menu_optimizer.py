@@ -0,0 +1,128 @@
+"""Optimasi menu: berat bahan yang memenuhi target gizi (AKG) dengan biaya atau deviasi minimum
+
+Solver QP berbatas kotak (projected gradient dipercepat / FISTA) murni NumPy,
+tanpa SciPy. Semua fungsi bekerja per batch: banyak menu (misalnya setiap
+kelompok umur untuk setiap hari) diselesaikan sekaligus dengan operasi array
+yang sama.
+
+Untuk x = berat bahan (satuan 100 g), N = matriks nutrien (k nutrien x n bahan)
+dan target t, deviasi relatif per nutrien adalah r = (N x - t) / t.
+
+- 'deviation' : min 1/2 |r|^2                    dengan lower <= x <= upper
+- 'cost'      : min c.x + rho/2 |dz(r)|^2         dengan lower <= x <= upper
+
+dz(r) adalah bagian r di luar pita toleransi. rho dinaikkan bertahap
+(continuation) sehingga solusi mendekati LP biaya minimum dengan kendala
+toleransi gizi.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+OBJECTIVES = ('cost', 'deviation')
+PENALTY_SCHEDULE = (1e1, 1e2, 1e3, 1e4)
+MAX_ITER = 3000
+# Berhenti bila tidak ada berat yang berubah lebih dari 1 mg (satuan x = 100 g)
+STEP_TOL = 1e-5
+# Kelonggaran numerik saat memeriksa apakah deviasi masih dalam toleransi
+FEASIBILITY_SLACK = 1e-3
+
+MenuSolution = namedtuple('MenuSolution', 'weights achieved deviation feasible cost iterations')
+
+
+def _batch(value, shape, name):
+    """Sebarkan nilai skalar/vektor ke bentuk batch `shape` sebagai float64"""
+    try:
+        return np.broadcast_to(np.asarray(value, dtype=np.float64), shape)
+    except ValueError:
+        raise ValueError(f"Bentuk {name} {np.shape(value)} tidak cocok dengan {shape}") from None
+
+
+def _fista(x, grad, lipschitz, lower, upper, max_iter):
+    """Projected gradient dipercepat dengan restart adaptif per menu"""
+    step = 1.0 / lipschitz[:, None]
+    y, t = x.copy(), np.ones(len(x))
+    for iteration in range(1, max_iter + 1):
+        g = grad(y)
+        x_new = np.clip(y - step * g, lower, upper)
+        delta = x_new - x
+        if np.all(np.abs(delta) <= STEP_TOL):
+            return x_new, iteration
+        # Momentum direset untuk menu yang arahnya berbalik (O'Donoghue & Candes)
+        restart = np.einsum('bn,bn->b', g, x_new - y) > 0
+        t_new = 0.5 * (1.0 + np.sqrt(1.0 + 4.0 * t * t))
+        momentum = np.where(restart, 0.0, (t - 1.0) / t_new)
+        y = x_new + momentum[:, None] * delta
+        x, t = x_new, np.where(restart, 1.0, t_new)
+    return x, max_iter
+
+
+def solve_menus(nutrients, targets, lower, upper, cost=None, tolerance=0.1, objective='cost', max_iter=MAX_ITER):
+    """Selesaikan satu batch menu
+
+    nutrients : (k, n) kandungan nutrien per 100 g tiap bahan
+    targets   : (B, k) atau (k,) target nutrien per menu (harus positif)
+    lower, upper : batas berat per bahan dalam gram, bentuk (n,) atau (B, n)
+    cost      : harga per 100 g, bentuk (n,) atau (B, n); wajib untuk objective='cost'
+    tolerance : toleransi relatif per nutrien, skalar atau (k,) / (B, k)
+
+    Kembalikan MenuSolution dengan weights dalam gram (B, n), achieved (B, k),
+    deviation relatif (B, k), feasible (B,), cost (B,) dan jumlah iterasi.
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Objective tidak dikenal: {objective!r} (pilih dari {OBJECTIVES})")
+    nutrients = np.asarray(nutrients, dtype=np.float64)
+    k, n = nutrients.shape
+    targets = np.atleast_2d(np.asarray(targets, dtype=np.float64))
+    batch = targets.shape[0]
+    if targets.shape[1] != k:
+        raise ValueError(f"Target harus memiliki {k} nutrien, bukan {targets.shape[1]}")
+    if np.any(targets <= 0):
+        raise ValueError("Target nutrien harus positif")
+
+    lower = _batch(lower, (batch, n), 'lower') / 100.0
+    upper = _batch(upper, (batch, n), 'upper') / 100.0
+    if np.any(lower > upper):
+        raise ValueError("Batas minimum bahan melebihi batas maksimum")
+    band = _batch(tolerance, (batch, k), 'tolerance')
+    if objective == 'cost':
+        if cost is None:
+            raise ValueError("Harga bahan wajib diisi untuk objective='cost'")
+        price = _batch(cost, (batch, n), 'cost')
+    else:
+        price = np.zeros((batch, n))
+
+    # Matriks nutrien yang dinormalisasi target tiap menu: r = A x - 1
+    scaled = nutrients[None, :, :] / targets[:, :, None]
+    sigma = np.linalg.svd(scaled, compute_uv=False)[:, 0]
+    lipschitz_base = np.maximum(sigma * sigma, 1e-12)
+
+    def residual(x):
+        return np.einsum('bkn,bn->bk', scaled, x) - 1.0
+
+    x = np.clip(np.full((batch, n), 1.0), lower, upper)
+    iterations = 0
+    if objective == 'deviation':
+        x, used = _fista(x, lambda z: np.einsum('bkn,bk->bn', scaled, residual(z)), lipschitz_base, lower, upper, max_iter)
+        iterations += used
+    else:
+        # Harga dinormalisasi agar skalanya sebanding dengan penalti gizi
+        price_scale = np.maximum(np.abs(price).max(axis=1, keepdims=True), 1e-12)
+        unit_price = price / price_scale
+        for rho in PENALTY_SCHEDULE:
+            def grad(z, rho=rho):
+                r = residual(z)
+                outside = np.sign(r) * np.maximum(np.abs(r) - band, 0.0)
+                return unit_price + rho * np.einsum('bkn,bk->bn', scaled, outside)
+            x, used = _fista(x, grad, rho * lipschitz_base, lower, upper, max_iter)
+            iterations += used
+
+    deviation = residual(x)
+    return MenuSolution(
+        weights=x * 100.0,
+        achieved=x @ nutrients.T,
+        deviation=deviation,
+        feasible=np.all(np.abs(deviation) <= band + FEASIBILITY_SLACK, axis=1),
+        cost=np.einsum('bn,bn->b', price, x),
+        iterations=iterations,
+    )
@@ -1,72 +1,630 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-from sklearn.linear_model import LinearRegression
-import sqlite3
-import plotly.express as px
+from datetime import datetime, timedelta, date
+import re
+import threading
+from collections import defaultdict
 import uuid
+import numbers
+import os
+import time
 
-# Koneksi ke database SQLite
-conn = sqlite3.connect('construction_management.db')
-cursor = conn.cursor()
-
-# Inisialisasi database
-cursor.execute('''
-CREATE TABLE IF NOT EXISTS inventory (
-    id TEXT PRIMARY KEY,
-    item_code TEXT,
-    item_name TEXT,
-    quantity INTEGER,
-    unit TEXT,
-    location TEXT,
-    last_updated TEXT
-)
-''')
-
-cursor.execute('''
-CREATE TABLE IF NOT EXISTS schedule (
-    id TEXT PRIMARY KEY,
-    activity TEXT,
-    duration INTEGER,
-    start_date TEXT,
-    end_date TEXT,
-    dependency TEXT
-)
-''')
-
-cursor.execute('''
-CREATE TABLE IF NOT EXISTS usage_history (
-    id TEXT PRIMARY KEY,
-    item_name TEXT,
-    quantity_used INTEGER,
-    date_used TEXT
-)
-''')
-conn.commit()
+from sqlite_pool import ConnectionPool
+
+# Koneksi ke database SQLite (pool bersama di sqlite_pool.py)
+DB_PATH = 'construction_management.db'
+
+# Migrasi skema berurutan; indeks ke-i menaikkan PRAGMA user_version ke i + 1
+SCHEMA_MIGRATIONS = [
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS inventory (
+            id TEXT PRIMARY KEY,
+            item_code TEXT,
+            item_name TEXT,
+            quantity INTEGER,
+            unit TEXT,
+            location TEXT,
+            last_updated TEXT
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS schedule (
+            id TEXT PRIMARY KEY,
+            activity TEXT,
+            duration INTEGER,
+            start_date TEXT,
+            end_date TEXT,
+            dependency TEXT
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS usage_history (
+            id TEXT PRIMARY KEY,
+            item_name TEXT,
+            quantity_used INTEGER,
+            date_used TEXT
+        )
+        ''',
+    ],
+    [
+        # Lookup per barang dan riwayat penggunaan per (barang, tanggal) tanpa full scan
+        "CREATE INDEX IF NOT EXISTS idx_inventory_item_name ON inventory (item_name)",
+        "CREATE INDEX IF NOT EXISTS idx_inventory_item_code ON inventory (item_code)",
+        "CREATE INDEX IF NOT EXISTS idx_usage_history_item_date ON usage_history (item_name, date_used)",
+        "ANALYZE",
+    ],
+    [
+        # Pencarian awalan tanpa beda huruf besar/kecil (LIKE 'abc%') dan urutan grid inventaris
+        "CREATE INDEX IF NOT EXISTS idx_inventory_item_name_nocase ON inventory (item_name COLLATE NOCASE)",
+        "CREATE INDEX IF NOT EXISTS idx_inventory_item_code_nocase ON inventory (item_code COLLATE NOCASE)",
+        "CREATE INDEX IF NOT EXISTS idx_inventory_location_nocase ON inventory (location COLLATE NOCASE)",
+    ],
+]
+
+@st.cache_resource
+def get_db_pool():
+    """Pool koneksi database (dibuat sekali per proses Streamlit)"""
+    return ConnectionPool(DB_PATH, SCHEMA_MIGRATIONS)
+
+db = get_db_pool()
+
+def read_sql(query, params=()):
+    """Jalankan query baca dan kembalikan DataFrame"""
+    with db.connection() as conn:
+        return pd.read_sql_query(query, conn, params=params)
+
+def execute_write(query, params=()):
+    """Jalankan satu perintah tulis dalam transaksinya sendiri; kembalikan rowid terakhir"""
+    with db.connection() as conn:
+        with conn:
+            return conn.execute(query, params).lastrowid
+
+def table_version(table):
+    """Penanda isi tabel yang hanya ditambah (rowid terakhir)"""
+    with db.connection() as conn:
+        return conn.execute(f"SELECT COALESCE(MAX(rowid), 0) FROM {table}").fetchone()[0]
 
 # Fungsi untuk menghasilkan UUID
 def generate_uuid():
     return str(uuid.uuid4())
 
-# Fungsi untuk memprediksi kebutuhan material menggunakan AI (Linear Regression)
-def predict_material_needed(item_name, historical_data):
-    if len(historical_data) < 2:
-        return 0  # Tidak cukup data untuk prediksi
-    X = np.array(range(len(historical_data))).reshape(-1, 1)
-    y = historical_data['quantity_used'].values
-    model = LinearRegression()
-    model.fit(X, y)
-    next_period = len(historical_data)
-    prediction = model.predict([[next_period]])
-    return max(0, int(prediction[0]))
+def generate_uuids(n):
+    """UUID berurutan waktu (format UUIDv7) untuk impor massal
+
+    Id yang naik monoton disisipkan di ujung indeks primary key, jauh lebih
+    cepat daripada uuid4 acak untuk jutaan baris.
+    """
+    raw = np.frombuffer(os.urandom(16 * n), dtype=np.uint8).reshape(n, 16).copy()
+    # 48 bit milidetik, lalu penghitung 26 bit di rand_a (12 bit) + awal rand_b (14 bit)
+    millis = time.time_ns() // 1_000_000
+    raw[:, :6] = np.frombuffer(millis.to_bytes(6, 'big'), dtype=np.uint8)
+    seq = np.arange(n, dtype=np.uint32)
+    raw[:, 6] = 0x70 | ((seq >> 22) & 0x0F)
+    raw[:, 7] = (seq >> 14) & 0xFF
+    raw[:, 8] = 0x80 | ((seq >> 8) & 0x3F)
+    raw[:, 9] = seq & 0xFF
+    h = raw.tobytes().hex()
+    return [f"{h[i:i+8]}-{h[i+8:i+12]}-{h[i+12:i+16]}-{h[i+16:i+20]}-{h[i+20:i+32]}" for i in range(0, 32 * n, 32)]
+
+# Grid inventaris: keyset pagination berurut (nama tanpa beda huruf, rowid)
+INVENTORY_PAGE_SIZES = [25, 50, 100]
+PICKER_LIMIT = 20
+
+def like_prefix(text):
+    """Pola LIKE awalan dengan karakter khusus di-escape"""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+def fetch_inventory_page(search="", after=None, page_size=INVENTORY_PAGE_SIZES[0]):
+    """Satu halaman inventaris setelah kunci `after` (nama, rowid); kembalikan (DataFrame, kunci halaman berikutnya)
+
+    Pencarian berupa awalan kode/nama/lokasi dan dilayani indeks NOCASE, jadi
+    biaya per halaman tidak bergantung pada ukuran tabel.
+    """
+    clauses, params = [], []
+    if search:
+        clauses.append("(item_code LIKE ? ESCAPE '\\' OR item_name LIKE ? ESCAPE '\\' OR location LIKE ? ESCAPE '\\')")
+        params += [like_prefix(search)] * 3
+    if after is not None:
+        # Saat mencari, unary + membuat planner memakai indeks pencarian (MULTI-INDEX OR), bukan memindai urutan nama
+        name = "(+item_name)" if search else "item_name"
+        clauses.append(f"{name} COLLATE NOCASE >= ? AND ({name} COLLATE NOCASE > ? OR rowid > ?)")
+        params += [after[0], after[0], after[1]]
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    page = read_sql(f"""
+        SELECT rowid AS row_key, id, item_code, item_name, quantity, unit, location, last_updated
+        FROM inventory {where}
+        ORDER BY item_name COLLATE NOCASE, rowid
+        LIMIT ?
+    """, params + [page_size + 1])
+    next_key = None
+    if len(page) > page_size:
+        page = page.iloc[:page_size]
+        next_key = (page["item_name"].iloc[-1], int(page["row_key"].iloc[-1]))
+    return page.drop(columns="row_key"), next_key
+
+def search_items(prefix, limit=PICKER_LIMIT):
+    """Barang yang kode atau namanya diawali `prefix` (maksimal `limit` baris)"""
+    if not prefix:
+        return read_sql("SELECT id, item_code, item_name FROM inventory ORDER BY item_name COLLATE NOCASE, rowid LIMIT ?", (limit,))
+    pattern = like_prefix(prefix)
+    return read_sql('''
+        SELECT id, item_code, item_name FROM inventory
+        WHERE item_code LIKE ? ESCAPE '\\' OR item_name LIKE ? ESCAPE '\\'
+        ORDER BY item_name COLLATE NOCASE, rowid
+        LIMIT ?
+    ''', (pattern, pattern, limit))
+
+def item_label(item):
+    return f"{item['item_code'] or ''} - {item['item_name'] or ''}"
+
+def item_picker(label, key):
+    """Pemilih barang typeahead: opsi diambil dari server per awalan, bukan seluruh daftar nama
+
+    Kembalikan dict (id, item_code, item_name) barang terpilih atau None.
+    """
+    prefix = st.text_input(f"Cari {label}", key=f"{key}_search", placeholder="Ketik awalan kode atau nama barang")
+    matches = {row["id"]: row for row in search_items(prefix.strip()).to_dict("records")}
+    selected = st.selectbox(label, list(matches), format_func=lambda item_id: item_label(matches[item_id]), key=key)
+    return matches.get(selected)
+
+def resolve_item_codes(codes):
+    """Petakan kode barang ke baris inventaris lewat indeks item_code; kembalikan {kode: [baris, ...]}"""
+    codes = list(dict.fromkeys(codes))
+    found = defaultdict(list)
+    for start in range(0, len(codes), 500):
+        chunk = codes[start:start + 500]
+        rows = read_sql(f"SELECT id, item_code, item_name FROM inventory WHERE item_code IN ({', '.join('?' * len(chunk))})", chunk)
+        for row in rows.to_dict("records"):
+            found[row["item_code"]].append(row)
+    return found
+
+# Pengurangan stok bersyarat: baris hanya berubah jika stok cukup
+STOCK_DECREMENT_SQL = """
+UPDATE inventory SET quantity = quantity - ?, last_updated = ?
+WHERE id = ? AND quantity >= ?
+RETURNING item_name
+"""
+
+def is_valid_usage_quantity(quantity):
+    """Jumlah penggunaan harus bilangan bulat positif"""
+    if isinstance(quantity, bool) or not isinstance(quantity, numbers.Real):
+        return False
+    return quantity > 0 and float(quantity).is_integer()
+
+def record_usage_batch(lines, date_used=None):
+    """Catat banyak baris penggunaan (item_id, jumlah) dalam satu transaksi
+
+    Semua baris dibatalkan jika ada stok yang tidak cukup; kembalikan daftar
+    item_id yang gagal (kosong jika semua berhasil dicatat). ValueError bila
+    ada jumlah yang bukan bilangan bulat positif (tidak ada yang dicatat).
+    """
+    lines = list(lines)
+    invalid = [item_id for item_id, quantity_used in lines if not is_valid_usage_quantity(quantity_used)]
+    if invalid:
+        raise ValueError(f"Jumlah penggunaan harus bilangan bulat positif ({len(invalid)} baris tidak valid)")
+    now = datetime.now()
+    timestamp = now.strftime("%Y-%m-%d %H:%M:%S")
+    date_used = date_used or now.strftime("%Y-%m-%d")
+    history, failed = [], []
+    with db.connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        for item_id, quantity_used in lines:
+            quantity_used = int(quantity_used)
+            rows = conn.execute(STOCK_DECREMENT_SQL, (quantity_used, timestamp, item_id, quantity_used)).fetchall()
+            if rows:
+                history.append((generate_uuid(), rows[0][0], quantity_used, date_used))
+            else:
+                failed.append(item_id)
+        if failed:
+            conn.rollback()
+            return failed
+        conn.executemany("INSERT INTO usage_history (id, item_name, quantity_used, date_used) VALUES (?, ?, ?, ?)", history)
+        conn.commit()
+    return []
+
+def record_usage(item_id, quantity_used, date_used=None):
+    """Kurangi stok dan catat riwayat penggunaan satu barang; False jika stok tidak cukup
+
+    ValueError bila jumlah bukan bilangan bulat positif.
+    """
+    return not record_usage_batch([(item_id, quantity_used)], date_used)
+
+# Impor massal dari CSV: kolom wajib, kolom jumlah dan kolom tanggal per tabel
+IMPORT_TABLES = {
+    "inventory": {
+        "columns": ["item_code", "item_name", "quantity", "unit", "location"],
+        "quantity": "quantity",
+        "date": None,
+    },
+    "usage_history": {
+        "columns": ["item_name", "quantity_used", "date_used"],
+        "quantity": "quantity_used",
+        "date": "date_used",
+    },
+}
+IMPORT_CHUNK_ROWS = 100_000
+
+def validate_import_chunk(chunk, table):
+    """Pisahkan baris valid dari satu chunk CSV; kembalikan (DataFrame valid, jumlah baris ditolak)"""
+    spec = IMPORT_TABLES[table]
+    missing = [col for col in spec["columns"] if col not in chunk.columns]
+    if missing:
+        raise ValueError(f"Kolom wajib tidak ada: {', '.join(missing)}")
+    
+    df = chunk[spec["columns"]].copy()
+    quantity = pd.to_numeric(df[spec["quantity"]], errors="coerce")
+    valid = df["item_name"].notna() & quantity.notna() & (quantity >= 0) & (quantity % 1 == 0)
+    if spec["date"]:
+        dates = pd.to_datetime(df[spec["date"]], errors="coerce", format="ISO8601")
+        valid &= dates.notna()
+        # Disimpan dalam format yang sama dengan input form (YYYY-MM-DD)
+        df[spec["date"]] = dates.values.astype("datetime64[D]").astype(str)
+    df[spec["quantity"]] = quantity.fillna(0).astype("int64")
+    return df[valid], int((~valid).sum())
+
+def import_csv(table, source, chunksize=IMPORT_CHUNK_ROWS, on_progress=None):
+    """Impor CSV besar ke `table` per chunk, satu transaksi executemany per chunk
+
+    Baris yang tidak valid dilewati. `on_progress(imported, skipped)` dipanggil
+    setelah setiap chunk di-commit. Kembalikan (jumlah diimpor, jumlah dilewati).
+    """
+    spec = IMPORT_TABLES[table]
+    columns = ["id"] + spec["columns"] + (["last_updated"] if table == "inventory" else [])
+    insert_sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    imported = skipped = 0
+    with db.connection() as conn:
+        for chunk in pd.read_csv(source, chunksize=chunksize, dtype=str, skipinitialspace=True):
+            rows, rejected = validate_import_chunk(chunk, table)
+            skipped += rejected
+            if table == "inventory":
+                rows = rows.assign(last_updated=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+            else:
+                # Urut per (item_name, date_used) agar indeks komposit disisipi berurutan
+                rows = rows.sort_values(["item_name", "date_used"], kind="stable")
+            values = [rows[col].astype(object).where(rows[col].notna(), None).tolist() for col in columns[1:]]
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(insert_sql, zip(generate_uuids(len(rows)), *values))
+            conn.commit()
+            imported += len(rows)
+            if on_progress is not None:
+                on_progress(imported, skipped)
+    return imported, skipped
+
+# Prediksi kebutuhan material: tren least squares per barang, dihitung untuk semua barang sekaligus
+FORECAST_PERIODS = {"D": "Harian", "W": "Mingguan", "M": "Bulanan"}
+FORECAST_COLUMNS = ["item_name", "periods", "total_used", "trend", "forecast"]
+
+def period_ordinals(dates, period):
+    """Nomor periode kalender (hari/minggu/bulan sejak epoch) untuk kolom tanggal"""
+    values = pd.to_datetime(dates, format="ISO8601").values
+    if period == "M":
+        return values.astype("datetime64[M]").astype(np.int64)
+    days = values.astype("datetime64[D]").astype(np.int64)
+    if period == "W":
+        # Minggu dimulai hari Senin (1970-01-05 adalah Senin)
+        return (days - 4) // 7
+    return days
+
+def forecast_usage(period="D"):
+    """Prediksi kebutuhan periode berikutnya untuk semua barang dari satu query teragregasi
+
+    Penggunaan dijumlahkan per periode kalender; periode tanpa penggunaan dihitung
+    nol, dari periode pertama barang sampai periode terakhir di data. Garis tren
+    dihitung dengan rumus tertutup least squares dari statistik cukup per barang.
+    """
+    usage = read_sql("SELECT item_name, date_used, SUM(quantity_used) AS quantity_used FROM usage_history GROUP BY item_name, date_used")
+    if usage.empty:
+        return pd.DataFrame(columns=FORECAST_COLUMNS)
+    
+    codes, items = pd.factorize(usage["item_name"])
+    t = period_ordinals(usage["date_used"], period)
+    y = usage["quantity_used"].to_numpy(np.float64)
+    first = np.full(len(items), t.max())
+    np.minimum.at(first, codes, t)
+    x = (t - first[codes]).astype(np.float64)
+    
+    # x = 0..n-1 per barang; nilai nol tidak menambah sum(y) maupun sum(xy)
+    n = (t.max() - first + 1).astype(np.float64)
+    sum_y = np.bincount(codes, y, minlength=len(items))
+    sum_xy = np.bincount(codes, x * y, minlength=len(items))
+    sum_x = n * (n - 1) / 2
+    sum_xx = (n - 1) * n * (2 * n - 1) / 6
+    denom = n * sum_xx - sum_x ** 2
+    slope = np.divide(n * sum_xy - sum_x * sum_y, denom, out=np.zeros_like(n), where=denom > 0)
+    intercept = (sum_y - slope * sum_x) / n
+    forecast = np.where(n >= 2, np.maximum(intercept + slope * n, 0), 0)  # Tidak cukup data untuk prediksi
+    
+    return pd.DataFrame({
+        "item_name": items,
+        "periods": n.astype(np.int64),
+        "total_used": sum_y.astype(np.int64),
+        "trend": slope,
+        "forecast": forecast.astype(np.int64),
+    })
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def load_forecast(period, version):
+    """Prediksi semua barang, di-cache sampai ada riwayat penggunaan baru"""
+    return forecast_usage(period)
+
+def get_forecast(period="D"):
+    return load_forecast(period, table_version("usage_history"))
+
+def reorder_report(period="D"):
+    """Laporan reorder semua barang: stok saat ini dibanding prediksi kebutuhan periode berikutnya"""
+    stock = read_sql("SELECT item_name, SUM(quantity) AS stock FROM inventory GROUP BY item_name")
+    report = stock.merge(get_forecast(period), on="item_name", how="left")
+    report[["periods", "total_used", "forecast"]] = report[["periods", "total_used", "forecast"]].fillna(0).astype(np.int64)
+    report["trend"] = report["trend"].fillna(0.0)
+    report["reorder_qty"] = (report["forecast"] - report["stock"]).clip(lower=0)
+    return report.sort_values(["reorder_qty", "forecast"], ascending=False, ignore_index=True)
+
+# Penjadwalan jalur kritis (CPM) untuk tabel schedule
+DEPENDENCY_SEPARATOR = re.compile(r"[,;\n]")
+
+def parse_dependencies(text):
+    """Nama aktivitas prasyarat dari teks bebas (dipisah koma/titik koma)"""
+    return list(dict.fromkeys(name.strip().lower() for name in DEPENDENCY_SEPARATOR.split(text or "") if name.strip()))
+
+class ProjectSchedule:
+    """DAG aktivitas proyek dengan mulai/selesai paling awal & paling lambat, slack dan jalur kritis
+
+    Tanggal disimpan sebagai ordinal hari; tanggal mulai di tabel menjadi batas
+    paling awal aktivitas. Mengubah satu aktivitas hanya menghitung ulang
+    turunannya (forward pass) dan leluhur yang terdampak (backward pass); semua
+    pass linear dalam jumlah node + edge yang disentuh.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.version = None
+        self._reset()
+
+    def _reset(self):
+        self.name = {}
+        self.duration = {}
+        self.not_before = {}
+        self.dependency = {}
+        self.preds = {}
+        self.succs = defaultdict(set)
+        self.by_name = defaultdict(set)
+        self.dependents = defaultdict(set)  # nama prasyarat -> id yang merujuknya
+        self.cyclic = set()
+        self.es, self.ef, self.ls, self.lf = {}, {}, {}, {}
+        self.finish = None
+
+    def load(self, schedule_df):
+        """Bangun ulang seluruh graf dari DataFrame tabel schedule"""
+        with self.lock:
+            self._reset()
+            rows = list(zip(schedule_df["id"], schedule_df["activity"], schedule_df["duration"],
+                            schedule_df["start_date"], schedule_df["dependency"]))
+            for activity_id, name, duration, start_date, dependency in rows:
+                self._add_node(activity_id, name, duration, start_date, dependency)
+            for activity_id, *_ in rows:
+                self._link(activity_id)
+            self._forward(set(self.name))
+            self._backward_all()
+
+    def set_activity(self, activity_id, name, duration, start_date, dependency):
+        """Tambah/ubah satu aktivitas lalu hitung ulang hanya subgraf yang terdampak"""
+        with self.lock:
+            old_name = self.name.get(activity_id)
+            old_preds = self.preds.get(activity_id, set())
+            old_duration = self.duration.get(activity_id)
+            if old_name is not None:
+                self._unlink(activity_id)
+            self._add_node(activity_id, name, duration, start_date, dependency)
+            self._link(activity_id)
+            # Aktivitas yang merujuk nama lama/baru aktivitas ini dihubungkan ulang
+            relink = set()
+            if old_name != self.name[activity_id]:
+                relink = (self.dependents.get(old_name, set()) | self.dependents.get(self.name[activity_id], set())) - {activity_id}
+            for other in relink:
+                self._unlink(other)
+                self._link(other)
+            
+            finish = self.finish
+            cycles_changed = self._forward({activity_id} | relink)
+            if self.finish != finish or cycles_changed:
+                self._backward_all()
+            elif old_duration != self.duration[activity_id] or old_preds != self.preds[activity_id] or relink:
+                self._backward({activity_id} | old_preds | self.preds[activity_id] | relink)
+
+    def _add_node(self, activity_id, name, duration, start_date, dependency):
+        old_name = self.name.get(activity_id)
+        if old_name is not None:
+            self.by_name[old_name].discard(activity_id)
+        key = str(name).strip().lower()
+        self.name[activity_id] = key
+        self.by_name[key].add(activity_id)
+        self.duration[activity_id] = int(duration)
+        self.not_before[activity_id] = date.fromisoformat(str(start_date)[:10]).toordinal()
+        self.dependency[activity_id] = parse_dependencies(dependency)
+
+    def _link(self, activity_id):
+        preds = set()
+        for dep in self.dependency[activity_id]:
+            self.dependents[dep].add(activity_id)
+            preds |= self.by_name.get(dep, set())
+        preds.discard(activity_id)
+        self.preds[activity_id] = preds
+        for pred in preds:
+            self.succs[pred].add(activity_id)
+
+    def _unlink(self, activity_id):
+        for pred in self.preds.get(activity_id, ()):
+            self.succs[pred].discard(activity_id)
+        for dep in self.dependency.get(activity_id, ()):
+            self.dependents[dep].discard(activity_id)
+        self.preds[activity_id] = set()
+
+    def _closure(self, roots, edges):
+        """Semua node yang dapat dicapai dari `roots` lewat `edges` (termasuk roots)"""
+        seen, stack = set(roots), list(roots)
+        while stack:
+            for nxt in edges.get(stack.pop(), ()):
+                if nxt not in seen:
+                    seen.add(nxt)
+                    stack.append(nxt)
+        return seen
+
+    def _order(self, nodes, incoming, outgoing):
+        """Urutan topologis (Kahn) di dalam `nodes`, mengabaikan aktivitas dalam siklus
+
+        Kembalikan (urutan, sisa); sisa tidak kosong jika `nodes` memuat siklus baru.
+        """
+        nodes = nodes - self.cyclic
+        degree = {node: sum(1 for other in incoming.get(node, ()) if other in nodes) for node in nodes}
+        ready = [node for node, d in degree.items() if d == 0]
+        order = []
+        while ready:
+            node = ready.pop()
+            order.append(node)
+            for nxt in outgoing.get(node, ()):
+                if nxt in degree:
+                    degree[nxt] -= 1
+                    if degree[nxt] == 0:
+                        ready.append(nxt)
+        return order, nodes.difference(order)
+
+    def _cycle_members(self, nodes):
+        """Node yang benar-benar berada di siklus (SCC > 1 node, Tarjan iteratif)"""
+        index, low, on_stack, stack, members = {}, {}, set(), [], set()
+        for root in nodes:
+            if root in index:
+                continue
+            work = [(root, iter(self.succs.get(root, ())))]
+            index[root] = low[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            while work:
+                node, successors = work[-1]
+                for nxt in successors:
+                    if nxt not in nodes:
+                        continue
+                    if nxt not in index:
+                        index[nxt] = low[nxt] = len(index)
+                        stack.append(nxt)
+                        on_stack.add(nxt)
+                        work.append((nxt, iter(self.succs.get(nxt, ()))))
+                        break
+                    if nxt in on_stack:
+                        low[node] = min(low[node], index[nxt])
+                else:
+                    work.pop()
+                    if work:
+                        low[work[-1][0]] = min(low[work[-1][0]], low[node])
+                    if low[node] == index[node]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == node:
+                                break
+                        if len(component) > 1:
+                            members.update(component)
+        return members
+
+    def _forward(self, roots):
+        affected = self._closure(roots, self.succs)
+        cyclic = self.cyclic
+        self.cyclic = self.cyclic - affected
+        order, rest = self._order(affected, self.preds, self.succs)
+        if rest:
+            # Siklus disisihkan; aktivitas setelahnya tetap dijadwalkan tanpa prasyarat siklus
+            self.cyclic |= self._cycle_members(rest)
+            order += self._order(rest, self.preds, self.succs)[0]
+        for node in order:
+            self.es[node] = max([self.not_before[node]] + [self.ef[p] for p in self.preds[node] if p not in self.cyclic])
+            self.ef[node] = self.es[node] + self.duration[node]
+        # Aktivitas dalam siklus dijadwalkan pada tanggal mulainya sendiri
+        for node in self.cyclic & affected:
+            self.es[node] = self.not_before[node]
+            self.ef[node] = self.es[node] + self.duration[node]
+        self.finish = max(self.ef.values(), default=None)
+        return cyclic != self.cyclic
+
+    def _backward(self, roots):
+        affected = self._closure(roots, self.preds)
+        order, _ = self._order(affected, self.succs, self.preds)
+        for node in order:
+            succ_starts = [self.ls[s] for s in self.succs.get(node, ()) if s not in self.cyclic]
+            self.lf[node] = min(succ_starts, default=self.finish)
+            self.ls[node] = self.lf[node] - self.duration[node]
+        for node in self.cyclic & affected:
+            self.lf[node] = self.finish
+            self.ls[node] = self.lf[node] - self.duration[node]
+
+    def _backward_all(self):
+        self.ls, self.lf = {}, {}
+        self._backward({node for node in self.name if not self.succs.get(node)} | self.cyclic)
+
+    def to_frame(self):
+        """Jadwal terhitung per aktivitas (tanggal, slack, status jalur kritis)"""
+        with self.lock:
+            ids = list(self.name)
+            frame = pd.DataFrame({
+                "id": pd.Series(ids, dtype=object),
+                "earliest_start": [self.es[i] for i in ids],
+                "earliest_finish": [self.ef[i] for i in ids],
+                "latest_start": [self.ls[i] for i in ids],
+                "latest_finish": [self.lf[i] for i in ids],
+            }, columns=["id", "earliest_start", "earliest_finish", "latest_start", "latest_finish"])
+            frame["slack"] = frame["latest_start"] - frame["earliest_start"]
+            frame["critical"] = frame["slack"] == 0
+            frame["cyclic"] = frame["id"].isin(self.cyclic)
+            frame["unresolved"] = [", ".join(d for d in self.dependency[i] if not self.by_name.get(d)) for i in ids]
+        for col in ["earliest_start", "earliest_finish", "latest_start", "latest_finish"]:
+            frame[col] = pd.to_datetime([date.fromordinal(int(d)) for d in frame[col]])
+        return frame
+
+@st.cache_resource
+def get_project_schedule():
+    """Engine jadwal bersama untuk semua sesi (satu per proses)"""
+    return ProjectSchedule()
+
+def load_project_schedule():
+    """Engine jadwal yang sinkron dengan tabel schedule; dibangun ulang hanya jika tabel berubah di luar engine"""
+    engine = get_project_schedule()
+    version = table_version("schedule")
+    with engine.lock:
+        if engine.version != version:
+            engine.load(read_sql("SELECT id, activity, duration, start_date, dependency FROM schedule"))
+            engine.version = version
+    return engine
+
+def add_schedule_activity(activity, duration, start_date, dependency):
+    """Simpan aktivitas baru lalu perbarui engine jadwal secara inkremental"""
+    engine = get_project_schedule()
+    activity_id = generate_uuid()
+    end_date = (start_date + timedelta(days=duration)).strftime("%Y-%m-%d")
+    start_date = start_date.strftime("%Y-%m-%d")
+    with engine.lock:
+        synced = engine.version == table_version("schedule")
+        rowid = execute_write('''
+        INSERT INTO schedule (id, activity, duration, start_date, end_date, dependency)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ''', (activity_id, activity, duration, start_date, end_date, dependency))
+        # Jika engine tertinggal dari tabel, biarkan load_project_schedule membangun ulang
+        if synced:
+            engine.set_activity(activity_id, activity, duration, start_date, dependency)
+            engine.version = rowid
+
+def schedule_frame():
+    """Tabel schedule digabung dengan tanggal hasil perhitungan jalur kritis"""
+    schedule_df = read_sql("SELECT id, activity, duration, start_date, dependency FROM schedule")
+    return schedule_df.merge(load_project_schedule().to_frame(), on="id", how="left").sort_values("earliest_start", ignore_index=True)
 
 # Streamlit App
 st.title("Sistem Manajemen Proyek Konstruksi")
 
 # Sidebar untuk navigasi
 st.sidebar.title("Navigasi")
-page = st.sidebar.radio("Pilih Halaman", ["Dashboard", "Manajemen Inventaris", "Jadwal Proyek", "Prediksi Material (AI)"])
+page = st.sidebar.radio("Pilih Halaman", ["Dashboard", "Manajemen Inventaris", "Jadwal Proyek", "Prediksi Material (AI)", "Impor Data"])
 
 # Halaman Dashboard
 if page == "Dashboard":
@@ -74,18 +632,22 @@ if page == "Dashboard":
     st.write("Ringkasan status proyek dan inventaris.")
     
     # Menampilkan jumlah total item di inventaris
-    cursor.execute("SELECT SUM(quantity) FROM inventory")
-    total_items = cursor.fetchone()[0] or 0
+    total_items = read_sql("SELECT SUM(quantity) AS total FROM inventory")['total'].iloc[0] or 0
     st.metric("Total Barang di Inventaris", total_items)
     
-    # Menampilkan jadwal proyek
-    schedule_df = pd.read_sql_query("SELECT activity, start_date, end_date FROM schedule", conn)
+    # Menampilkan jadwal proyek (tanggal hasil perhitungan jalur kritis)
+    schedule_df = schedule_frame()
     if not schedule_df.empty:
         st.subheader("Jadwal Proyek")
-        st.dataframe(schedule_df)
+        st.metric("Selesai Proyek", schedule_df["earliest_finish"].max().strftime("%Y-%m-%d"))
+        schedule_df["Jalur Kritis"] = schedule_df["critical"].map({True: "Kritis", False: "Tidak Kritis"})
+        st.dataframe(schedule_df[["activity", "earliest_start", "earliest_finish", "slack", "Jalur Kritis"]])
         
-        # Visualisasi jadwal dengan Plotly
-        fig = px.timeline(schedule_df, x_start="start_date", x_end="end_date", y="activity", title="Jadwal Proyek")
+        # Visualisasi jadwal dengan Plotly (dimuat hanya saat ada jadwal untuk digambar)
+        import plotly.express as px
+        fig = px.timeline(schedule_df, x_start="earliest_start", x_end="earliest_finish", y="activity",
+                          color="Jalur Kritis", title="Jadwal Proyek")
+        fig.update_yaxes(autorange="reversed")
         st.plotly_chart(fig)
 
 # Halaman Manajemen Inventaris
@@ -103,47 +665,103 @@ elif page == "Manajemen Inventaris":
         submit_item = st.form_submit_button("Tambah Item")
         
         if submit_item:
-            cursor.execute('''
+            execute_write('''
             INSERT INTO inventory (id, item_code, item_name, quantity, unit, location, last_updated)
             VALUES (?, ?, ?, ?, ?, ?, ?)
             ''', (generate_uuid(), item_code, item_name, quantity, unit, location, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
-            conn.commit()
             st.success("Item berhasil ditambahkan!")
     
-    # Tampilkan inventaris
+    # Tampilkan inventaris (per halaman, dicari di server)
     st.subheader("Daftar Inventaris")
-    inventory_df = pd.read_sql_query("SELECT item_code, item_name, quantity, unit, location, last_updated FROM inventory", conn)
-    st.dataframe(inventory_df)
+    search_col, size_col = st.columns([3, 1])
+    with search_col:
+        inventory_search = st.text_input("Cari Kode / Nama / Lokasi", placeholder="Awalan kode, nama, atau lokasi").strip()
+    with size_col:
+        page_size = st.selectbox("Baris per Halaman", INVENTORY_PAGE_SIZES)
+    # Tumpukan kunci awal halaman; direset saat pencarian atau ukuran halaman berubah
+    page_state = (inventory_search, page_size)
+    if st.session_state.get("inventory_page_state") != page_state:
+        st.session_state.inventory_page_state = page_state
+        st.session_state.inventory_page_keys = [None]
+    page_keys = st.session_state.inventory_page_keys
+    inventory_page, next_key = fetch_inventory_page(inventory_search, page_keys[-1], page_size)
+    st.dataframe(inventory_page.drop(columns="id"), hide_index=True)
+    
+    prev_col, info_col, next_col = st.columns([1, 2, 1])
+    with prev_col:
+        if st.button("⬅️ Sebelumnya", disabled=len(page_keys) == 1):
+            page_keys.pop()
+            st.rerun()
+    with info_col:
+        st.caption(f"Halaman {len(page_keys)}")
+    with next_col:
+        if st.button("Berikutnya ➡️", disabled=next_key is None):
+            page_keys.append(next_key)
+            st.rerun()
     
     # Update stok
     st.subheader("Update Stok")
-    selected_item = st.selectbox("Pilih Barang", inventory_df['item_name'] if not inventory_df.empty else [])
+    selected_item = item_picker("Pilih Barang", key="update_item")
     update_quantity = st.number_input("Jumlah Baru", min_value=0, step=1)
-    if st.button("Update Stok"):
-        cursor.execute("UPDATE inventory SET quantity = ?, last_updated = ? WHERE item_name = ?",
-                       (update_quantity, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), selected_item))
-        conn.commit()
+    if st.button("Update Stok") and selected_item:
+        execute_write("UPDATE inventory SET quantity = ?, last_updated = ? WHERE id = ?",
+                      (update_quantity, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), selected_item["id"]))
         st.success("Stok berhasil diperbarui!")
     
     # Catat penggunaan barang
     st.subheader("Catat Penggunaan Barang")
+    usage_item = item_picker("Pilih Barang untuk Penggunaan", key="usage_item")
     with st.form("usage_form"):
-        usage_item = st.selectbox("Pilih Barang untuk Penggunaan", inventory_df['item_name'] if not inventory_df.empty else [])
-        usage_quantity = st.number_input("Jumlah Digunakan", min_value=0, step=1)
+        usage_quantity = st.number_input("Jumlah Digunakan", min_value=1, step=1)
         submit_usage = st.form_submit_button("Catat Penggunaan")
         
-        if submit_usage:
-            cursor.execute("SELECT quantity FROM inventory WHERE item_name = ?", (usage_item,))
-            current_quantity = cursor.fetchone()[0]
-            if current_quantity >= usage_quantity:
-                cursor.execute("UPDATE inventory SET quantity = quantity - ?, last_updated = ? WHERE item_name = ?",
-                               (usage_quantity, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), usage_item))
-                cursor.execute("INSERT INTO usage_history (id, item_name, quantity_used, date_used) VALUES (?, ?, ?, ?)",
-                               (generate_uuid(), usage_item, usage_quantity, datetime.now().strftime("%Y-%m-%d")))
-                conn.commit()
-                st.success("Penggunaan barang berhasil dicatat!")
+        if submit_usage and usage_item:
+            try:
+                recorded = record_usage(usage_item["id"], usage_quantity)
+            except ValueError as e:
+                st.error(str(e))
+            else:
+                if recorded:
+                    st.success("Penggunaan barang berhasil dicatat!")
+                else:
+                    st.error("Stok tidak cukup!")
+    
+    # Catat lembar penggunaan harian (banyak barang, satu transaksi)
+    st.subheader("Catat Penggunaan Harian")
+    with st.form("daily_usage_form"):
+        usage_sheet = st.data_editor(
+            pd.DataFrame({"Kode Barang": pd.Series(dtype=object), "Jumlah Digunakan": pd.Series(dtype="int64")}),
+            num_rows="dynamic",
+            column_config={
+                "Kode Barang": st.column_config.TextColumn("Kode Barang", required=True),
+                "Jumlah Digunakan": st.column_config.NumberColumn("Jumlah Digunakan", min_value=1, step=1, required=True),
+            },
+            key="daily_usage_sheet"
+        )
+        usage_date = st.date_input("Tanggal Penggunaan", datetime.now())
+        submit_sheet = st.form_submit_button("Catat Semua Penggunaan")
+        
+        if submit_sheet:
+            sheet = usage_sheet.dropna()
+            sheet = sheet.assign(**{"Kode Barang": sheet["Kode Barang"].astype(str).str.strip()})
+            items = resolve_item_codes(sheet["Kode Barang"])
+            unknown = [code for code in dict.fromkeys(sheet["Kode Barang"]) if len(items.get(code, [])) != 1]
+            if sheet.empty:
+                st.warning("Lembar penggunaan masih kosong.")
+            elif unknown:
+                st.error("Kode barang tidak ditemukan atau tidak unik: " + ", ".join(unknown))
             else:
-                st.error("Stok tidak cukup!")
+                lines = [(items[code][0]["id"], qty) for code, qty in zip(sheet["Kode Barang"], sheet["Jumlah Digunakan"])]
+                try:
+                    failed = record_usage_batch(lines, usage_date.strftime("%Y-%m-%d"))
+                except ValueError as e:
+                    st.error(f"{e}. Tidak ada penggunaan yang dicatat.")
+                else:
+                    if failed:
+                        labels = {item["id"]: item_label(item) for rows in items.values() for item in rows}
+                        st.error("Stok tidak cukup untuk: " + ", ".join(labels[item_id] for item_id in dict.fromkeys(failed)) + ". Tidak ada penggunaan yang dicatat.")
+                    else:
+                        st.success(f"{len(lines)} baris penggunaan berhasil dicatat!")
 
 # Halaman Jadwal Proyek
 elif page == "Jadwal Proyek":
@@ -154,46 +772,97 @@ elif page == "Jadwal Proyek":
     with st.form("add_schedule_form"):
         activity = st.text_input("Nama Aktivitas")
         duration = st.number_input("Durasi (hari)", min_value=1, step=1)
-        start_date = st.date_input("Tanggal Mulai")
-        dependency = st.text_input("Ketergantungan (opsional)")
+        start_date = st.date_input("Tanggal Mulai (paling awal)")
+        dependency = st.text_input("Ketergantungan (opsional)", help="Nama aktivitas prasyarat, pisahkan dengan koma")
         submit_schedule = st.form_submit_button("Tambah Aktivitas")
         
         if submit_schedule:
-            end_date = (start_date + timedelta(days=duration)).strftime("%Y-%m-%d")
-            start_date = start_date.strftime("%Y-%m-%d")
-            cursor.execute('''
-            INSERT INTO schedule (id, activity, duration, start_date, end_date, dependency)
-            VALUES (?, ?, ?, ?, ?, ?)
-            ''', (generate_uuid(), activity, duration, start_date, end_date, dependency))
-            conn.commit()
+            add_schedule_activity(activity, duration, start_date, dependency)
             st.success("Aktivitas berhasil ditambahkan!")
     
     # Tampilkan jadwal
     st.subheader("Daftar Jadwal")
-    schedule_df = pd.read_sql_query("SELECT activity, duration, start_date, end_date, dependency FROM schedule", conn)
-    st.dataframe(schedule_df)
+    schedule_df = schedule_frame()
+    st.dataframe(schedule_df[["activity", "duration", "dependency", "earliest_start", "earliest_finish",
+                              "latest_start", "latest_finish", "slack", "critical"]].rename(columns={
+        "activity": "Aktivitas", "duration": "Durasi", "dependency": "Ketergantungan",
+        "earliest_start": "Mulai Paling Awal", "earliest_finish": "Selesai Paling Awal",
+        "latest_start": "Mulai Paling Lambat", "latest_finish": "Selesai Paling Lambat",
+        "slack": "Slack (hari)", "critical": "Kritis"
+    }), hide_index=True)
+    
+    if not schedule_df.empty:
+        critical_path = schedule_df.loc[schedule_df["critical"] & ~schedule_df["cyclic"], "activity"]
+        if not critical_path.empty:
+            st.info("🛤️ Jalur kritis: " + " → ".join(critical_path))
+        if schedule_df["cyclic"].any():
+            st.error("Ketergantungan melingkar (diabaikan): " + ", ".join(schedule_df.loc[schedule_df["cyclic"], "activity"]))
+        unresolved = schedule_df[schedule_df["unresolved"] != ""]
+        if not unresolved.empty:
+            st.warning("Ketergantungan tidak ditemukan: " + "; ".join(
+                f"{row.activity} → {row.unresolved}" for row in unresolved.itertuples()))
 
 # Halaman Prediksi Material (AI)
 elif page == "Prediksi Material (AI)":
     st.header("Prediksi Kebutuhan Material (Berbasis AI)")
     st.write("Gunakan data historis untuk memprediksi kebutuhan material di masa depan.")
     
+    forecast_period = st.radio("Periode Prediksi", list(FORECAST_PERIODS), format_func=FORECAST_PERIODS.get, horizontal=True)
+    forecast_df = get_forecast(forecast_period).set_index("item_name")
+    period_label = FORECAST_PERIODS[forecast_period].lower()
+    
     # Pilih barang untuk prediksi
-    inventory_df = pd.read_sql_query("SELECT item_name FROM inventory", conn)
-    selected_item = st.selectbox("Pilih Barang untuk Prediksi", inventory_df['item_name'] if not inventory_df.empty else [])
+    picked_item = item_picker("Pilih Barang untuk Prediksi", key="forecast_item")
+    selected_item = picked_item["item_name"] if picked_item else None
     
     if selected_item:
-        usage_history = pd.read_sql_query("SELECT quantity_used, date_used FROM usage_history WHERE item_name = ?", conn, params=(selected_item,))
+        usage_history = read_sql("SELECT quantity_used, date_used FROM usage_history WHERE item_name = ? ORDER BY date_used", (selected_item,))
         if not usage_history.empty:
             st.subheader(f"Prediksi untuk {selected_item}")
-            prediction = predict_material_needed(selected_item, usage_history)
-            st.write(f"Prediksi kebutuhan untuk periode berikutnya: **{prediction}** unit")
+            prediction = int(forecast_df["forecast"].get(selected_item, 0))
+            st.write(f"Prediksi kebutuhan untuk periode {period_label} berikutnya: **{prediction}** unit")
             
             # Visualisasi data historis
+            import plotly.express as px
             fig = px.line(usage_history, x="date_used", y="quantity_used", title=f"Riwayat Penggunaan {selected_item}")
             st.plotly_chart(fig)
         else:
             st.warning("Tidak ada data historis untuk barang ini.")
+    
+    # Laporan reorder untuk semua barang sekaligus
+    st.subheader("Laporan Reorder")
+    report = reorder_report(forecast_period)
+    st.metric("Barang Perlu Dipesan Ulang", int((report["reorder_qty"] > 0).sum()))
+    st.dataframe(
+        report[["item_name", "stock", "forecast", "reorder_qty", "trend", "periods"]].rename(columns={
+            "item_name": "Nama Barang", "stock": "Stok", "forecast": "Prediksi Kebutuhan",
+            "reorder_qty": "Jumlah Reorder", "trend": "Tren per Periode", "periods": "Jumlah Periode"
+        }),
+        hide_index=True
+    )
 
-# Tutup koneksi database saat aplikasi selesai
-conn.close()
+# Halaman Impor Data
+elif page == "Impor Data":
+    st.header("Impor Data Massal")
+    st.write("Pindahkan data gudang dari spreadsheet (CSV) sekaligus, tanpa input satu per satu.")
+    
+    import_labels = {"inventory": "Inventaris", "usage_history": "Riwayat Penggunaan"}
+    import_table = st.selectbox("Tabel Tujuan", list(import_labels), format_func=import_labels.get)
+    st.caption("Kolom wajib: " + ", ".join(IMPORT_TABLES[import_table]["columns"]) + ". Tanggal dalam format YYYY-MM-DD.")
+    uploaded_csv = st.file_uploader("Upload File CSV", type=["csv"])
+    
+    if uploaded_csv is not None and st.button("Mulai Impor"):
+        progress_bar = st.progress(0.0)
+        progress_text = st.empty()
+        
+        def show_progress(imported, skipped):
+            progress_bar.progress(min(uploaded_csv.tell() / max(uploaded_csv.size, 1), 1.0))
+            progress_text.text(f"{imported:,} baris diimpor, {skipped:,} baris dilewati")
+        
+        try:
+            imported, skipped = import_csv(import_table, uploaded_csv, on_progress=show_progress)
+        except ValueError as e:
+            st.error(f"Impor gagal: {e}")
+        else:
+            progress_bar.progress(1.0)
+            st.success(f"Impor selesai: {imported:,} baris diimpor, {skipped:,} baris tidak valid dilewati.")
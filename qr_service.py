@@ -0,0 +1,242 @@
+"""Layanan QR code untuk label batch MBG
+
+Render QR dipisah dari halaman Streamlit agar bisa dipakai di process pool.
+Hasil render disimpan dalam cache LRU per (payload, format), dan tersedia
+tiga format output:
+
+- 'png'  : PNG base64 (untuk <img src="data:image/png;base64,...">)
+- 'svg'  : teks SVG, tanpa encoding PNG sama sekali
+- 'bits' : matriks 1-bit (ukuran, bytes hasil np.packbits per baris)
+"""
+import base64
+import html
+import itertools
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+import numpy as np
+import qrcode
+
+QR_BOX_SIZE = 10
+QR_BORDER = 5
+# Mask tetap melewati evaluasi penalti 8 mask (~4x lebih cepat); semua scanner
+# tetap bisa membaca QR dengan mask apa pun.
+QR_MASK_PATTERN = 0
+QR_FORMATS = ('png', 'svg', 'bits')
+QR_CACHE_SIZE = 8192
+# Di bawah jumlah ini render bulk dilakukan langsung tanpa process pool
+POOL_MIN_BATCH = 64
+
+# Tata letak lembar label cetak (A4)
+LABEL_FIELDS = ('batch_id', 'produsen', 'lembaga', 'menu', 'jumlah', 'tanggal')
+LABEL_COLUMNS = 3
+LABEL_ROWS = 6
+LABELS_PER_PAGE = LABEL_COLUMNS * LABEL_ROWS
+LABEL_CHUNK_PAGES = 10
+
+
+class LRUCache:
+    """Cache LRU sederhana yang thread-safe"""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+
+_cache = LRUCache(QR_CACHE_SIZE)
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def qr_matrix(data):
+    """Matriks modul QR (bool, termasuk border) sebagai array NumPy"""
+    qr = qrcode.QRCode(version=1, border=QR_BORDER, mask_pattern=QR_MASK_PATTERN)
+    qr.add_data(data)
+    qr.make(fit=True)
+    return np.array(qr.get_matrix(), dtype=bool)
+
+
+def matrix_to_png(matrix, box_size=QR_BOX_SIZE):
+    """PNG base64 dari matriks, digambar langsung sebagai citra 1-bit"""
+    from PIL import Image
+
+    size = matrix.shape[0]
+    # Mode '1': bit 1 = putih, jadi modul gelap dibalik
+    img = Image.frombytes('1', (size, size), np.packbits(~matrix, axis=1).tobytes())
+    img = img.resize((size * box_size, size * box_size), Image.NEAREST)
+    buffer = BytesIO()
+    img.save(buffer, format='PNG')
+    return base64.b64encode(buffer.getvalue()).decode()
+
+
+def matrix_to_svg(matrix, box_size=QR_BOX_SIZE):
+    """SVG dari matriks; modul gelap berurutan dalam satu baris digabung jadi satu segmen path"""
+    size = matrix.shape[0]
+    padded = np.zeros((size, size + 2), dtype=np.int8)
+    padded[:, 1:-1] = matrix
+    edges = np.diff(padded, axis=1)
+    rows, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+    path = ''.join(f"M{x},{y}h{w}v1h-{w}z" for y, x, w in zip(rows, starts, ends - starts))
+    pixels = size * box_size
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{pixels}" height="{pixels}" '
+        f'viewBox="0 0 {size} {size}" shape-rendering="crispEdges">'
+        f'<rect width="{size}" height="{size}" fill="white"/>'
+        f'<path d="{path}" fill="black"/></svg>'
+    )
+
+
+def render_qr(data, fmt='png'):
+    """Render satu payload tanpa cache (dipakai juga oleh worker process pool)"""
+    matrix = qr_matrix(data)
+    if fmt == 'png':
+        return matrix_to_png(matrix)
+    if fmt == 'svg':
+        return matrix_to_svg(matrix)
+    if fmt == 'bits':
+        return matrix.shape[0], np.packbits(matrix, axis=1).tobytes()
+    raise ValueError(f"Format QR tidak dikenal: {fmt!r} (pilih dari {QR_FORMATS})")
+
+
+def _render_chunk(payloads, fmt):
+    return [render_qr(data, fmt) for data in payloads]
+
+
+def generate_qr_code(data, fmt='png'):
+    """QR code untuk satu payload, dengan cache LRU per (payload, format)"""
+    key = (data, fmt)
+    result = _cache.get(key)
+    if result is None:
+        result = render_qr(data, fmt)
+        _cache.put(key, result)
+    return result
+
+
+def get_pool(workers=None):
+    """Process pool bersama untuk render bulk (dibuat sekali)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=workers)
+        return _pool
+
+
+def generate_qr_codes(payloads, fmt='png', chunksize=256, cache=True):
+    """Render banyak payload sekaligus; urutan hasil sama dengan urutan input
+
+    Payload yang sudah ada di cache tidak dirender ulang, dan duplikat hanya
+    dirender sekali. Sisanya dibagi per chunk ke process pool. Dengan
+    `cache=False` hasil baru tidak disimpan (untuk ekspor sekali pakai).
+    """
+    payloads = list(payloads)
+    results = {}
+    missing = []
+    for data in dict.fromkeys(payloads):
+        cached = _cache.get((data, fmt))
+        if cached is None:
+            missing.append(data)
+        else:
+            results[data] = cached
+
+    if len(missing) < POOL_MIN_BATCH:
+        rendered = [render_qr(data, fmt) for data in missing]
+    else:
+        pool = get_pool()
+        chunks = [missing[i:i + chunksize] for i in range(0, len(missing), chunksize)]
+        rendered = [
+            result
+            for chunk in pool.map(_render_chunk, chunks, [fmt] * len(chunks))
+            for result in chunk
+        ]
+
+    for data, result in zip(missing, rendered):
+        if cache:
+            _cache.put((data, fmt), result)
+        results[data] = result
+    return [results[data] for data in payloads]
+
+
+def label_payload(batch):
+    """Payload JSON QR untuk satu batch (hanya field label yang terisi)"""
+    return json.dumps(
+        {field: batch[field] for field in LABEL_FIELDS if batch.get(field) not in (None, '')},
+        ensure_ascii=False, default=str
+    )
+
+
+_SHEET_HEADER = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Label QR Batch MBG</title>
+<style>
+  @page { size: A4; margin: 10mm; }
+  body { font-family: sans-serif; margin: 0; }
+  .page { display: grid; grid-template-columns: repeat(%d, 1fr); gap: 4mm; page-break-after: always; }
+  .label { border: 1px dashed #999; padding: 2mm; text-align: center; font-size: 9pt; break-inside: avoid; }
+  .label svg { width: 32mm; height: 32mm; }
+  .label p { margin: 0.5mm 0; }
+</style></head><body>
+""" % LABEL_COLUMNS
+
+
+def _label_html(batch, svg):
+    fields = ''.join(
+        f"<p>{html.escape(str(batch[field]))}</p>"
+        for field in LABEL_FIELDS[1:] if batch.get(field) not in (None, '')
+    )
+    return f'<div class="label">{svg}<p><b>{html.escape(str(batch.get("batch_id", "")))}</b></p>{fields}</div>'
+
+
+def iter_label_sheet(batches, chunk_size=LABELS_PER_PAGE * LABEL_CHUNK_PAGES):
+    """Hasilkan lembar label HTML siap cetak sepotong demi sepotong
+
+    `batches` boleh berupa iterator (misalnya dari CSV yang dibaca per chunk);
+    QR dirender per chunk tanpa masuk cache sehingga memori tetap datar.
+    """
+    yield _SHEET_HEADER
+    batches = iter(batches)
+    count = 0
+    while True:
+        chunk = list(itertools.islice(batches, chunk_size))
+        if not chunk:
+            break
+        svgs = generate_qr_codes([label_payload(batch) for batch in chunk], fmt='svg', cache=False)
+        parts = []
+        for batch, svg in zip(chunk, svgs):
+            if count % LABELS_PER_PAGE == 0:
+                parts.append('</div>\n<div class="page">' if count else '<div class="page">')
+            parts.append(_label_html(batch, svg))
+            count += 1
+        yield ''.join(parts)
+    yield ('</div>\n' if count else '') + '</body></html>\n'
+
+
+def write_label_sheet(batches, fileobj, on_progress=None):
+    """Tulis lembar label ke file teks per chunk; kembalikan jumlah label"""
+    count = 0
+    for part in iter_label_sheet(batches):
+        fileobj.write(part)
+        count += part.count('class="label"')
+        if on_progress is not None:
+            on_progress(count)
+    return count
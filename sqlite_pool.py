@@ -0,0 +1,64 @@
+"""Pool koneksi SQLite bersama (WAL) dengan migrasi skema berbasis PRAGMA user_version
+
+Dipakai oleh pm.py dan mbg_store.py. Satu pool per file database dibuat sekali
+per proses (lewat st.cache_resource di halaman) dan dipinjam oleh semua sesi.
+"""
+import queue
+import sqlite3
+from contextlib import contextmanager
+
+DB_POOL_SIZE = 8
+DB_BUSY_TIMEOUT = 10  # detik menunggu lock penulis sebelum gagal
+DB_CACHE_KB = 65536  # page cache per koneksi (impor massal sangat terbantu)
+
+
+class ConnectionPool:
+    """Pool koneksi SQLite thread-safe yang dipakai bersama oleh semua sesi
+
+    `migrations` adalah list langkah migrasi berurutan (list statement SQL);
+    langkah ke-i menaikkan PRAGMA user_version ke i + 1.
+    """
+
+    def __init__(self, path, migrations=(), size=DB_POOL_SIZE):
+        self.path = path
+        self.migrations = list(migrations)
+        self._idle = queue.LifoQueue(maxsize=size)
+        self.migrate()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=DB_BUSY_TIMEOUT, check_same_thread=False)
+        # WAL: pembaca tidak pernah diblokir penulis; NORMAL aman untuk WAL
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={DB_BUSY_TIMEOUT * 1000}")
+        conn.execute(f"PRAGMA cache_size=-{DB_CACHE_KB}")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Pinjam satu koneksi; transaksi yang belum di-commit dibatalkan saat dikembalikan"""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            try:
+                self._idle.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    def migrate(self):
+        """Jalankan migrasi skema yang belum diterapkan (sekali per file database)"""
+        with self.connection() as conn:
+            # BEGIN IMMEDIATE agar proses lain tidak ikut migrasi bersamaan
+            conn.execute("BEGIN IMMEDIATE")
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            for statements in self.migrations[version:]:
+                for statement in statements:
+                    conn.execute(statement)
+            conn.execute(f"PRAGMA user_version={len(self.migrations)}")
+            conn.commit()
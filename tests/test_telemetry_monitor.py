@@ -0,0 +1,21 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fodddashboard import DELIVERED, IN_TRANSIT, TelemetryMonitor
+
+
+def test_recent_events_keep_batch_id_after_slot_reuse():
+    monitor = TelemetryMonitor(capacity=100, max_delivered=2)
+    batch_ids = [f"B{i}" for i in range(6)]
+    for batch_id in batch_ids:
+        monitor.submit(batch_id, "Produsen", "Sekolah", IN_TRANSIT, 20.0, 10)
+        monitor.submit(batch_id, "Produsen", "Sekolah", DELIVERED, 20.0, 0)
+    monitor.poll()
+
+    # Slot batch terkirim lama sudah dipakai ulang oleh batch berikutnya
+    assert len(monitor.batch_ids) < len(batch_ids)
+    recent = monitor.recent_events(n=2 * len(batch_ids))
+    expected = [batch_id for batch_id in reversed(batch_ids) for _ in range(2)]
+    assert recent['Batch ID'].tolist() == expected